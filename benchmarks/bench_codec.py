@@ -0,0 +1,42 @@
+"""Encoding cost of each JSON codec (``steeper._codec``) on a realistic update.
+
+Every forward is serialized once on the bot's event loop, so this is the
+per-update CPU Steeper adds to a bot, before compression and the network.
+
+Run:
+    python benchmarks/bench_codec.py [--count 200000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from bench_spool import UPDATE
+
+from steeper._codec import resolve_codec
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=200_000)
+    args = parser.parse_args()
+    for name in ("json", "orjson", "msgspec"):
+        try:
+            codec = resolve_codec(name)
+        except ImportError:
+            print(f"{name:>8}: not installed")
+            continue
+        encode = codec.encode
+        start = time.perf_counter()
+        for _ in range(args.count):
+            encode(UPDATE)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:>8}: {args.count / elapsed:>12,.0f} updates/s  "
+            f"({elapsed / args.count * 1e6:.2f} µs/update)"
+        )
+
+
+if __name__ == "__main__":
+    main()
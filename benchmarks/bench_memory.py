@@ -0,0 +1,109 @@
+"""Memory held by pending forwards while the backend hangs (``max_pending_bytes``).
+
+A backend that accepts connections and never answers is the worst case for
+memory: every forward stays pending for the full client timeout. This runs a
+bot whose in-flight limit had grown to ``--in-flight`` against such a backend,
+schedules ``--count`` large updates, and reports how far the process's peak
+RSS grew — once with only the count limit, where each pending forward holds
+its decoded update, and once with a byte budget, where it holds the encoded
+bytes and the budget caps their total. Each run gets a fresh interpreter, as
+peak RSS never goes back down.
+
+Run:
+    python benchmarks/bench_memory.py [--count 20000] [--text 4096] [--budget 1048576]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import resource
+import subprocess
+import sys
+from typing import Any
+
+from bench_spool import UPDATE
+
+from steeper import ConcurrencyPolicy, SteeperRepository
+
+
+def _peak_rss() -> int:
+    """Peak resident set size of this process, in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+async def _hang(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    # Read the request and never answer, like a backend stuck on its database.
+    await reader.read()
+
+
+async def _outage(count: int, text: int, in_flight: int, budget: int | None) -> dict[str, Any]:
+    server = await asyncio.start_server(_hang, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    repo = SteeperRepository(
+        base_url=f"http://127.0.0.1:{port}",
+        bot_id="bench",
+        bot_token="0:bench",
+        timeout=60.0,
+        concurrency=ConcurrencyPolicy(initial=in_flight, max_limit=in_flight),
+        max_pending_bytes=budget,
+        drain_timeout=0,
+    )
+    update: dict[str, Any] = json.loads(json.dumps(UPDATE))
+    update["message"]["text"] = "x" * text
+    raw = json.dumps(update).encode()
+    before = _peak_rss()
+    for update_id in range(count):
+        # Decoded per update, as a framework does, so no two share their objects.
+        received = json.loads(raw)
+        received["update_id"] = update_id
+        repo.schedule_update(dict, received)
+    # Let every admitted forward reach the connection pool or the socket.
+    await asyncio.sleep(1)
+    bulkhead = repo.scheduler.bulkhead
+    result = {
+        "rss": _peak_rss() - before,
+        "pending": bulkhead.in_flight,
+        "pending_bytes": bulkhead.pending_bytes,
+        "dropped": bulkhead.dropped_total,
+    }
+    server.close()
+    await repo.aclose()
+    return result
+
+
+def _run(args: argparse.Namespace, budget: int | None) -> dict[str, Any]:
+    command = [sys.executable, __file__, "--count", str(args.count), "--text", str(args.text)]
+    command += ["--in-flight", str(args.in_flight), "--child", str(budget or 0)]
+    output = subprocess.run(command, capture_output=True, check=True, text=True).stdout
+    result: dict[str, Any] = json.loads(output)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=20_000)
+    parser.add_argument("--text", type=int, default=4096, help="characters of text per update")
+    parser.add_argument("--in-flight", type=int, default=4096)
+    parser.add_argument("--budget", type=int, default=1 << 20, help="max_pending_bytes")
+    parser.add_argument("--child", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child is not None:
+        logging.getLogger("steeper").setLevel(logging.ERROR)
+        budget = args.child or None
+        print(json.dumps(asyncio.run(_outage(args.count, args.text, args.in_flight, budget))))
+        return
+    for label, budget in (("count limit", None), (f"{args.budget:,} B budget", args.budget)):
+        result = _run(args, budget)
+        print(
+            f"{label:>18}: RSS +{result['rss'] / (1 << 20):7.1f} MiB  "
+            f"{result['pending']:>6,} pending  {result['pending_bytes']:>12,} B encoded  "
+            f"{result['dropped']:>6,} dropped"
+        )
+
+
+if __name__ == "__main__":
+    main()
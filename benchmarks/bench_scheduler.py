@@ -0,0 +1,64 @@
+"""Scheduling overhead of the two background engines (``steeper._background``).
+
+Every forwarded update and every logged API result passes through the
+repository's :class:`~steeper._background.Scheduler`. This submits bursts of
+no-op forwards and reports how many the event loop gets through per second,
+once with a task per forward and once with a fixed worker pool.
+
+Run:
+    python benchmarks/bench_scheduler.py [--count 200000] [--workers 16]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from steeper._background import MAX_IN_FLIGHT, Scheduler
+
+
+async def _forward(update: dict[str, int]) -> None:
+    await asyncio.sleep(0)
+
+
+async def _bench(count: int, workers: int | None) -> float:
+    scheduler = Scheduler(workers=workers)
+    done = 0
+    update = {"update_id": 1}
+
+    async def forward() -> None:
+        nonlocal done
+        await _forward(update)
+        done += 1
+
+    start = time.perf_counter()
+    submitted = 0
+    while submitted < count:
+        # Bursts below the in-flight cap, like a polling bot's getUpdates batches.
+        burst = min(MAX_IN_FLIGHT // 2, count - submitted)
+        for _ in range(burst):
+            scheduler.submit(forward)
+        submitted += burst
+        while done < submitted:
+            await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+    scheduler.close()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+    for label, workers in (("task per forward", None), (f"{args.workers} workers", args.workers)):
+        elapsed = asyncio.run(_bench(args.count, workers))
+        print(
+            f"{label:>17}: {args.count / elapsed:>12,.0f} forwards/s  "
+            f"({elapsed / args.count * 1e6:.2f} µs/forward)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Append throughput of the on-disk spool (``steeper._spool.Spool``).
+
+The spool sits on the forwarding path whenever ``spool_dir`` is set, so an
+append must stay cheap enough not to show up next to the bot's own work. This
+measures appends of a realistic Telegram update, with and without ``fsync``,
+and the ack path that runs once the backend settles a forward.
+
+Run:
+    python benchmarks/bench_spool.py [--count 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+
+from steeper._spool import Spool
+
+UPDATE = {
+    "update_id": 123456789,
+    "message": {
+        "message_id": 4242,
+        "from": {
+            "id": 987654321,
+            "is_bot": False,
+            "first_name": "Ada",
+            "last_name": "Lovelace",
+            "username": "ada",
+            "language_code": "en",
+        },
+        "chat": {
+            "id": 987654321,
+            "first_name": "Ada",
+            "last_name": "Lovelace",
+            "username": "ada",
+            "type": "private",
+        },
+        "date": 1700000000,
+        "text": "Hello! I'd like to know more about your pricing plans, please.",
+        "entities": [{"offset": 0, "length": 5, "type": "bold"}],
+    },
+}
+
+
+def _bench(count: int, *, fsync: bool) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        spool = Spool(directory, fsync=fsync, max_bytes=1 << 40)
+        seqs = []
+        start = time.perf_counter()
+        for _ in range(count):
+            seqs.append(spool.append("update", UPDATE))
+            if fsync:
+                spool.flush()
+        spool.flush()
+        appended = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for seq in seqs:
+            if seq is not None:
+                spool.ack(seq)
+        spool.flush()
+        acked = time.perf_counter() - start
+        spool.close()
+
+    label = "append+fsync" if fsync else "append"
+    print(
+        f"{label:>13}: {count / appended:>12,.0f} records/s  "
+        f"({appended / count * 1e6:.2f} µs/record)"
+    )
+    print(f"{'ack':>13}: {count / acked:>12,.0f} records/s  ({acked / count * 1e6:.2f} µs/record)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000)
+    args = parser.parse_args()
+    _bench(args.count, fsync=False)
+    # fsync per record is orders of magnitude slower; keep the run short.
+    _bench(max(args.count // 100, 100), fsync=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -18,11 +18,76 @@ def __getattr__(name: str) -> Any:
         from steeper.repository import SteeperRepository
 
         return SteeperRepository
+    if name == "SteeperHub":
+        from steeper._hub import SteeperHub
+
+        return SteeperHub
     if name == "OutgoingMessageSnapshot":
         from steeper.repository import OutgoingMessageSnapshot
 
         return OutgoingMessageSnapshot
+    if name == "RetryPolicy":
+        from steeper._retry import RetryPolicy
+
+        return RetryPolicy
+    if name == "CircuitBreakerPolicy":
+        from steeper._breaker import CircuitBreakerPolicy
+
+        return CircuitBreakerPolicy
+    if name == "TransportPolicy":
+        from steeper._transport import TransportPolicy
+
+        return TransportPolicy
+    if name == "CompressionPolicy":
+        from steeper._compression import CompressionPolicy
+
+        return CompressionPolicy
+    if name == "ConcurrencyPolicy":
+        from steeper._background import ConcurrencyPolicy
+
+        return ConcurrencyPolicy
+    if name == "FairnessPolicy":
+        from steeper._fairness import FairnessPolicy
+
+        return FairnessPolicy
+    if name == "StalenessPolicy":
+        from steeper._background import StalenessPolicy
+
+        return StalenessPolicy
+    if name == "set_process_limit":
+        from steeper._background import set_process_limit
+
+        return set_process_limit
+    if name == "DedupePolicy":
+        from steeper._dedupe import DedupePolicy
+
+        return DedupePolicy
+    if name == "metrics":
+        # Importing the instrumented modules registers their metrics.
+        import steeper._background  # noqa: F401
+        import steeper._client  # noqa: F401
+        import steeper._coalesce  # noqa: F401
+        import steeper._dedupe  # noqa: F401
+        from steeper._metrics import registry
+
+        return registry
     raise AttributeError(f"module 'steeper' has no attribute {name!r}")
 
 
-__all__ = ["SteeperConfig", "SteeperClient", "SteeperRepository", "OutgoingMessageSnapshot"]
+__all__ = [
+    "SteeperConfig",
+    "SteeperClient",
+    "SteeperRepository",
+    "SteeperHub",
+    "OutgoingMessageSnapshot",
+    "RetryPolicy",
+    "CircuitBreakerPolicy",
+    "TransportPolicy",
+    "CompressionPolicy",
+    "ConcurrencyPolicy",
+    "DedupePolicy",
+    "FairnessPolicy",
+    "StalenessPolicy",
+    "set_process_limit",
+    "metrics",
+]
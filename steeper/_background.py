@@ -16,79 +16,502 @@ Two strategies cover the two kinds of host framework:
 Both share the same contract: never block the caller, never raise, log
 failures at DEBUG.
 
+Creating a task per forward is the simplest engine, but at a few thousand
+updates a second the task allocation and its done-callback show up in
+event-loop profiles. :class:`WorkerPool` is the alternative: callers enqueue a
+lightweight :class:`WorkItem` (a function and its arguments — no coroutine is
+created until a worker picks it up) into a bounded queue drained by a fixed
+number of long-lived worker coroutines per loop. :class:`Scheduler` is the
+front door that picks an engine, and what the integrations call.
+
 Both are also **bounded**. A backend that is slow or down means every forward
 sits in flight for the full client timeout, so an unbounded scheduler would
 accumulate one pending task per update until the process runs out of memory.
-At most :data:`MAX_IN_FLIGHT` forwards may be in flight at once; beyond that
-the *newest* work is dropped, which keeps the bot alive and bounds the damage
-of an outage to the traffic recorded during it. Delivery is therefore
-at-most-once — there is no retry and no persistent queue.
+Each scheduler has an in-flight limit, fixed at :data:`MAX_IN_FLIGHT` unless an
+adaptive one replaces it (below); beyond that limit work is shed, which keeps
+the bot alive and bounds the damage of an outage to the traffic recorded during
+it.
+
+Shed work is gone for good, but what the scheduler admits need not be sent
+only once. The client may retry transient failures (a
+:class:`~steeper._retry.RetryPolicy`, under a client-wide retry budget so an
+outage can't multiply the backend's load), and with ``spool_dir`` the
+repository appends each forward to an on-disk :class:`~steeper._spool.Spool`
+before sending it and replays whatever the backend has not settled, across
+restarts too. Without either, delivery is at-most-once.
+
+The limit is counted per :class:`Scheduler`, in its own :class:`Bulkhead`, and
+every repository has its own scheduler: a process hosting several bots gives
+each one its budget, drop count and warning, so one bot's dead backend can't
+shed another's traffic. A process-wide ceiling (:func:`set_process_limit`)
+still bounds the sum.
+
+Counting forwards bounds memory only as well as forwards are alike in size. A
+scheduler given ``max_bytes`` also holds the encoded size of what it admits
+against that budget, so an outage during a burst of large updates (long
+messages, big keyboards, media groups) can't take more memory than planned.
+
+The limit need not stay fixed. A :class:`Scheduler` given an
+:class:`AdaptiveLimit` reads it on every admission instead, and the client feeds
+that limit each request's latency and outcome: it grows by one per window of
+fast, successful requests and shrinks by a factor when requests fail or their
+smoothed latency climbs well above its long-run average (additive increase,
+multiplicative decrease), so a healthy backend gets more concurrency than
+:data:`MAX_IN_FLIGHT` and a drowning one far less. Repositories use one
+by default; a scheduler without one keeps the fixed ceiling.
+
+What gets shed is the scheduler's *overflow policy*: :data:`DROP_NEWEST` (the
+default) refuses new work, :data:`DROP_OLDEST` evicts the longest-queued item
+of a worker pool to make room, and :data:`PRIORITY` lets :data:`LOW` priority
+work fill only part of the limit, keeping the rest for :data:`HIGH` priority
+work — the conversations the backend actually builds chats from.
+
+Work submitted with a ``key`` (integrations use the chat id) runs in order
+with the other work of that key: each chat's update and the replies to it
+reach the backend one after another, as the backend needs to have stored a
+chat's user before it can log a message to them. Work of different keys still
+runs concurrently. A keyed item can hand its key's turn on before it finishes,
+with :func:`pass_turn`: the batcher and coalescer do so once an item has taken
+its place in a batch, so a chat's forwards still share one request.
+
+Under a backlog, work may also wait long enough to be worthless: a callback
+query delivered minutes late only takes backend capacity from the current
+conversations. A scheduler given a :class:`StalenessPolicy` notes when each
+item was submitted and, when its turn comes, drops it instead if it has waited
+longer than the policy allows for its kind.
 """
 
 from __future__ import annotations
 
 import asyncio
 import concurrent.futures
+import contextlib
 import logging
 import threading
-from collections.abc import Coroutine
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Coroutine, Hashable, Mapping
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import partial
 from typing import Any
+from weakref import WeakKeyDictionary, WeakSet
+
+from steeper._fairness import QUOTA_REASONS, FairnessPolicy, Quotas
+from steeper._metrics import registry
 
 logger = logging.getLogger("steeper")
 
-#: Upper bound on forwards in flight at any moment, per scheduling strategy.
-#: Reached only when the backend stops keeping up; see the module docstring.
+#: Upper bound on forwards in flight at any moment, per scheduler (see :class:`Bulkhead`),
+#: unless an :class:`AdaptiveLimit` sets it instead. Reached only when the backend
+#: stops keeping up; see the module docstring.
 MAX_IN_FLIGHT = 512
 
+#: Overflow policies accepted by :class:`Scheduler`.
+DROP_NEWEST = "drop-newest"
+DROP_OLDEST = "drop-oldest"
+PRIORITY = "priority"
+OVERFLOW_POLICIES = (DROP_NEWEST, DROP_OLDEST, PRIORITY)
+
+#: Priority classes of scheduled work, for the :data:`PRIORITY` policy.
+LOW = 0
+HIGH = 1
+
+# Under the PRIORITY policy, the share of MAX_IN_FLIGHT that low-priority work
+# may occupy; the remainder stays free for high-priority work during overload.
+_LOW_PRIORITY_SHARE = 0.75
+
 # Strong references keep pending tasks alive until they finish; the event
 # loop itself only holds weak ones.
 _tasks: set[asyncio.Task[Any]] = set()
 
-# Drop bookkeeping, shared by both strategies. Guarded by a lock because the
-# threadsafe path is called from arbitrary worker threads.
-_drop_lock = threading.Lock()
-_dropped_total = 0
-_drop_warned = False
+#: Default ceiling on forwards in flight across every scheduler in the process;
+#: see :func:`set_process_limit`.
+PROCESS_MAX_IN_FLIGHT = 8192
+
+# Forwards in flight across all bulkheads, against the process ceiling.
+_process_lock = threading.Lock()
+_process_in_flight = 0
+_process_limit: int | None = PROCESS_MAX_IN_FLIGHT
 
+_PROCESS_LIMIT_REACHED = "process limit reached"
+_SHUTTING_DOWN = "shutting down"
+_BYTE_BUDGET_REACHED = "byte budget reached"
+_STALE = "stale"
 
-def _note_drop(reason: str) -> None:
-    """Account for one dropped forward, warning once per outage.
+# Refusals that evicting another queued item can't cure: a quota is counted per
+# chat or type, and a closed bulkhead takes nothing.
+_NOT_EVICTABLE = QUOTA_REASONS | {_SHUTTING_DOWN}
 
-    The first drop is worth a WARNING — it means Steeper is losing traffic.
-    Every drop after that is DEBUG with a running total, because at this point
-    they arrive as fast as the bot receives updates and a warning per drop
-    would bury the host application's own logs.
+
+_DROPPED = registry.counter(
+    "steeper_dropped_total", "Forwards shed instead of sent, by reason.", ("reason",)
+)
+
+# Lets the next work of the running item's key start; set while keyed work runs.
+_turn: ContextVar[Callable[[], None] | None] = ContextVar("steeper_turn", default=None)
+
+
+def pass_turn() -> None:
+    """Let the work queued behind the running item's key start, though it isn't done.
+
+    For code that has put the item's payload where its order is kept from now
+    on — the end of a batch, say — and only waits for it to be sent. A no-op
+    outside keyed work, and after the first call.
     """
-    global _dropped_total, _drop_warned
-    with _drop_lock:
-        _dropped_total += 1
-        total = _dropped_total
-        first = not _drop_warned
-        _drop_warned = True
-    if first:
-        logger.warning(
-            "Steeper has %d forwards in flight (the limit); dropping new ones until "
-            "the backend keeps up. Reason: %s. Further drops log at DEBUG.",
-            MAX_IN_FLIGHT,
-            reason,
-        )
-    else:
-        logger.debug("Steeper forward dropped (%s); %d dropped so far", reason, total)
+    release = _turn.get()
+    if release is not None:
+        release()
 
 
-def _note_drained() -> None:
-    """Re-arm the warning once the queue empties, so a later outage warns again."""
-    global _drop_warned
-    if not _drop_warned:
-        return
-    with _drop_lock:
-        _drop_warned = False
+# Worker pools and bulkheads alive anywhere in the process, for the gauges below.
+_live_pools: WeakSet[WorkerPool] = WeakSet()
+_live_bulkheads: WeakSet[Bulkhead] = WeakSet()
+
+
+def _in_flight() -> int:
+    return _process_in_flight
+
+
+def _queue_depth() -> int:
+    return sum(p._queued for p in list(_live_pools))
+
+
+def _pending_bytes() -> int:
+    return sum(b._bytes for b in list(_live_bulkheads))
+
+
+registry.gauge("steeper_in_flight", "Forwards being sent right now.", _in_flight)
+registry.gauge("steeper_queue_depth", "Forwards waiting for a worker.", _queue_depth)
+registry.gauge(
+    "steeper_pending_bytes", "Encoded bytes held by forwards under a byte budget.", _pending_bytes
+)
+
+
+@dataclass(frozen=True, slots=True)
+class ConcurrencyPolicy:
+    """How :class:`AdaptiveLimit` moves the in-flight limit.
+
+    Args:
+        initial: The limit to start from.
+        min_limit: Never shrink below this many forwards in flight.
+        max_limit: Never grow beyond this many.
+        tolerance: Recent latency (a moving average over a few dozen requests)
+            above this multiple of the long-run baseline (one over a few
+            thousand) counts as a sign of congestion.
+        backoff: Factor the limit is multiplied by on congestion or failure.
+    """
+
+    initial: int = MAX_IN_FLIGHT
+    min_limit: int = 16
+    max_limit: int = 4096
+    tolerance: float = 2.0
+    backoff: float = 0.8
+
+    def __post_init__(self) -> None:
+        if not 1 <= self.min_limit <= self.initial <= self.max_limit:
+            raise ValueError("limits must satisfy 1 <= min_limit <= initial <= max_limit")
+        if self.tolerance <= 1:
+            raise ValueError("tolerance must be greater than 1")
+        if not 0 < self.backoff < 1:
+            raise ValueError("backoff must be between 0 and 1")
+
+
+#: The policy repositories use unless told otherwise.
+DEFAULT_CONCURRENCY = ConcurrencyPolicy()
+
+
+# Weight of each successful request's latency in the two moving averages. The
+# recent one smooths out ordinary jitter within a few dozen requests; the
+# baseline moves over a few thousand, so a backend that got slower for good
+# ends up the new normal, while a queue building up stands out against it.
+_RECENT_WEIGHT = 0.1
+_BASELINE_WEIGHT = 0.002
+
+
+class AdaptiveLimit:
+    """An in-flight limit that follows the backend's health (AIMD).
+
+    Each successful request adds ``1 / limit`` while latency is near its
+    baseline, so the limit grows by one per window of requests. A failed
+    request, or any request while recent latency is well above the baseline,
+    multiplies it by ``backoff`` — at most once per window: only a request sent
+    after the last decrease can cause another, as in TCP congestion control.
+    Both latencies are moving averages (a gradient, rather than single samples
+    against the fastest one seen), so a healthy backend's jitter doesn't read
+    as congestion.
+
+    Read from any thread; :meth:`record` is called by the client on its loop.
+    """
+
+    def __init__(self, policy: ConcurrencyPolicy | None = None) -> None:
+        self._policy = policy = policy if policy is not None else ConcurrencyPolicy()
+        self._limit = float(policy.initial)
+        self._recent: float | None = None
+        self._baseline = 0.0
+        self._decreased_at = float("-inf")
+        _live_limits.add(self)
+
+    @property
+    def current(self) -> int:
+        return int(self._limit)
+
+    def record(self, started: float, latency: float, ok: bool) -> None:
+        """Account for a request sent at ``started`` (``time.perf_counter``)."""
+        policy = self._policy
+        recent = self._recent
+        if ok:
+            if recent is None:
+                recent = self._baseline = latency
+            else:
+                recent += (latency - recent) * _RECENT_WEIGHT
+                self._baseline += (latency - self._baseline) * _BASELINE_WEIGHT
+            self._recent = recent
+        congested = not ok or recent is None or recent > self._baseline * policy.tolerance
+        if not congested:
+            self._limit = min(self._limit + 1 / self._limit, policy.max_limit)
+        elif started > self._decreased_at:
+            self._limit = max(self._limit * policy.backoff, policy.min_limit)
+            self._decreased_at = time.perf_counter()
+
+
+_live_limits: WeakSet[AdaptiveLimit] = WeakSet()
+
+
+def _concurrency_limit() -> int:
+    # The tightest limit in the process is the one telling about the backend.
+    return min((limit.current for limit in list(_live_limits)), default=MAX_IN_FLIGHT)
 
 
-def _on_done(task: asyncio.Task[Any]) -> None:
+registry.gauge(
+    "steeper_concurrency_limit", "Forwards allowed in flight at once.", _concurrency_limit
+)
+
+
+@dataclass(frozen=True, slots=True)
+class StalenessPolicy:
+    """How long a forward may wait for its turn before it is dropped instead of sent.
+
+    Args:
+        ttl: Seconds any forward may wait; ``None`` lets it wait however long.
+        kinds: Seconds by update type (``callback_query``, ..., or ``outgoing``
+            for the bot's own messages), in place of ``ttl`` for those types.
+    """
+
+    ttl: float | None = None
+    kinds: Mapping[str, float] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if self.ttl is not None and self.ttl <= 0:
+            raise ValueError("ttl must be positive")
+        if any(ttl <= 0 for ttl in self.kinds.values()):
+            raise ValueError("every ttl in kinds must be positive")
+
+    def ttl_for(self, kind: str | None) -> float | None:
+        """Seconds work of ``kind`` may wait; ``None`` if it may wait however long."""
+        if kind is not None:
+            ttl = self.kinds.get(kind)
+            if ttl is not None:
+                return ttl
+        return self.ttl
+
+
+def _drop_reason(limit: int, cap: int = MAX_IN_FLIGHT) -> str:
+    return "in-flight limit reached" if limit >= cap else "low-priority share reached"
+
+
+def set_process_limit(limit: int | None) -> None:
+    """Cap forwards in flight across every scheduler in the process; ``None`` lifts the cap.
+
+    Each :class:`Scheduler` has a budget of its own (a :class:`Bulkhead`), so one
+    bot whose backend is down can't take the slots of the others; this ceiling
+    bounds what all of them together may hold in memory.
+    """
+    global _process_limit
+    if limit is not None and limit < 1:
+        raise ValueError("the process limit must be at least 1")
+    with _process_lock:
+        _process_limit = limit
+
+
+class Bulkhead:
+    """One scheduler's share of the process: its forwards in flight and its drops.
+
+    Keeping this per scheduler (so per bot, as every repository has its own)
+    isolates failures: a bot whose backend stopped answering fills and sheds
+    only its own budget, and warns under its own ``name``. Admission also takes
+    a slot from the process-wide ceiling of :func:`set_process_limit`.
+
+    With ``fairness`` (a :class:`~steeper.FairnessPolicy`), forwards admitted
+    with a chat ``key`` or an update ``kind`` are also held to that chat's and
+    that kind's share of the limit.
+
+    With ``max_bytes``, admission also takes each forward's ``size`` from that
+    budget. A forward is admitted whatever its size while nothing else is held,
+    so one larger than the whole budget is still sent.
+
+    After :meth:`close` it admits nothing more, and :meth:`drained` waits for
+    what it already holds.
+
+    Thread-safe: the threadsafe engine admits work from arbitrary threads.
+    """
+
+    def __init__(
+        self,
+        name: str | None = None,
+        fairness: FairnessPolicy | None = None,
+        max_bytes: int | None = None,
+    ) -> None:
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+        self.name = name
+        self._quotas = Quotas(fairness) if fairness is not None else None
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._bytes = 0
+        self._dropped_total = 0
+        self._drop_warned = False
+        self._closed = False
+        # Futures to resolve once nothing is in flight, each with its own loop.
+        self._idle_waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future[None]]] = []
+        _live_bulkheads.add(self)
+
+    @property
+    def in_flight(self) -> int:
+        """Forwards admitted and not yet finished: running, or queued for a worker."""
+        return self._in_flight
+
+    @property
+    def pending_bytes(self) -> int:
+        """The summed ``size`` of the forwards in flight; always 0 without ``max_bytes``."""
+        return self._bytes
+
+    @property
+    def dropped_total(self) -> int:
+        return self._dropped_total
+
+    def acquire(
+        self,
+        limit: int,
+        cap: int = MAX_IN_FLIGHT,
+        key: Hashable | None = None,
+        kind: str | None = None,
+        size: int = 0,
+    ) -> str | None:
+        """Take a slot if fewer than ``limit`` are taken; else the reason it was refused."""
+        global _process_in_flight
+        quotas = self._quotas
+        budget = self._max_bytes
+        with self._lock:
+            if self._closed:
+                return _SHUTTING_DOWN
+            if self._in_flight >= limit:
+                return _drop_reason(limit, cap)
+            if budget is not None and self._bytes and self._bytes + size > budget:
+                return _BYTE_BUDGET_REACHED
+            if quotas is not None:
+                refused = quotas.refusal(key, kind, cap, self._in_flight)
+                if refused is not None:
+                    return refused
+            with _process_lock:
+                if _process_limit is not None and _process_in_flight >= _process_limit:
+                    return _PROCESS_LIMIT_REACHED
+                _process_in_flight += 1
+            self._in_flight += 1
+            if budget is not None:
+                self._bytes += size
+            if quotas is not None:
+                quotas.add(key, kind)
+        return None
+
+    def release(self, key: Hashable | None = None, kind: str | None = None, size: int = 0) -> None:
+        """Give back a slot taken for ``key``, ``kind`` and ``size``.
+
+        Re-arms the drop warning once every slot is back.
+        """
+        global _process_in_flight
+        with self._lock:
+            if self._quotas is not None:
+                self._quotas.add(key, kind, -1)
+            if self._max_bytes is not None:
+                self._bytes -= size
+            self._in_flight -= 1
+            waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future[None]]] = []
+            if self._in_flight == 0:
+                # Drained: a later outage is a new event and deserves its own warning.
+                self._drop_warned = False
+                waiters, self._idle_waiters = self._idle_waiters, []
+            with _process_lock:
+                _process_in_flight -= 1
+        for loop, waiter in waiters:
+            with contextlib.suppress(RuntimeError):  # the waiter's loop is closed
+                loop.call_soon_threadsafe(_resolve, waiter)
+
+    def close(self) -> None:
+        """Admit nothing more; everything offered from now on is dropped."""
+        with self._lock:
+            self._closed = True
+
+    async def drained(self) -> None:
+        """Return once nothing is in flight."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if not self._in_flight:
+                return
+            waiter: asyncio.Future[None] = loop.create_future()
+            self._idle_waiters.append((loop, waiter))
+        await waiter
+
+    def note_drop(self, reason: str, cap: int = MAX_IN_FLIGHT) -> None:
+        """Account for one dropped forward, warning once per outage.
+
+        The first drop is worth a WARNING — it means Steeper is losing traffic.
+        Every drop after that is DEBUG with a running total, because at this point
+        they arrive as fast as the bot receives updates and a warning per drop
+        would bury the host application's own logs.
+        """
+        _DROPPED.inc(reason)
+        if reason == _SHUTTING_DOWN:
+            # Expected while stopping, and no sign of a struggling backend.
+            logger.debug("Steeper forward dropped: shutting down")
+            return
+        with self._lock:
+            self._dropped_total += 1
+            total = self._dropped_total
+            first = not self._drop_warned
+            self._drop_warned = True
+        who = f" for {self.name}" if self.name else ""
+        if first:
+            logger.warning(
+                "Steeper is shedding forwards%s (limit: %d in flight) until the backend "
+                "keeps up. Reason: %s. Further drops log at DEBUG.",
+                who,
+                cap,
+                reason,
+            )
+        else:
+            logger.debug("Steeper forward dropped%s (%s); %d dropped so far", who, reason, total)
+
+
+def _resolve(waiter: asyncio.Future[None]) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+# What the module-level functions account against when not given a bulkhead.
+_default_bulkhead = Bulkhead()
+
+
+def _on_done(
+    bulkhead: Bulkhead,
+    key: Hashable | None,
+    kind: str | None,
+    size: int,
+    task: asyncio.Task[Any],
+) -> None:
     _tasks.discard(task)
-    if not _tasks:
-        _note_drained()
+    bulkhead.release(key, kind, size)
     if task.cancelled():
         return
     exc = task.exception()
@@ -96,26 +519,41 @@ def _on_done(task: asyncio.Task[Any]) -> None:
         logger.debug("Steeper forward failed", exc_info=exc)
 
 
-def fire_and_forget(coro: Coroutine[Any, Any, Any]) -> None:
+def fire_and_forget(
+    coro: Coroutine[Any, Any, Any],
+    *,
+    limit: int = MAX_IN_FLIGHT,
+    cap: int = MAX_IN_FLIGHT,
+    bulkhead: Bulkhead | None = None,
+    key: Hashable | None = None,
+    kind: str | None = None,
+    size: int = 0,
+) -> None:
     """Run ``coro`` on the current event loop without awaiting it.
 
-    Dropped if more than :data:`MAX_IN_FLIGHT` forwards are already pending.
-    Failures are logged at DEBUG level and never propagate to the caller.
+    Dropped if ``bulkhead`` already holds ``limit`` forwards (at most the in-flight
+    ``cap``, a lower share of it for low-priority work), the process ceiling is
+    reached, chat ``key`` or update ``kind`` is over its share, or ``size`` more
+    bytes would exceed the byte budget (see :class:`Bulkhead`). Failures are
+    logged at DEBUG level and never propagate to the caller.
     """
-    if len(_tasks) >= MAX_IN_FLIGHT:
+    bulkhead = bulkhead or _default_bulkhead
+    refused = bulkhead.acquire(limit, cap, key, kind, size)
+    if refused is not None:
         # Close the coroutine so it doesn't emit a "never awaited" warning.
         coro.close()
-        _note_drop("in-flight limit reached")
+        bulkhead.note_drop(refused, cap)
         return
     try:
         task = asyncio.create_task(coro)
     except RuntimeError:
         # No running event loop — nothing sensible to do but drop the work.
+        bulkhead.release(key, kind, size)
         coro.close()
         logger.debug("No running event loop; Steeper forward dropped", exc_info=True)
         return
     _tasks.add(task)
-    task.add_done_callback(_on_done)
+    task.add_done_callback(partial(_on_done, bulkhead, key, kind, size))
 
 
 class BackgroundLoop:
@@ -133,9 +571,6 @@ class BackgroundLoop:
     def __init__(self) -> None:
         self._loop: asyncio.AbstractEventLoop | None = None
         self._lock = threading.Lock()
-        # Counted rather than tracked in a set: these run on another loop, and
-        # a plain int under the existing lock is enough to enforce the cap.
-        self._in_flight = 0
 
     def _ensure_loop(self) -> asyncio.AbstractEventLoop:
         if self._loop is not None:
@@ -153,20 +588,26 @@ class BackgroundLoop:
                 self._loop = loop
             return loop
 
-    def submit(self, coro: Coroutine[Any, Any, Any]) -> None:
+    def submit(
+        self,
+        coro: Coroutine[Any, Any, Any],
+        *,
+        limit: int = MAX_IN_FLIGHT,
+        cap: int = MAX_IN_FLIGHT,
+        bulkhead: Bulkhead | None = None,
+        key: Hashable | None = None,
+        kind: str | None = None,
+        size: int = 0,
+    ) -> None:
         """Schedule ``coro`` on the background loop without waiting for it.
 
-        Dropped if the loop already has :data:`MAX_IN_FLIGHT` forwards pending.
+        Dropped like :func:`fire_and_forget`.
         """
-        with self._lock:
-            if self._in_flight >= MAX_IN_FLIGHT:
-                over_limit = True
-            else:
-                over_limit = False
-                self._in_flight += 1
-        if over_limit:
+        bulkhead = bulkhead or _default_bulkhead
+        refused = bulkhead.acquire(limit, cap, key, kind, size)
+        if refused is not None:
             coro.close()
-            _note_drop("in-flight limit reached")
+            bulkhead.note_drop(refused, cap)
             return
 
         try:
@@ -174,7 +615,7 @@ class BackgroundLoop:
             future = asyncio.run_coroutine_threadsafe(coro, loop)
         except Exception:
             # Never let scheduling failures break the bot's own call.
-            self._release()
+            bulkhead.release(key, kind, size)
             logger.debug("Failed to schedule Steeper forward", exc_info=True)
             return
 
@@ -186,16 +627,16 @@ class BackgroundLoop:
             except Exception:
                 logger.debug("Steeper forward failed", exc_info=True)
             finally:
-                self._release()
+                bulkhead.release(key, kind, size)
 
         future.add_done_callback(_retrieve)
 
-    def _release(self) -> None:
-        with self._lock:
-            self._in_flight -= 1
-            drained = self._in_flight == 0
-        if drained:
-            _note_drained()
+    def call_soon(self, callback: Callable[..., Any], *args: Any) -> None:
+        """Run a plain callback on the background loop, from any thread."""
+        try:
+            self._ensure_loop().call_soon_threadsafe(callback, *args)
+        except Exception:
+            logger.debug("Failed to schedule Steeper work", exc_info=True)
 
     def submit_sync(self, coro: Coroutine[Any, Any, Any], *, timeout: float) -> None:
         """Run ``coro`` on the background loop and wait for it to finish.
@@ -216,18 +657,599 @@ class BackgroundLoop:
 _background_loop = BackgroundLoop()
 
 
-def fire_and_forget_threadsafe(coro: Coroutine[Any, Any, Any]) -> None:
+def fire_and_forget_threadsafe(
+    coro: Coroutine[Any, Any, Any],
+    *,
+    limit: int = MAX_IN_FLIGHT,
+    cap: int = MAX_IN_FLIGHT,
+    bulkhead: Bulkhead | None = None,
+    key: Hashable | None = None,
+    kind: str | None = None,
+    size: int = 0,
+) -> None:
     """Run ``coro`` on the shared background loop from any (sync) thread.
 
-    Dropped if more than :data:`MAX_IN_FLIGHT` forwards are already pending.
-    Failures are logged at DEBUG level and never propagate to the caller.
+    Dropped like :func:`fire_and_forget`. Failures are logged at DEBUG level and
+    never propagate to the caller.
     """
-    _background_loop.submit(coro)
+    _background_loop.submit(
+        coro, limit=limit, cap=cap, bulkhead=bulkhead, key=key, kind=kind, size=size
+    )
+
+
+def _admission_limit(overflow: str, priority: int, limit: int = MAX_IN_FLIGHT) -> int:
+    """How many forwards may be pending for work of ``priority`` to still be admitted."""
+    if overflow == PRIORITY and priority < HIGH:
+        return int(limit * _LOW_PRIORITY_SHARE)
+    return limit
 
 
 def run_threadsafe(coro: Coroutine[Any, Any, Any], *, timeout: float = 5.0) -> None:
     """Run ``coro`` on the shared background loop and wait for it, from any thread.
 
-    The blocking counterpart of :func:`fire_and_forget_threadsafe`, for shutdown.
+    The blocking counterpart of :func:`fire_and_forget_threadsafe`, for setup and shutdown.
     """
     _background_loop.submit_sync(coro, timeout=timeout)
+
+
+class WorkItem:
+    """A forward waiting for a worker: the coroutine function, its arguments and priority.
+
+    Cheaper to hold than the coroutine itself, and nothing runs (or needs
+    closing) if it is dropped. Items sharing a ``key`` (a chat) run one at a
+    time, in the order they were put; ``key`` and ``kind`` (an update type) are
+    also what fairness quotas count, and ``size`` what a byte budget does.
+    ``enqueued`` (:func:`time.monotonic`) is when it was made, for staleness.
+    """
+
+    __slots__ = ("fn", "args", "priority", "key", "kind", "size", "enqueued")
+
+    def __init__(
+        self,
+        fn: Callable[..., Awaitable[Any]],
+        args: tuple[Any, ...],
+        priority: int = HIGH,
+        key: Hashable | None = None,
+        kind: str | None = None,
+        size: int = 0,
+    ) -> None:
+        self.fn = fn
+        self.args = args
+        self.priority = priority
+        self.key = key
+        self.kind = kind
+        self.size = size
+        self.enqueued = time.monotonic()
+
+
+class _Lane:
+    """One scheduler's admission settings and queue within a :class:`WorkerPool`."""
+
+    __slots__ = (
+        "bulkhead",
+        "limit",
+        "limiter",
+        "overflow",
+        "ordered",
+        "staleness",
+        "queue",
+        "running",
+        "parked",
+        "__weakref__",
+    )
+
+    def __init__(
+        self,
+        bulkhead: Bulkhead,
+        limit: int,
+        limiter: AdaptiveLimit | None,
+        overflow: str,
+        ordered: bool,
+        staleness: StalenessPolicy | None,
+    ) -> None:
+        self.bulkhead = bulkhead
+        self.limit = limit
+        self.limiter = limiter
+        self.overflow = overflow
+        self.ordered = ordered
+        self.staleness = staleness
+        self.queue: deque[WorkItem] = deque()
+        # Keys with an item holding their turn, and the items of those keys
+        # that came up meanwhile, waiting behind it.
+        self.running: dict[Hashable, WorkItem] = {}
+        self.parked: dict[Hashable, deque[WorkItem]] = {}
+
+    def cap(self) -> int:
+        return self.limiter.current if self.limiter is not None else self.limit
+
+    def stale(self, item: WorkItem) -> bool:
+        """Whether ``item`` has waited longer than the staleness policy allows."""
+        ttl = self.staleness.ttl_for(item.kind) if self.staleness is not None else None
+        return ttl is not None and time.monotonic() - item.enqueued > ttl
+
+
+class WorkerPool:
+    """A bounded queue of :class:`WorkItem` drained by ``workers`` long-lived coroutines.
+
+    Bound to one event loop; every method must be called on that loop's thread.
+    Like the task engine it never blocks and never raises, and ``bulkhead``
+    holds at most ``limit`` forwards at once — queued or being worked on — with
+    work shed beyond that according to ``overflow``.
+
+    Several schedulers can share one pool (see :class:`PoolGroup`): each gets
+    a lane of its own from :meth:`add_lane`, with its own limit and bulkhead,
+    and the workers take from the lanes in turn, so a scheduler with a deep
+    queue can't keep the others' work waiting behind all of it.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int,
+        limit: int = MAX_IN_FLIGHT,
+        overflow: str = DROP_NEWEST,
+        limiter: AdaptiveLimit | None = None,
+        bulkhead: Bulkhead | None = None,
+        staleness: StalenessPolicy | None = None,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self._size = workers
+        # Every lane, so closing can release what waits in any of them.
+        self._lanes: WeakSet[_Lane] = WeakSet()
+        self._lane = self.add_lane(
+            bulkhead=bulkhead or _default_bulkhead,
+            limit=limit,
+            limiter=limiter,
+            overflow=overflow,
+            staleness=staleness,
+        )
+        # Lanes with queued work, in the order the workers will visit them.
+        self._ready: deque[_Lane] = deque()
+        self._queued = 0
+        self._idle: deque[asyncio.Future[None]] = deque()
+        self._workers: list[asyncio.Task[None]] = []
+        self._busy = 0
+        _live_pools.add(self)
+
+    @property
+    def pending(self) -> int:
+        """Items queued or being worked on."""
+        return self._queued + self._busy
+
+    def add_lane(
+        self,
+        *,
+        bulkhead: Bulkhead,
+        limit: int = MAX_IN_FLIGHT,
+        limiter: AdaptiveLimit | None = None,
+        overflow: str = DROP_NEWEST,
+        ordered: bool = True,
+        staleness: StalenessPolicy | None = None,
+    ) -> _Lane:
+        """A queue in this pool for :meth:`put`, admitting work against ``bulkhead``.
+
+        ``ordered=False`` runs items regardless of their keys' order. With
+        ``staleness``, items that waited too long are dropped instead of run.
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {', '.join(OVERFLOW_POLICIES)}")
+        lane = _Lane(bulkhead, limit, limiter, overflow, ordered, staleness)
+        self._lanes.add(lane)
+        return lane
+
+    def put(self, item: WorkItem, lane: _Lane | None = None) -> None:
+        """Enqueue ``item``, shedding work per the overflow policy if the pool is full."""
+        lane = lane or self._lane
+        cap = lane.cap()
+        limit = _admission_limit(lane.overflow, item.priority, cap)
+        bulkhead = lane.bulkhead
+        refused = bulkhead.acquire(limit, cap, item.key, item.kind, item.size)
+        while (
+            refused is not None
+            and refused not in _NOT_EVICTABLE
+            and lane.overflow == DROP_OLDEST
+            and lane.queue
+        ):
+            # Make room: the evicted item's slot goes to the new one. Under a
+            # byte budget a large item may need several smaller ones' room.
+            evicted = lane.queue.popleft()
+            self._queued -= 1
+            if not lane.queue:
+                # A lane is ready only while it has a queue; the put below re-adds it.
+                self._ready.remove(lane)
+            bulkhead.release(evicted.key, evicted.kind, evicted.size)
+            bulkhead.note_drop("evicted by newer work", cap)
+            refused = bulkhead.acquire(limit, cap, item.key, item.kind, item.size)
+        if refused is not None:
+            bulkhead.note_drop(refused, cap)
+            return
+        if not self._workers:
+            loop = asyncio.get_running_loop()
+            self._workers = [loop.create_task(self._work()) for _ in range(self._size)]
+        if not lane.queue:
+            self._ready.append(lane)
+        lane.queue.append(item)
+        self._queued += 1
+        self._wake()
+
+    def _wake(self, count: int = 1) -> None:
+        """Wake up to ``count`` idle workers."""
+        while self._idle and count:
+            waiter = self._idle.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                count -= 1
+
+    def _pass_turn(self, lane: _Lane, key: Hashable, item: WorkItem) -> None:
+        """Hand ``key``'s turn on from ``item``: its parked items go back to the queue front."""
+        if lane.running.get(key) is not item:
+            return
+        del lane.running[key]
+        parked = lane.parked.pop(key, None)
+        if parked:
+            if not lane.queue:
+                self._ready.append(lane)
+            lane.queue.extendleft(reversed(parked))
+            self._wake(len(parked))
+
+    def discard(self, lane: _Lane) -> None:
+        """Drop everything queued in ``lane``; work already running finishes."""
+        dropped = [*lane.queue, *(item for items in lane.parked.values() for item in items)]
+        for item in dropped:
+            lane.bulkhead.release(item.key, item.kind, item.size)
+        self._queued -= len(dropped)
+        lane.queue.clear()
+        lane.parked.clear()
+        with contextlib.suppress(ValueError):
+            self._ready.remove(lane)
+
+    async def _work(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await self._work_once(loop)
+            except Exception:
+                # A bug in the bookkeeping must not take the worker down with it:
+                # the pool would stop draining, and its items keep their slots.
+                logger.warning("Steeper worker failed; carrying on", exc_info=True)
+
+    async def _work_once(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Wait for an item and run it, then whatever its key parked meanwhile."""
+        if not self._ready:
+            waiter = loop.create_future()
+            self._idle.append(waiter)
+            await waiter
+            return
+        lane = self._ready.popleft()
+        if not lane.queue:
+            return
+        item = lane.queue.popleft()
+        if lane.queue:
+            # Round-robin: the lane's next item waits for every other lane's turn.
+            self._ready.append(lane)
+        key = item.key if lane.ordered else None
+        if key is not None:
+            if key in lane.running:
+                # Its key's worker runs it next, so this one is free for other keys.
+                lane.parked.setdefault(key, deque()).append(item)
+                return
+            lane.running[key] = item
+        while True:
+            self._queued -= 1
+            self._busy += 1
+            turn = None if key is None else _turn.set(partial(self._pass_turn, lane, key, item))
+            try:
+                if lane.stale(item):
+                    lane.bulkhead.note_drop(_STALE, lane.cap())
+                else:
+                    await item.fn(*item.args)
+            except Exception:
+                logger.debug("Steeper forward failed", exc_info=True)
+            finally:
+                if turn is not None:
+                    _turn.reset(turn)
+                self._busy -= 1
+                lane.bulkhead.release(item.key, item.kind, item.size)
+            if key is None or lane.running.get(key) is not item:
+                # Unkeyed, or the item passed its key's turn on while it ran.
+                return
+            parked = lane.parked.get(key)
+            if not parked:
+                lane.parked.pop(key, None)
+                del lane.running[key]
+                return
+            item = lane.running[key] = parked.popleft()
+
+    def close(self) -> None:
+        """Stop the workers; anything still queued is discarded."""
+        for task in self._workers:
+            task.cancel()
+        self._workers = []
+        # Not just the lanes in ``_ready``: items parked behind a running key hold
+        # their slots too, and with the workers gone that key never comes round.
+        for lane in list(self._lanes):
+            self.discard(lane)
+            lane.running.clear()
+
+
+class PoolGroup:
+    """One :class:`WorkerPool` of ``workers`` per event loop, shared by several schedulers."""
+
+    def __init__(self, workers: int) -> None:
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self._workers = workers
+        self._pools: WeakKeyDictionary[asyncio.AbstractEventLoop, WorkerPool] = WeakKeyDictionary()
+
+    def pool(self, loop: asyncio.AbstractEventLoop) -> WorkerPool:
+        """The pool serving ``loop``, started on first use."""
+        pool = self._pools.get(loop)
+        if pool is None:
+            pool = self._pools[loop] = WorkerPool(workers=self._workers)
+        return pool
+
+    def close(self) -> None:
+        """Stop the pool of the running loop, if there is one."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        pool = self._pools.pop(loop, None)
+        if pool is not None:
+            pool.close()
+
+
+class _KeyLock:
+    __slots__ = ("lock", "users")
+
+    def __init__(self) -> None:
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+class Scheduler:
+    """Where integrations hand off forwards; picks the engine that runs them.
+
+    With ``workers=None`` (the default) every forward becomes its own task, via
+    :func:`fire_and_forget` / :func:`fire_and_forget_threadsafe`. With a number,
+    each event loop gets a :class:`WorkerPool` of that many workers instead.
+
+    Call :meth:`submit` from a coroutine on a running loop (aiogram, PTB) and
+    :meth:`submit_threadsafe` from plain threads (telebot); both take the
+    coroutine *function* and its arguments, so that an engine which queues the
+    work never has to create the coroutine in the first place.
+
+    ``overflow`` picks what is shed at the in-flight limit: one of
+    :data:`OVERFLOW_POLICIES`. :data:`DROP_OLDEST` needs ``workers``, since only
+    a queue has an oldest item that can still be dropped without cancelling a
+    request halfway. Work is :data:`HIGH` priority unless submitted otherwise.
+
+    The in-flight limit is :data:`MAX_IN_FLIGHT`, or whatever ``limiter`` (an
+    :class:`AdaptiveLimit`) currently allows, and applies to this scheduler's
+    own :class:`Bulkhead`: schedulers don't compete for slots, except under the
+    process ceiling of :func:`set_process_limit`. ``name`` labels its drop
+    warnings.
+
+    Given ``pools`` (a :class:`PoolGroup`) instead of ``workers``, the scheduler
+    queues its work in a lane of those shared pools rather than starting its own.
+
+    Work submitted with the same ``key`` runs in submission order, one item at a
+    time; ``ordered=False`` ignores keys and runs everything concurrently.
+
+    With ``fairness`` (a :class:`~steeper.FairnessPolicy`), each ``key`` may hold
+    only its share of the in-flight limit, and so may each ``kind`` of work once
+    the limit is nearly taken.
+
+    With ``max_bytes``, the work in flight may also hold at most that many bytes,
+    by the ``size`` it was submitted with; see :class:`Bulkhead`.
+
+    With ``staleness`` (a :class:`StalenessPolicy`), work still waiting for its
+    turn — a worker, or the work of its key before it — longer than its kind's
+    TTL is dropped when the turn comes, instead of run.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int | None = None,
+        overflow: str = DROP_NEWEST,
+        limiter: AdaptiveLimit | None = None,
+        name: str | None = None,
+        pools: PoolGroup | None = None,
+        ordered: bool = True,
+        fairness: FairnessPolicy | None = None,
+        max_bytes: int | None = None,
+        staleness: StalenessPolicy | None = None,
+    ) -> None:
+        if workers is not None and pools is not None:
+            raise ValueError("pass either workers or shared pools, not both")
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {', '.join(OVERFLOW_POLICIES)}")
+        if overflow == DROP_OLDEST and workers is None and pools is None:
+            raise ValueError("the drop-oldest overflow policy needs workers")
+        self._owns_pools = pools is None
+        self._group = PoolGroup(workers) if workers is not None else pools
+        self._overflow = overflow
+        self._limiter = limiter
+        self._bulkhead = Bulkhead(name, fairness, max_bytes)
+        self._lanes: WeakKeyDictionary[WorkerPool, _Lane] = WeakKeyDictionary()
+        self._ordered = ordered
+        self._staleness = staleness
+        # Per-key locks of the task engines, by loop and key. Each entry is only
+        # touched from its own loop's thread, so the dict needs no lock of its own.
+        self._key_locks: dict[tuple[asyncio.AbstractEventLoop, Hashable], _KeyLock] = {}
+
+    def submit(
+        self,
+        fn: Callable[..., Coroutine[Any, Any, Any]],
+        *args: Any,
+        priority: int = HIGH,
+        key: Hashable | None = None,
+        kind: str | None = None,
+        size: int = 0,
+    ) -> None:
+        """Run ``fn(*args)`` in the background of the current event loop."""
+        if self._group is None:
+            cap = self._cap()
+            limit = _admission_limit(self._overflow, priority, cap)
+            fire_and_forget(
+                self._coro(fn, args, key, kind),
+                limit=limit,
+                cap=cap,
+                bulkhead=self._bulkhead,
+                key=key,
+                kind=kind,
+                size=size,
+            )
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            logger.debug("No running event loop; Steeper forward dropped")
+            return
+        self._put(loop, WorkItem(fn, args, priority, key, kind, size))
+
+    def submit_threadsafe(
+        self,
+        fn: Callable[..., Coroutine[Any, Any, Any]],
+        *args: Any,
+        priority: int = HIGH,
+        key: Hashable | None = None,
+        kind: str | None = None,
+        size: int = 0,
+    ) -> None:
+        """Run ``fn(*args)`` on the shared background loop, from any thread."""
+        if self._group is None:
+            cap = self._cap()
+            limit = _admission_limit(self._overflow, priority, cap)
+            fire_and_forget_threadsafe(
+                self._coro(fn, args, key, kind),
+                limit=limit,
+                cap=cap,
+                bulkhead=self._bulkhead,
+                key=key,
+                kind=kind,
+                size=size,
+            )
+            return
+        _background_loop.call_soon(self._put_here, WorkItem(fn, args, priority, key, kind, size))
+
+    @property
+    def bulkhead(self) -> Bulkhead:
+        """This scheduler's in-flight and drop accounting."""
+        return self._bulkhead
+
+    def _coro(
+        self,
+        fn: Callable[..., Coroutine[Any, Any, Any]],
+        args: tuple[Any, ...],
+        key: Hashable | None,
+        kind: str | None,
+    ) -> Coroutine[Any, Any, Any]:
+        ttl = self._staleness.ttl_for(kind) if self._staleness is not None else None
+        if ttl is not None:
+            fn = partial(self._unless_stale, time.monotonic() + ttl, fn)
+        if key is None or not self._ordered:
+            return fn(*args)
+        return self._in_order(key, fn, args)
+
+    async def _unless_stale(
+        self, deadline: float, fn: Callable[..., Coroutine[Any, Any, Any]], *args: Any
+    ) -> None:
+        """Run ``fn(*args)``, unless ``deadline`` passed while it waited for its turn."""
+        if time.monotonic() > deadline:
+            self._bulkhead.note_drop(_STALE, self._cap())
+            return
+        await fn(*args)
+
+    async def _in_order(
+        self, key: Hashable, fn: Callable[..., Coroutine[Any, Any, Any]], args: tuple[Any, ...]
+    ) -> None:
+        """Run ``fn(*args)`` once the work submitted before it with ``key`` is done.
+
+        Tasks start in the order they were created, and :class:`asyncio.Lock`
+        wakes its waiters first come, first served, so taking the key's lock is
+        enough to keep order. Work that was dropped never starts, so it never
+        holds up the work behind it. ``fn`` may release the lock early, with
+        :func:`pass_turn`.
+        """
+        slot = (asyncio.get_running_loop(), key)
+        entry = self._key_locks.get(slot)
+        if entry is None:
+            entry = self._key_locks[slot] = _KeyLock()
+        entry.users += 1
+        held = False
+
+        def release() -> None:
+            nonlocal held
+            if held:
+                held = False
+                entry.lock.release()
+
+        try:
+            await entry.lock.acquire()
+            held = True
+            turn = _turn.set(release)
+            try:
+                await fn(*args)
+            finally:
+                _turn.reset(turn)
+                release()
+        finally:
+            entry.users -= 1
+            if not entry.users:
+                del self._key_locks[slot]
+
+    def _cap(self) -> int:
+        return self._limiter.current if self._limiter is not None else MAX_IN_FLIGHT
+
+    def _put_here(self, item: WorkItem) -> None:
+        self._put(asyncio.get_running_loop(), item)
+
+    def _put(self, loop: asyncio.AbstractEventLoop, item: WorkItem) -> None:
+        assert self._group is not None
+        pool = self._group.pool(loop)
+        lane = self._lanes.get(pool)
+        if lane is None:
+            lane = self._lanes[pool] = pool.add_lane(
+                bulkhead=self._bulkhead,
+                limiter=self._limiter,
+                overflow=self._overflow,
+                ordered=self._ordered,
+                staleness=self._staleness,
+            )
+        pool.put(item, lane)
+
+    async def drain(self, timeout: float) -> int:
+        """Stop admitting work and wait up to ``timeout`` seconds for what was admitted.
+
+        Queued work still runs, on its usual engine, so batching and ordering
+        apply to it as before. Returns how many forwards were still pending at
+        the deadline.
+        """
+        bulkhead = self._bulkhead
+        bulkhead.close()
+        if bulkhead.in_flight:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(bulkhead.drained(), timeout)
+        return bulkhead.in_flight
+
+    def close(self) -> None:
+        """Stop the worker pool of the running loop, if this scheduler started one.
+
+        In shared pools, only this scheduler's queued work is discarded.
+        """
+        if self._group is None:
+            return
+        if self._owns_pools:
+            self._group.close()
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        pool = self._group.pool(loop)
+        lane = self._lanes.pop(pool, None)
+        if lane is not None:
+            pool.discard(lane)
@@ -0,0 +1,158 @@
+"""Micro-batching of forwards into bulk requests.
+
+A polling bot receives updates in bursts — one ``getUpdates`` response can carry
+a hundred of them — and forwarding each with its own POST multiplies request
+count, headers and TLS records by the burst size. :class:`Batcher` coalesces
+items submitted within a short window (or until a size limit) into a single
+call of a bulk ``send`` function.
+
+Every submitter waits for the batch holding its item to be sent, so an item
+keeps occupying its in-flight slot in :mod:`steeper._background` until it has
+actually left the process; batching never lets work escape the in-flight cap.
+It does pass on its chat's turn (:func:`~steeper._background.pass_turn`) as
+soon as the item is in a batch: the batch keeps their order, and the chat's
+next forwards can join the same request instead of waiting for this one.
+
+That makes the batcher responsible for the order the chat's turn kept until
+then. A batcher sends one batch at a time, each once the one before it has
+been settled, and batchers sharing a :class:`SendOrder` (the repository's
+update and outgoing-message batchers) take turns the same way: a reply's batch
+is never sent while its update's batch may still be on its way, so the backend
+never sees a message to a user it hasn't stored yet.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any, Generic, TypeVar
+
+from steeper._background import pass_turn
+
+logger = logging.getLogger("steeper")
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class _Batch(Generic[T, R]):
+    __slots__ = ("items", "sent")
+
+    def __init__(self, sent: asyncio.Future[R]) -> None:
+        self.items: list[T] = []
+        self.sent = sent
+
+
+class SendOrder:
+    """The order several batchers' sends go out in: one at a time, as flushed.
+
+    Batchers join in priority order. Flushing one first flushes whatever the
+    batchers ahead of it hold, so a batch never overtakes items that were
+    waiting in an earlier batcher's window.
+    """
+
+    def __init__(self) -> None:
+        self._members: list[Batcher[Any, Any]] = []
+        # The send that goes out last so far, which the next one waits for.
+        self.last: asyncio.Task[Any] | None = None
+
+    def join(self, batcher: Batcher[Any, Any]) -> None:
+        self._members.append(batcher)
+
+    def flush_ahead_of(self, batcher: Batcher[Any, Any]) -> None:
+        for member in self._members:
+            if member is batcher:
+                return
+            member._flush_pending()
+
+
+class Batcher(Generic[T, R]):
+    """Collect items for up to ``max_delay`` seconds or ``max_size`` items, then send them.
+
+    Every submitter gets back what ``send`` returned for its batch. Batches go
+    out one after another, each once the previous one has been settled; pass
+    ``order`` to share that sequence with other batchers. Bound to the event
+    loop of its first :meth:`add`, like the ``httpx.AsyncClient`` the ``send``
+    function uses.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[list[T]], Awaitable[R]],
+        *,
+        max_size: int,
+        max_delay: float,
+        order: SendOrder | None = None,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("batch size must be at least 1")
+        if max_delay < 0:
+            raise ValueError("batch window must not be negative")
+        self._send = send
+        self._max_size = max_size
+        self._max_delay = max_delay
+        self._order = order if order is not None else SendOrder()
+        self._order.join(self)
+        self._pending: _Batch[T, R] | None = None
+        self._timer: asyncio.TimerHandle | None = None
+        # Strong references to batches being sent; the loop only holds weak ones.
+        self._sending: set[asyncio.Task[Any]] = set()
+
+    async def add(self, item: T) -> R:
+        """Queue ``item`` and return once the batch holding it has been sent."""
+        loop = asyncio.get_running_loop()
+        batch = self._pending
+        if batch is None:
+            batch = self._pending = self._open(loop.create_future())
+            self._timer = loop.call_later(self._max_delay, self._flush_pending)
+        if self._place(batch, item):
+            self._flush_pending()
+        # Its place in the batch keeps its order now; the key's next forward may join.
+        pass_turn()
+        # Shielded: one submitter giving up must not cancel its neighbours' send.
+        return await asyncio.shield(batch.sent)
+
+    def _open(self, sent: asyncio.Future[R]) -> _Batch[T, R]:
+        return _Batch(sent)
+
+    def _place(self, batch: _Batch[T, R], item: T) -> bool:
+        """Add ``item`` to ``batch``; whether the batch is now full."""
+        batch.items.append(item)
+        return len(batch.items) >= self._max_size
+
+    async def flush(self) -> None:
+        """Send whatever is pending now and wait for every batch still in flight."""
+        self._flush_pending()
+        if self._sending:
+            await asyncio.gather(*self._sending, return_exceptions=True)
+
+    def _flush_pending(self) -> None:
+        batch, self._pending = self._pending, None
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if batch is None:
+            return
+        order = self._order
+        order.flush_ahead_of(self)
+        task = asyncio.get_running_loop().create_task(self._send_batch(batch, order.last))
+        order.last = task
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def _send_batch(self, batch: _Batch[T, R], previous: asyncio.Task[Any] | None) -> None:
+        if previous is not None and not previous.done():
+            # Settled, not necessarily successful: a failed batch was still answered.
+            await asyncio.wait((previous,))
+        try:
+            result = await self._send(batch.items)
+        except Exception as exc:
+            # Surface the failure to every submitter; each logs it where its
+            # forward was scheduled.
+            batch.sent.set_exception(exc)
+            # Mark it retrieved, so a batch whose submitters all gave up doesn't
+            # warn about an exception that was never retrieved.
+            batch.sent.exception()
+        else:
+            batch.sent.set_result(result)
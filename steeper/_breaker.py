@@ -0,0 +1,129 @@
+"""Circuit breaker for :class:`~steeper._client.SteeperClient`.
+
+While the backend is down, every forward would otherwise build its payload,
+occupy an in-flight slot and wait out the full client timeout, only to fail.
+The breaker notices a run of failures and *opens*: from then on the client
+fails requests instantly, and the integrations — which check
+:attr:`CircuitBreaker.is_open` synchronously — skip serializing and scheduling
+forwards altogether. After ``reset_timeout`` it lets a single probe request
+through (*half-open*); the probe's outcome closes the breaker again or re-opens
+it for another ``reset_timeout``.
+
+Only failures that say something about the backend's health count: network
+errors and transient statuses. A 4xx is a healthy backend answering.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+
+logger = logging.getLogger("steeper")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+@dataclass(frozen=True, slots=True)
+class CircuitBreakerPolicy:
+    """When :class:`~steeper._client.SteeperClient` stops calling a failing backend.
+
+    Args:
+        failure_threshold: Consecutive failed requests that open the breaker.
+        reset_timeout: Seconds the breaker stays open before probing the backend.
+        probes: Requests let through at once while probing.
+    """
+
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+    probes: int = 1
+
+    def __post_init__(self) -> None:
+        if self.failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        if self.reset_timeout <= 0:
+            raise ValueError("reset_timeout must be positive")
+        if self.probes < 1:
+            raise ValueError("probes must be at least 1")
+
+
+#: The policy clients use unless told otherwise.
+DEFAULT_CIRCUIT_BREAKER = CircuitBreakerPolicy()
+
+
+class CircuitBreaker:
+    """Closed / open / half-open state machine around the client's requests.
+
+    :meth:`allow` and :meth:`record` run on the client's event loop only. The
+    integrations read :attr:`is_open` from any thread; it is a single float
+    comparison, so it needs no lock and a stale read costs at most one payload.
+    """
+
+    def __init__(self, policy: CircuitBreakerPolicy) -> None:
+        self._policy = policy
+        self._state = CLOSED
+        self._failures = 0
+        self._open_until = 0.0
+        self._probes_in_flight = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() >= self._open_until:
+            return HALF_OPEN
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """Whether requests are being refused outright right now."""
+        return self._state == OPEN and time.monotonic() < self._open_until
+
+    def allow(self) -> bool:
+        """Whether a request may be sent; in half-open state, claims a probe slot."""
+        if self._state == CLOSED:
+            return True
+        if self._state == OPEN:
+            if time.monotonic() < self._open_until:
+                return False
+            self._state = HALF_OPEN
+        if self._probes_in_flight >= self._policy.probes:
+            return False
+        self._probes_in_flight += 1
+        return True
+
+    def record(self, healthy: bool) -> None:
+        """Account for the outcome of a request :meth:`allow` let through."""
+        if self._state == HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            if healthy:
+                self._close()
+            else:
+                self._open()
+            return
+        if healthy:
+            self._failures = 0
+            return
+        self._failures += 1
+        if self._state == CLOSED and self._failures >= self._policy.failure_threshold:
+            self._open()
+
+    def _open(self) -> None:
+        if self._state == CLOSED:
+            logger.warning(
+                "Steeper backend failed %d requests in a row; pausing forwards for %.0fs "
+                "before probing it again",
+                self._failures,
+                self._policy.reset_timeout,
+            )
+        self._state = OPEN
+        self._open_until = time.monotonic() + self._policy.reset_timeout
+
+    def _close(self) -> None:
+        logger.info("Steeper backend is reachable again; resuming forwards")
+        self._state = CLOSED
+        self._failures = 0
+
+
+class CircuitOpenError(Exception):
+    """Raised by the client instead of sending a request while the breaker is open."""
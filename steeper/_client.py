@@ -1,24 +1,151 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import time
+from collections.abc import Awaitable, Callable, Hashable, Sequence
 from typing import Any
 
 import httpx
 
+from steeper._background import AdaptiveLimit
+from steeper._breaker import (
+    DEFAULT_CIRCUIT_BREAKER,
+    CircuitBreaker,
+    CircuitBreakerPolicy,
+    CircuitOpenError,
+)
+from steeper._codec import AUTO, Body, JsonCodec, resolve_codec
+from steeper._compression import CompressionPolicy, compressor
 from steeper._config import SteeperConfig
+from steeper._metrics import registry
+from steeper._retry import RetryBudget, RetryPolicy, parse_retry_after
+from steeper._transport import TransportPolicy
 
 logger = logging.getLogger("steeper")
 
+# Statuses meaning the backend has no bulk endpoint (an older deployment), as
+# opposed to rejecting this particular batch.
+_BULK_UNSUPPORTED = frozenset({404, 405, 501})
+
+# Statuses worth sending again later: the backend (or a proxy in front of it)
+# is overloaded or briefly unavailable. Every other 4xx is a final answer about
+# the payload itself and would fail the same way again.
+_TRANSIENT_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+_SENT = registry.counter(
+    "steeper_sent_total", "Updates and bot messages the backend accepted.", ("kind",)
+)
+_REQUESTS = registry.counter(
+    "steeper_requests_total",
+    'Requests to the backend by endpoint and HTTP status ("error": no response).',
+    ("endpoint", "status"),
+)
+_BYTES_SENT = registry.counter(
+    "steeper_request_bytes_total", "Request body bytes sent to the backend.", ("endpoint",)
+)
+_LATENCY = registry.histogram(
+    "steeper_request_duration_seconds", "Backend request latency, per attempt.", ("endpoint",)
+)
+
+
+# The backend doesn't understand the Content-Encoding it was sent.
+_UNSUPPORTED_MEDIA_TYPE = 415
+
+
+def _settled(exc: httpx.HTTPError) -> bool:
+    """Whether a failed request got a final answer, i.e. resending it is pointless."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code not in _TRANSIENT_STATUSES
+    return False
+
 
 class SteeperClient:
-    """Async HTTP client that forwards data to the Steeper backend."""
+    """Async HTTP client that forwards data to the Steeper backend.
+
+    Every send returns whether the backend *settled* the data: ``True`` once it
+    was accepted or rejected for good, ``False`` when the failure was transient
+    (a network error, a 5xx, a 429) and sending it again later may succeed.
+    Callers that don't resend can ignore the result.
 
-    def __init__(self, config: SteeperConfig, *, timeout: float = 10.0) -> None:
+    With a :class:`~steeper._retry.RetryPolicy`, transient failures are retried
+    with backoff before a send reports them; without one, every request is tried
+    once.
+
+    A :class:`~steeper._breaker.CircuitBreaker` (on by default; pass
+    ``circuit_breaker=None`` to disable it) stops sending after a run of failures,
+    so an outage costs a failed send a few microseconds instead of the full timeout.
+
+    A :class:`~steeper._transport.TransportPolicy` tunes the connection pool,
+    per-phase timeouts and HTTP/2; ``timeout`` covers every phase it leaves unset.
+
+    With a :class:`~steeper._compression.CompressionPolicy`, request bodies of at
+    least ``min_bytes`` are compressed and sent with a ``Content-Encoding`` header.
+
+    Bodies are serialized by ``codec`` (see :func:`~steeper._codec.resolve_codec`;
+    orjson or msgspec when installed), once per request whatever the retries.
+    Updates may also be given already encoded, as bytes; they are sent as they
+    are, and spliced into bulk requests without being decoded.
+
+    Given a ``limiter``, every request's latency and outcome are fed to that
+    :class:`~steeper._background.AdaptiveLimit`.
+
+    Given ``http``, an ``httpx.AsyncClient`` shared with other bots (see
+    :class:`~steeper.SteeperHub`), requests go through its connection pool
+    instead of one of the client's own. Its timeouts and transport settings
+    apply, so ``transport`` must be left unset and ``timeout`` is not used;
+    :meth:`close` leaves ``http`` open.
+    """
+
+    def __init__(
+        self,
+        config: SteeperConfig,
+        *,
+        timeout: float = 10.0,
+        retry: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreakerPolicy | None = DEFAULT_CIRCUIT_BREAKER,
+        transport: TransportPolicy | None = None,
+        compression: CompressionPolicy | None = None,
+        codec: str | JsonCodec = AUTO,
+        limiter: AdaptiveLimit | None = None,
+        http: httpx.AsyncClient | None = None,
+    ) -> None:
         self._config = config
-        # verify defaults to True; keep it explicit so TLS validation is never
-        # silently disabled by a future refactor.
-        self._http = httpx.AsyncClient(timeout=timeout, verify=True)
+        self._limiter = limiter
+        self._codec = resolve_codec(codec)
+        self._owns_http = http is None
+        if http is None:
+            http = (transport or TransportPolicy()).client(timeout)
+        elif transport is not None:
+            raise ValueError("a shared HTTP client brings its own transport settings")
+        self._http = http
+        self._retry = retry
+        self._retry_budget = (
+            RetryBudget(ratio=retry.budget_ratio, burst=retry.budget_burst)
+            if retry is not None
+            else None
+        )
+        self._breaker = CircuitBreaker(circuit_breaker) if circuit_breaker is not None else None
+        # Bulk endpoints the backend turned out not to know, so later batches
+        # don't pay for a doomed request first.
+        self._bulk_unsupported: set[str] = set()
+        self._compression = compression
+        self._compress = compressor(compression) if compression is not None else None
+        # Built once; httpx copies them into each request's own Headers.
+        self._headers = {**config.auth_headers, "content-type": "application/json"}
+        self._compressed_headers = (
+            {**self._headers, "content-encoding": compression.algorithm}
+            if compression is not None
+            else self._headers
+        )
+        # Metric label per URL, so the latency histogram has a handful of series.
+        self._endpoints = {
+            config.webhook_url: "webhook",
+            config.webhook_batch_url: "webhook_batch",
+            config.bot_message_url: "bot_message",
+            config.bot_message_batch_url: "bot_message_batch",
+        }
 
     def _redact(self, message: str) -> str:
         """Strip the auth secret from text headed for the logs.
@@ -28,19 +155,51 @@ class SteeperClient:
         """
         return message.replace(self._config.token_hash, "***")
 
-    async def forward_update(self, update: dict[str, Any]) -> None:
+    @property
+    def codec(self) -> JsonCodec:
+        """The JSON codec request bodies are encoded with."""
+        return self._codec
+
+    @property
+    def accepting(self) -> bool:
+        """``False`` while the circuit breaker refuses requests; cheap and thread-safe.
+
+        Integrations check this before building a payload, so an outage costs
+        them nothing per update.
+        """
+        return self._breaker is None or not self._breaker.is_open
+
+    async def forward_update(self, update: Body) -> bool:
         """POST a raw Telegram Update to the Steeper webhook endpoint."""
         try:
-            resp = await self._http.post(
-                self._config.webhook_url,
-                json=update,
-                headers={
-                    "x-telegram-bot-api-secret-token": self._config.token_hash,
-                },
-            )
+            resp = await self._post(self._config.webhook_url, update)
             resp.raise_for_status()
+        except CircuitOpenError:
+            return False
         except httpx.HTTPError as exc:
             logger.warning("Steeper webhook failed: %s", self._redact(str(exc)))
+            return _settled(exc)
+        _SENT.inc("update")
+        return True
+
+    async def forward_updates(self, updates: Sequence[Body]) -> bool:
+        """POST several raw Telegram Updates in one request to the bulk webhook endpoint.
+
+        The body is ``{"updates": [...]}``; the backend answers with
+        ``{"results": [{"ok": true}, {"ok": false, "detail": "..."}, ...]}`` in
+        request order, so one bad update doesn't fail its neighbours. A backend
+        without the bulk endpoint (404/405/501) is remembered, and this batch and
+        every later one are sent as one request per update instead, concurrently.
+        """
+        return await self._post_bulk(
+            self._config.webhook_batch_url,
+            "updates",
+            updates,
+            send_one=self.forward_update,
+            kind="update",
+            label="webhook",
+            item_id="update_id",
+        )
 
     async def log_bot_message(
         self,
@@ -48,25 +207,286 @@ class SteeperClient:
         text: str,
         message_id: int,
         date: int | None = None,
-    ) -> None:
+    ) -> bool:
         """POST a bot-sent message to the Steeper bot-message endpoint."""
-        payload = {
-            "chat_id": chat_id,
-            "text": text,
-            "message_id": message_id,
-            "date": date or int(time.time()),
-        }
+        return await self._post_bot_message(_bot_message_payload(chat_id, text, message_id, date))
+
+    async def log_bot_messages(self, messages: Sequence[dict[str, Any]]) -> bool:
+        """POST several bot-sent messages in one request to the bulk bot-message endpoint.
+
+        Each item carries the :meth:`log_bot_message` fields (``chat_id``, ``text``,
+        ``message_id`` and optionally ``date``). The request and response shapes,
+        and the fallback for backends without the endpoint, mirror
+        :meth:`forward_updates`, with ``{"messages": [...]}`` as the body.
+        """
+        payloads = [
+            _bot_message_payload(m["chat_id"], m["text"], m["message_id"], m.get("date"))
+            for m in messages
+        ]
+        return await self._post_bulk(
+            self._config.bot_message_batch_url,
+            "messages",
+            payloads,
+            send_one=self._post_bot_message,
+            kind="message",
+            label="bot-message log",
+            item_id="message_id",
+            order_key=_message_key,
+        )
+
+    async def _post_bot_message(self, payload: Body) -> bool:
         try:
-            resp = await self._http.post(
-                self._config.bot_message_url,
-                json=payload,
-                headers={
-                    "x-telegram-bot-api-secret-token": self._config.token_hash,
-                },
-            )
+            resp = await self._post(self._config.bot_message_url, payload)
             resp.raise_for_status()
+        except CircuitOpenError:
+            return False
         except httpx.HTTPError as exc:
             logger.warning("Steeper bot-message log failed: %s", self._redact(str(exc)))
+            return _settled(exc)
+        _SENT.inc("message")
+        return True
+
+    async def _post_bulk(
+        self,
+        url: str,
+        field: str,
+        items: Sequence[Body],
+        *,
+        send_one: Callable[[Body], Awaitable[bool]],
+        kind: str,
+        label: str,
+        item_id: str,
+        order_key: Callable[[Body], Hashable] | None = None,
+    ) -> bool:
+        """Send ``items`` as ``{field: items}`` to a bulk endpoint, one by one if it is missing.
+
+        One by one means one request each, concurrently; only items with the same
+        ``order_key`` (versions of one message) wait for each other.
+        """
+        if not items:
+            return True
+        if len(items) == 1 or url in self._bulk_unsupported:
+            return await _send_each(items, send_one, order_key)
+        try:
+            resp = await self._post(url, self._bulk_body(field, items))
+            if resp.status_code in _BULK_UNSUPPORTED:
+                self._bulk_unsupported.add(url)
+                logger.info(
+                    "Steeper backend has no bulk %s endpoint (HTTP %d); sending one per request",
+                    label,
+                    resp.status_code,
+                )
+                return await _send_each(items, send_one, order_key)
+            resp.raise_for_status()
+        except CircuitOpenError:
+            return False
+        except httpx.HTTPError as exc:
+            logger.warning(
+                "Steeper batch %s failed (%d items): %s",
+                label,
+                len(items),
+                self._redact(str(exc)),
+            )
+            return _settled(exc)
+        rejected = _rejected_items(resp, items)
+        _SENT.inc(kind, amount=len(items) - len(rejected))
+        for item, detail in rejected:
+            logger.warning(
+                "Steeper %s rejected %s %s: %s",
+                label,
+                item_id,
+                self._item_field(item, item_id),
+                self._redact(detail),
+            )
+        return True
+
+    def _bulk_body(self, field: str, items: Sequence[Body]) -> Any:
+        """``{field: items}``; encoded here by splicing, if some items are bytes already."""
+        if not any(isinstance(item, bytes) for item in items):
+            return {field: list(items)}
+        encode = self._codec.encode
+        parts = [item if isinstance(item, bytes) else encode(item) for item in items]
+        return b'{"' + field.encode() + b'":[' + b",".join(parts) + b"]}"
+
+    def _item_field(self, item: Body, name: str) -> Any:
+        """``item[name]``, decoding ``item`` first if it is bytes; for log messages only."""
+        if isinstance(item, bytes):
+            try:
+                item = self._codec.decode(item)
+            except Exception:
+                return None
+        return item.get(name) if isinstance(item, dict) else None
+
+    def _encode(self, payload: Any, *, compress: bool = True) -> tuple[bytes, dict[str, str]]:
+        """Serialize ``payload`` once for every attempt: the body and its headers.
+
+        Bytes are taken to be JSON already and sent as they are.
+        """
+        body = payload if isinstance(payload, bytes) else self._codec.encode(payload)
+        policy = self._compression
+        if compress and self._compress is not None and policy is not None:
+            if len(body) >= policy.min_bytes:
+                return self._compress(body), self._compressed_headers
+        return body, self._headers
+
+    async def _post(self, url: str, payload: Any) -> httpx.Response:
+        """POST ``payload`` as JSON with the auth header, retrying per the policy.
+
+        Returns the final response whatever its status; raises the final
+        :class:`httpx.TransportError` if no attempt got one, and
+        :class:`~steeper._breaker.CircuitOpenError` if the breaker refused one.
+        """
+        body, headers = self._encode(payload)
+        resp = await self._post_body(url, body, headers)
+        if resp.status_code == _UNSUPPORTED_MEDIA_TYPE and "content-encoding" in headers:
+            logger.info(
+                "Steeper backend does not accept %s request bodies; sending them uncompressed",
+                headers["content-encoding"],
+            )
+            self._compress = None
+            body, headers = self._encode(payload, compress=False)
+            resp = await self._post_body(url, body, headers)
+        return resp
+
+    async def _post_body(self, url: str, body: bytes, headers: dict[str, str]) -> httpx.Response:
+        policy, budget = self._retry, self._retry_budget
+        if policy is None or budget is None:
+            return await self._attempt(url, body, headers)
+        budget.deposit()
+        deadline = time.monotonic() + policy.deadline
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                resp = await self._attempt(url, body, headers)
+            except httpx.TransportError as exc:
+                delay = _retry_delay(policy, budget, attempt, deadline, None)
+                if delay is None:
+                    raise
+                reason = self._redact(str(exc)) or type(exc).__name__
+            else:
+                if resp.status_code not in _TRANSIENT_STATUSES:
+                    return resp
+                retry_after = parse_retry_after(resp.headers.get("retry-after"))
+                delay = _retry_delay(policy, budget, attempt, deadline, retry_after)
+                if delay is None:
+                    return resp
+                reason = f"HTTP {resp.status_code}"
+            logger.debug("Steeper request failed (%s); retry %d in %.2fs", reason, attempt, delay)
+            await asyncio.sleep(delay)
+
+    async def _attempt(self, url: str, body: bytes, headers: dict[str, str]) -> httpx.Response:
+        """Send one request, through the circuit breaker if there is one."""
+        breaker = self._breaker
+        if breaker is None:
+            return await self._send(url, body, headers)
+        if not breaker.allow():
+            raise CircuitOpenError(url)
+        healthy = False
+        try:
+            resp = await self._send(url, body, headers)
+            healthy = resp.status_code not in _TRANSIENT_STATUSES
+            return resp
+        finally:
+            breaker.record(healthy)
+
+    async def _send(self, url: str, body: bytes, headers: dict[str, str]) -> httpx.Response:
+        """POST once, recording status, size and latency in :mod:`steeper._metrics`."""
+        endpoint = self._endpoints.get(url, "other")
+        ok = False
+        start = time.perf_counter()
+        try:
+            resp = await self._http.post(url, content=body, headers=headers)
+            ok = resp.status_code not in _TRANSIENT_STATUSES
+        except httpx.TransportError:
+            _REQUESTS.inc(endpoint, "error")
+            raise
+        finally:
+            latency = time.perf_counter() - start
+            _LATENCY.observe(latency, endpoint)
+            if self._limiter is not None:
+                self._limiter.record(start, latency, ok)
+        _REQUESTS.inc(endpoint, str(resp.status_code))
+        _BYTES_SENT.inc(endpoint, amount=len(body))
+        return resp
 
     async def close(self) -> None:
-        await self._http.aclose()
+        if self._owns_http:
+            await self._http.aclose()
+
+
+def _retry_delay(
+    policy: RetryPolicy,
+    budget: RetryBudget,
+    attempt: int,
+    deadline: float,
+    retry_after: float | None,
+) -> float | None:
+    """Seconds to wait before retrying after failed ``attempt``, or ``None`` to give up."""
+    if attempt >= policy.attempts:
+        return None
+    delay = policy.delay(attempt, retry_after)
+    if delay is None or time.monotonic() + delay > deadline:
+        return None
+    # Checked last, so a retry that is refused anyway doesn't spend a token.
+    if not budget.withdraw():
+        return None
+    return delay
+
+
+async def _send_each(
+    items: Sequence[Body],
+    send_one: Callable[[Body], Awaitable[bool]],
+    order_key: Callable[[Body], Hashable] | None = None,
+) -> bool:
+    """Send each item in a request of its own; whether every one was settled."""
+    if len(items) == 1:
+        return await send_one(items[0])
+    runs: dict[Hashable, list[Body]] = {}
+    for index, item in enumerate(items):
+        runs.setdefault(index if order_key is None else order_key(item), []).append(item)
+    return all(await asyncio.gather(*(_send_run(run, send_one) for run in runs.values())))
+
+
+async def _send_run(run: list[Body], send_one: Callable[[Body], Awaitable[bool]]) -> bool:
+    settled = True
+    for item in run:
+        settled = await send_one(item) and settled
+    return settled
+
+
+def _message_key(body: Body) -> Hashable:
+    # Versions of one message go in order, so the last one logged is the last sent.
+    if isinstance(body, dict):
+        return body.get("chat_id"), body.get("message_id")
+    return id(body)
+
+
+def _bot_message_payload(
+    chat_id: int, text: str, message_id: int, date: int | None
+) -> dict[str, Any]:
+    return {
+        "chat_id": chat_id,
+        "text": text,
+        "message_id": message_id,
+        "date": date or int(time.time()),
+    }
+
+
+def _rejected_items(resp: httpx.Response, items: Sequence[Body]) -> list[tuple[Body, str]]:
+    """Pair each item the bulk endpoint reported as failed with the reason given.
+
+    A 2xx without a well-formed ``results`` list means the batch was accepted as
+    a whole, so nothing is reported.
+    """
+    try:
+        results = resp.json().get("results")
+    except (ValueError, AttributeError):
+        return []
+    if not isinstance(results, list):
+        return []
+    rejected = []
+    for item, result in zip(items, results, strict=False):
+        if isinstance(result, dict) and result.get("ok") is False:
+            rejected.append((item, str(result.get("detail", "rejected"))))
+    return rejected
@@ -0,0 +1,76 @@
+"""Coalescing of rapid edits to the same message.
+
+Bots that stream generated text edit one message many times a second, and
+every ``editMessageText`` returns the message, which the outgoing hooks turn
+into a snapshot to log. Only the last version matters to the backend.
+:class:`Coalescer` holds items for a short window, keeps the latest per key
+(``(chat_id, message_id)`` for outgoing messages) and sends what is left in one
+call, so a stream of edits costs one request per window instead of one each.
+
+It is a :class:`~steeper._batch.Batcher` whose batches are windows, so it waits,
+hands on the chat's turn and sends the same way. In particular a window goes
+out only once the previous one has been settled: otherwise a slow send of an
+older version could reach the backend after a newer one and overwrite it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Generic, TypeVar
+
+from steeper._batch import Batcher, _Batch
+from steeper._metrics import registry
+
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+
+_COALESCED = registry.counter(
+    "steeper_coalesced_total", "Outgoing message snapshots superseded by a newer version."
+)
+
+
+class _Window(_Batch[T, None], Generic[K, T]):
+    __slots__ = ("positions",)
+
+    def __init__(self, sent: asyncio.Future[None]) -> None:
+        super().__init__(sent)
+        # Where each key's item sits in ``items``.
+        self.positions: dict[K, int] = {}
+
+
+class Coalescer(Batcher[T, None], Generic[K, T]):
+    """Collect items for ``window`` seconds, keeping the latest per ``key``, then send them.
+
+    Items keep the position of the first one with their key. Bound to the event
+    loop of its first :meth:`add`.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[list[T]], Awaitable[None]],
+        *,
+        key: Callable[[T], K],
+        window: float,
+    ) -> None:
+        if window < 0:
+            raise ValueError("coalesce window must not be negative")
+        # Never full: a window closes when its time is up.
+        super().__init__(send, max_size=sys.maxsize, max_delay=window)
+        self._key = key
+
+    def _open(self, sent: asyncio.Future[None]) -> _Window[K, T]:
+        return _Window(sent)
+
+    def _place(self, batch: _Batch[T, None], item: T) -> bool:
+        assert isinstance(batch, _Window)
+        key = self._key(item)
+        position = batch.positions.get(key)
+        if position is None:
+            batch.positions[key] = len(batch.items)
+            batch.items.append(item)
+        else:
+            _COALESCED.inc()
+            batch.items[position] = item
+        return False
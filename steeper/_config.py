@@ -3,7 +3,9 @@ from __future__ import annotations
 import hashlib
 import hmac
 import logging
+from collections.abc import Mapping
 from dataclasses import dataclass, field
+from types import MappingProxyType
 from urllib.parse import quote, urlsplit
 
 logger = logging.getLogger("steeper")
@@ -27,6 +29,15 @@ class SteeperConfig:
     # config — e.g. in tracebacks, logs, or debugger output.
     bot_token: str = field(repr=False)
 
+    # Derived once in __post_init__: every forward reads them, and the hash and
+    # URLs would otherwise cost a SHA-256 and a few f-strings per request.
+    _token_hash: str = field(init=False, repr=False, compare=False)
+    _webhook_url: str = field(init=False, repr=False, compare=False)
+    _bot_message_url: str = field(init=False, repr=False, compare=False)
+    _webhook_batch_url: str = field(init=False, repr=False, compare=False)
+    _bot_message_batch_url: str = field(init=False, repr=False, compare=False)
+    _auth_headers: Mapping[str, str] = field(init=False, repr=False, compare=False)
+
     def __post_init__(self) -> None:
         parts = urlsplit(self.base_url)
         # Reject anything that is not a plain http(s) URL. This prevents the
@@ -54,22 +65,49 @@ class SteeperConfig:
                 host,
             )
 
+        token_hash = hashlib.sha256(self.bot_token.encode()).hexdigest()
+        webhook_url = (
+            f"{self.base_url.rstrip('/')}/v1/communications/webhook/{quote(self.bot_id, safe='')}"
+        )
+        # Frozen: set through object.__setattr__, as dataclasses do themselves.
+        object.__setattr__(self, "_token_hash", token_hash)
+        object.__setattr__(self, "_webhook_url", webhook_url)
+        object.__setattr__(self, "_bot_message_url", f"{webhook_url}/bot-message")
+        object.__setattr__(self, "_webhook_batch_url", f"{webhook_url}/batch")
+        object.__setattr__(self, "_bot_message_batch_url", f"{webhook_url}/bot-message/batch")
+        object.__setattr__(
+            self,
+            "_auth_headers",
+            MappingProxyType({"x-telegram-bot-api-secret-token": token_hash}),
+        )
+
     @property
     def token_hash(self) -> str:
         """SHA-256 hex digest of the bot token, used by the backend for auth."""
-        return hashlib.sha256(self.bot_token.encode()).hexdigest()
+        return self._token_hash
 
     @property
-    def _base(self) -> str:
-        return self.base_url.rstrip("/")
+    def auth_headers(self) -> Mapping[str, str]:
+        """The header authenticating a request, read-only; merge it into your own."""
+        return self._auth_headers
 
     @property
     def webhook_url(self) -> str:
-        return f"{self._base}/v1/communications/webhook/{quote(self.bot_id, safe='')}"
+        return self._webhook_url
 
     @property
     def bot_message_url(self) -> str:
-        return f"{self._base}/v1/communications/webhook/{quote(self.bot_id, safe='')}/bot-message"
+        return self._bot_message_url
+
+    @property
+    def webhook_batch_url(self) -> str:
+        """Bulk counterpart of :attr:`webhook_url`; see :meth:`SteeperClient.forward_updates`."""
+        return self._webhook_batch_url
+
+    @property
+    def bot_message_batch_url(self) -> str:
+        """Bulk counterpart of :attr:`bot_message_url`."""
+        return self._bot_message_batch_url
 
     def secret_matches(self, candidate: str) -> bool:
         """Constant-time comparison helper for the auth secret."""
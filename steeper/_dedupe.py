@@ -0,0 +1,116 @@
+"""Dropping updates and messages that were already forwarded.
+
+The same update can reach a bot twice: Telegram redelivers a webhook that
+wasn't answered in time, and a handler can feed an update back into the
+dispatcher. The backend stores updates idempotently, but only after paying for
+the request and a database write. :class:`DedupeCache` remembers what was
+forwarded recently, so a repeat is dropped before it is even scheduled.
+
+The cache is per process: two processes briefly polling the same bot during a
+deploy still rely on the backend's idempotency for each other's updates.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Hashable
+from dataclasses import dataclass
+
+from steeper._metrics import registry
+
+_DEDUPLICATED = registry.counter(
+    "steeper_deduplicated_total", "Forwards dropped as repeats of recent ones.", ("kind",)
+)
+
+
+@dataclass(frozen=True, slots=True)
+class DedupePolicy:
+    """How many forwards :class:`~steeper.SteeperRepository` remembers, and for how long.
+
+    Args:
+        size: Keys kept per kind (updates, outgoing messages); the oldest go first.
+        ttl: Seconds a key is kept; a repeat arriving later is forwarded again.
+    """
+
+    size: int = 4096
+    ttl: float = 300.0
+
+    def __post_init__(self) -> None:
+        if self.size < 1:
+            raise ValueError("size must be at least 1")
+        if self.ttl <= 0:
+            raise ValueError("ttl must be positive")
+
+
+class DedupeCache:
+    """Recently seen keys, evicted by age and count.
+
+    Only hashes are kept, so an entry is two small ints and a timestamp
+    whatever the key. Checked from framework threads and event loops alike,
+    so guarded by a lock.
+    """
+
+    def __init__(self, policy: DedupePolicy, *, kind: str) -> None:
+        self._size = policy.size
+        self._ttl = policy.ttl
+        self._kind = kind
+        # Key hash -> (hash of its last value, when that value was first seen);
+        # insertion order is age order.
+        self._seen: dict[int, tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def first_sighting(self, key: Hashable, value: Hashable = None) -> bool:
+        """Record ``key`` with ``value``; ``False`` if it was seen within the TTL.
+
+        A key seen with another value counts as new and replaces that value, so
+        only a repeat of a key's latest value is dropped: an edit back to an
+        earlier text is logged, a repeat of the current one is not.
+        """
+        digest, value_digest, now = hash(key), hash(value), time.monotonic()
+        with self._lock:
+            if self._repeats(digest, value_digest, now):
+                _DEDUPLICATED.inc(self._kind)
+                return False
+            self._store(digest, value_digest, now)
+            return True
+
+    def seen(self, key: Hashable, value: Hashable = None) -> bool:
+        """Whether ``key`` was recorded with ``value`` within the TTL, without recording it.
+
+        For forwards that should only count once they are sent: check with this
+        before scheduling, then :meth:`record` what was delivered.
+        """
+        digest, value_digest, now = hash(key), hash(value), time.monotonic()
+        with self._lock:
+            if self._repeats(digest, value_digest, now):
+                _DEDUPLICATED.inc(self._kind)
+                return True
+            return False
+
+    def record(self, key: Hashable, value: Hashable = None) -> None:
+        """Remember ``key`` with ``value``, like a first sighting."""
+        digest, value_digest, now = hash(key), hash(value), time.monotonic()
+        with self._lock:
+            if not self._repeats(digest, value_digest, now):
+                self._store(digest, value_digest, now)
+
+    def _repeats(self, digest: int, value_digest: int, now: float) -> bool:
+        """Expire old keys, then check ``digest``; called with the lock held."""
+        seen = self._seen
+        expired = now - self._ttl
+        while seen:
+            oldest, (_, at) = next(iter(seen.items()))
+            if at > expired and len(seen) < self._size:
+                break
+            del seen[oldest]
+        last = seen.get(digest)
+        return last is not None and last[0] == value_digest
+
+    def _store(self, digest: int, value_digest: int, now: float) -> None:
+        # Re-inserted, not updated in place, to keep insertion order age order.
+        self._seen.pop(digest, None)
+        self._seen[digest] = (value_digest, now)
@@ -0,0 +1,118 @@
+"""Per-chat and per-update-type shares of the in-flight limit.
+
+The in-flight limit protects the process from a slow backend, but not the
+bot's conversations from each other: one chat flooding the bot (spam, a
+broadcast echo, a bot stuck in an edit loop) can fill most of it, and every
+other chat's forwards are then dropped. With a :class:`FairnessPolicy`, a
+scheduler admits a chat's forward only while that chat holds less than its
+share of the limit, so under overload the flood is what gets shed.
+
+Update types are held to their share only under contention, once the forwards
+in flight fill most of the limit. A bot whose traffic is mostly one type
+(callback queries from a keyboard-driven bot, say) may then use the whole
+limit while the backend keeps up, and the share keeps room for the other
+types only when slots run short. A chat's share applies always: one chat
+holding a tenth of the limit is a flood whatever else is in flight.
+
+Counting in-flight forwards per chat exactly would take memory for every chat
+seen, and a bot may see millions. :class:`Quotas` uses a count-min sketch
+instead — two fixed rows of counters indexed by two hashes of the chat id,
+read as the lower of the two. It never undercounts a chat, so no chat gets
+more than its share; a chat sharing both counters with busy ones may be held
+to less, which is rare with enough ``slots``.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Hashable
+from dataclasses import dataclass
+
+CHAT_QUOTA_REACHED = "chat quota reached"
+KIND_QUOTA_REACHED = "update type quota reached"
+QUOTA_REASONS = frozenset({CHAT_QUOTA_REACHED, KIND_QUOTA_REACHED})
+
+# Fraction of the limit in flight past which update types are held to their share.
+_CONTENTION = 0.75
+
+# Mixed into the chat id for the second row's hash.
+_SECOND_ROW_SALT = 0x9E3779B97F4A7C15
+
+
+@dataclass(frozen=True, slots=True)
+class FairnessPolicy:
+    """How much of the in-flight limit one chat, or one update type, may hold.
+
+    Args:
+        chat_share: Fraction of the limit the forwards of one chat may hold.
+            Every chat may hold at least one.
+        kind_share: Fraction of the limit the forwards of one update type
+            (``message``, ``callback_query``, ..., or ``outgoing`` for the bot's
+            own messages) may hold once three quarters of the limit is in
+            flight; below that, any type may take a free slot.
+        slots: Counters per row of the per-chat sketch; memory is fixed at 16
+            bytes per slot, however many chats there are.
+    """
+
+    chat_share: float = 0.1
+    kind_share: float = 0.5
+    slots: int = 4096
+
+    def __post_init__(self) -> None:
+        if not 0 < self.chat_share <= 1:
+            raise ValueError("chat_share must be in (0, 1]")
+        if not 0 < self.kind_share <= 1:
+            raise ValueError("kind_share must be in (0, 1]")
+        if self.slots < 1:
+            raise ValueError("slots must be at least 1")
+
+
+class Quotas:
+    """In-flight forwards per chat (approximately) and per update type (exactly).
+
+    Not thread-safe: the owning :class:`~steeper._background.Bulkhead` calls it
+    under its own lock.
+    """
+
+    def __init__(self, policy: FairnessPolicy) -> None:
+        self._policy = policy
+        self._slots = policy.slots
+        self._rows = (array("q", bytes(8 * policy.slots)), array("q", bytes(8 * policy.slots)))
+        # Update types are a few dozen names at most, so a plain dict is bounded.
+        self._kinds: dict[str, int] = {}
+
+    def chat_count(self, key: Hashable) -> int:
+        first, second = self._index(key)
+        return min(self._rows[0][first], self._rows[1][second])
+
+    def refusal(
+        self, key: Hashable | None, kind: str | None, cap: int, in_flight: int
+    ) -> str | None:
+        """Why one more forward of ``key`` and ``kind`` would exceed a share, if it would.
+
+        ``in_flight`` is how many of ``cap`` are taken; update types are held to
+        their share only once it nears ``cap``.
+        """
+        if key is not None:
+            if self.chat_count(key) >= max(1, int(cap * self._policy.chat_share)):
+                return CHAT_QUOTA_REACHED
+        if kind is not None and in_flight >= cap * _CONTENTION:
+            if self._kinds.get(kind, 0) >= max(1, int(cap * self._policy.kind_share)):
+                return KIND_QUOTA_REACHED
+        return None
+
+    def add(self, key: Hashable | None, kind: str | None, delta: int = 1) -> None:
+        if key is not None:
+            first, second = self._index(key)
+            self._rows[0][first] += delta
+            self._rows[1][second] += delta
+        if kind is not None:
+            count = self._kinds.get(kind, 0) + delta
+            if count:
+                self._kinds[kind] = count
+            else:
+                del self._kinds[kind]
+
+    def _index(self, key: Hashable) -> tuple[int, int]:
+        digest = hash(key)
+        return digest % self._slots, hash((digest, _SECOND_ROW_SALT)) % self._slots
@@ -0,0 +1,68 @@
+"""Many bots in one process, over one connection pool.
+
+Every :class:`~steeper.SteeperRepository` builds its own ``httpx.AsyncClient``,
+and with ``workers`` its own worker pool per event loop. That is right for a
+single bot, but a host running hundreds of them — all forwarding to the same
+backend — ends up with hundreds of keep-alive pools holding sockets and
+buffers, and as many sets of worker coroutines, mostly idle.
+
+A :class:`SteeperHub` owns one client and one set of worker pools, and every
+repository given ``hub=`` sends through them. What must stay per bot still
+does: each keeps its own circuit breaker, retry budget, adaptive limit and
+in-flight budget (its :class:`~steeper._background.Bulkhead`), and in the shared
+worker pools each gets a lane of its own that the workers serve in turn, so a
+bot with a deep backlog can't hold up the others.
+"""
+
+from __future__ import annotations
+
+import httpx
+
+from steeper._background import PoolGroup
+from steeper._transport import TransportPolicy
+
+
+class SteeperHub:
+    """One HTTP connection pool, and optionally worker pools, for many bots.
+
+    Pass the same hub as ``hub=`` to the :class:`~steeper.SteeperRepository` (or
+    integration middleware) of every bot::
+
+        hub = SteeperHub(workers=32, transport=TransportPolicy.high_throughput())
+        for bot_id, token in bots:
+            SteeperMiddleware(base_url=..., bot_id=bot_id, bot_token=token, hub=hub)
+
+    ``timeout`` and ``transport`` configure the shared client, in place of the
+    repositories' own; with ``workers``, forwards of every bot run on that many
+    worker coroutines per event loop. The connections belong to the event loop
+    that opens them, so share a hub among bots on one loop only (telebot bots
+    all forward from Steeper's background loop, so they may share one).
+
+    Close the repositories first and the hub last, with :meth:`aclose`.
+    """
+
+    def __init__(
+        self,
+        *,
+        timeout: float = 10.0,
+        transport: TransportPolicy | None = None,
+        workers: int | None = None,
+    ) -> None:
+        self._http = (transport or TransportPolicy()).client(timeout)
+        self._pools = PoolGroup(workers) if workers is not None else None
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """The client every bot sends through."""
+        return self._http
+
+    @property
+    def pools(self) -> PoolGroup | None:
+        """The worker pools every bot queues forwards in; ``None`` without ``workers``."""
+        return self._pools
+
+    async def aclose(self) -> None:
+        """Stop the worker pool of the running loop and close the connections."""
+        if self._pools is not None:
+            self._pools.close()
+        await self._http.aclose()
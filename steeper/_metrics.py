@@ -0,0 +1,215 @@
+"""In-process metrics, readable from Python and renderable as Prometheus text.
+
+Steeper runs inside someone else's bot, so everything it measures must be cheap
+on the hot path and must not pull in a metrics library. A :class:`Counter` or
+:class:`Histogram` update is a dict lookup and an add under a lock; a
+:class:`Gauge` costs nothing until it is read, because it is a callback.
+
+Everything registers on the process-wide :data:`registry` (exported as
+``steeper.metrics``)::
+
+    steeper.metrics.snapshot()   # {"steeper_dropped_total{reason=...}": 3.0, ...}
+    steeper.metrics.render()     # Prometheus text exposition format 0.0.4
+
+Serve :meth:`MetricsRegistry.render` from any HTTP endpoint the bot already has
+(or from ``prometheus_client``'s custom-collector hook) to scrape it.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator, Sequence
+from typing import TypeVar
+
+# Request latencies, in seconds: from a fast LAN round-trip to the default timeout.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values, strict=True))
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def samples(self) -> Iterator[tuple[str, float]]:
+        """``(name{labels}, value)`` pairs, the way Prometheus would show them."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines += [f"{key} {_format_value(value)}" for key, value in self.samples()]
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """A monotonically increasing total, optionally split by label values."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def samples(self) -> Iterator[tuple[str, float]]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_values, value in values:
+            yield f"{self.name}{_format_labels(self.labels, label_values)}", value
+
+
+class Gauge(_Metric):
+    """A value read from a callback whenever the metric is collected."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, read: Callable[[], float]) -> None:
+        super().__init__(name, help)
+        self._read = read
+
+    def value(self) -> float:
+        return float(self._read())
+
+    def samples(self) -> Iterator[tuple[str, float]]:
+        yield self.name, self.value()
+
+
+class _Series:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, buckets: int) -> None:
+        self.counts = [0] * buckets
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative ``le`` buckets, per label values."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        *,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple[str, ...], _Series] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = _Series(len(self.buckets))
+            if index < len(self.buckets):
+                series.counts[index] += 1
+            series.sum += value
+            series.count += 1
+
+    def count(self, *label_values: str) -> int:
+        series = self._series.get(label_values)
+        return series.count if series is not None else 0
+
+    def samples(self) -> Iterator[tuple[str, float]]:
+        with self._lock:
+            snapshot = [
+                (label_values, list(s.counts), s.sum, s.count)
+                for label_values, s in sorted(self._series.items())
+            ]
+        bucket_labels = (*self.labels, "le")
+        for label_values, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts, strict=True):
+                cumulative += n
+                le = _format_value(bound)
+                labels = _format_labels(bucket_labels, (*label_values, le))
+                yield f"{self.name}_bucket{labels}", cumulative
+            yield (
+                f"{self.name}_bucket{_format_labels(bucket_labels, (*label_values, '+Inf'))}",
+                count,
+            )
+            yield f"{self.name}_sum{_format_labels(self.labels, label_values)}", total
+            yield f"{self.name}_count{_format_labels(self.labels, label_values)}", count
+
+
+_M = TypeVar("_M", bound=_Metric)
+
+
+class MetricsRegistry:
+    """The metrics Steeper keeps, by name."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, read: Callable[[], float]) -> Gauge:
+        return self._register(Gauge(name, help, read))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        *,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets=buckets))
+
+    def _register(self, metric: _M) -> _M:
+        if metric.name in self._metrics:
+            raise ValueError(f"metric {metric.name!r} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> _Metric | None:
+        return self._metrics.get(name)
+
+    def snapshot(self) -> dict[str, float]:
+        """Every sample keyed by its Prometheus series name, e.g. ``name{label="x"}``."""
+        return {key: value for m in self._metrics.values() for key, value in m.samples()}
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        return "".join(m.render() + "\n" for m in self._metrics.values())
+
+
+#: The process-wide registry; also importable as ``steeper.metrics``.
+registry = MetricsRegistry()
@@ -0,0 +1,68 @@
+"""Raw updates captured at the host framework's transport layer.
+
+Every integration used to rebuild the update it forwards from the framework's
+parsed objects — ``Update.model_dump`` in aiogram, ``to_dict`` in PTB, a walk
+over every sub-object's ``.json`` in telebot. That is a full serialization
+round-trip per update, and not a faithful one: aiogram's dump adds a ``null``
+for every unset field, and fields the framework doesn't model are lost.
+
+Instead, each integration taps the point where Telegram's own JSON is decoded
+(the ``getUpdates`` response, or a webhook body where the framework exposes
+it) and puts the untouched update dicts in a :class:`RawUpdateCache`. The
+update hook then claims its update by ``update_id`` and forwards that, falling
+back to reconstruction only when nothing was captured.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable, Iterable
+from typing import Any
+
+#: Captured updates kept at most; getUpdates returns up to 100 at a time.
+DEFAULT_LIMIT = 1024
+
+
+class RawUpdateCache:
+    """Raw update dicts by ``update_id``, waiting for the update hook to claim them.
+
+    Filled and drained from whichever threads the framework uses, so guarded by
+    a lock. Bounded: updates nobody claims (the breaker was open, a handler
+    filter dropped them) are evicted oldest first.
+    """
+
+    def __init__(
+        self,
+        *,
+        decode: Callable[[bytes], Any],
+        limit: int = DEFAULT_LIMIT,
+    ) -> None:
+        self._decode = decode
+        self._limit = limit
+        self._updates: dict[int, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._updates)
+
+    def put_many(self, updates: Iterable[Any]) -> None:
+        """Keep every well-formed update in ``updates``; ignore anything else."""
+        with self._lock:
+            for update in updates:
+                if isinstance(update, dict) and isinstance(update.get("update_id"), int):
+                    self._updates[update["update_id"]] = update
+            while len(self._updates) > self._limit:
+                del self._updates[next(iter(self._updates))]
+
+    def put_response(self, content: str | bytes) -> None:
+        """Keep the updates of a raw ``getUpdates`` response body."""
+        if isinstance(content, str):
+            content = content.encode()
+        body = self._decode(content)
+        if isinstance(body, dict) and isinstance(body.get("result"), list):
+            self.put_many(body["result"])
+
+    def pop(self, update_id: int) -> dict[str, Any] | None:
+        """Claim the raw update with ``update_id``, if it was captured."""
+        with self._lock:
+            return self._updates.pop(update_id, None)
@@ -0,0 +1,122 @@
+"""Retry policy and retry budget for :class:`~steeper._client.SteeperClient`.
+
+Retries happen inside the forward coroutine, which always runs in the
+background (see :mod:`steeper._background`), so backing off never delays a
+handler — it only keeps the forward's in-flight slot busy for longer.
+
+Retrying is also how a client turns one outage into several: every failed
+request comes back ``attempts`` times. Two limits keep that bounded:
+
+- per request, ``attempts`` and ``deadline`` cap how long one forward keeps trying;
+- per client, a :class:`RetryBudget` caps retries to a fraction of the traffic,
+  so when *everything* fails the backend sees at most ``1 + budget_ratio`` times
+  the normal request rate instead of ``attempts`` times.
+"""
+
+from __future__ import annotations
+
+import email.utils
+import math
+import random
+import time
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class RetryPolicy:
+    """How :class:`~steeper._client.SteeperClient` retries transient failures.
+
+    Only network errors and transient statuses (408, 425, 429, 500, 502, 503, 504)
+    are retried; any other 4xx — 400, 403, 404 — is a final answer.
+
+    Args:
+        attempts: Total tries per request, the first one included.
+        backoff: Delay before the first retry, in seconds; doubles on each retry.
+        max_backoff: Ceiling for a single delay. A ``Retry-After`` longer than
+            this ends the retries rather than being cut short.
+        jitter: Spread each delay uniformly over ``[0, delay]`` ("full jitter"), so
+            a fleet of bots that failed together doesn't retry in lockstep.
+        deadline: Seconds after the first try past which no new try is started.
+        budget_ratio: Retries allowed per request sent, across the whole client.
+        budget_burst: Retries available up front, before traffic has earned any.
+    """
+
+    attempts: int = 3
+    backoff: float = 0.5
+    max_backoff: float = 10.0
+    jitter: bool = True
+    deadline: float = 30.0
+    budget_ratio: float = 0.1
+    budget_burst: float = 10.0
+
+    def __post_init__(self) -> None:
+        if self.attempts < 1:
+            raise ValueError("attempts must be at least 1")
+        if self.backoff < 0 or self.max_backoff < 0:
+            raise ValueError("backoff must not be negative")
+        if self.deadline <= 0:
+            raise ValueError("deadline must be positive")
+        if self.budget_ratio < 0 or self.budget_burst < 0:
+            raise ValueError("the retry budget must not be negative")
+
+    def delay(self, retry: int, retry_after: float | None = None) -> float | None:
+        """Seconds to wait before retry number ``retry`` (1-based), ``None`` for none.
+
+        A server-provided ``Retry-After`` wins over the computed backoff when it
+        is longer, and is not jittered: the server asked for that much. One past
+        ``max_backoff`` gives up instead: retrying before the server said it is
+        ready would only be refused again.
+        """
+        if retry_after is not None and retry_after > self.max_backoff:
+            return None
+        delay = min(self.max_backoff, self.backoff * 2.0 ** (retry - 1))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+class RetryBudget:
+    """Token bucket capping retries to a fraction of the requests sent.
+
+    Each request deposits ``ratio`` tokens (up to ``burst``); each retry spends
+    one. Used only from the client's event loop, so it needs no lock.
+    """
+
+    def __init__(self, *, ratio: float, burst: float) -> None:
+        self._ratio = ratio
+        self._burst = burst
+        self._tokens = burst
+
+    def deposit(self) -> None:
+        self._tokens = min(self._burst, self._tokens + self._ratio)
+
+    def withdraw(self) -> bool:
+        """Spend one retry if the budget allows it."""
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait per a ``Retry-After`` header (delta-seconds or an HTTP-date).
+
+    Delta-seconds may carry a fraction ("1.5"): the RFC asks for an integer, but
+    rate limiters commonly send one.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        pass
+    else:
+        return seconds if 0 <= seconds < math.inf else None
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
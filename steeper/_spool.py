@@ -0,0 +1,293 @@
+"""Durable on-disk spool for at-least-once delivery.
+
+Without a spool, delivery is at-most-once (see :mod:`steeper._background`):
+whatever is in flight when the backend is down, or when the process restarts,
+is gone. A :class:`Spool` records each forward on disk *before* it is sent and
+forgets it only once the backend has settled it, so an outage or a restart
+delays traffic instead of losing it.
+
+Layout: a directory of append-only segment files. Each ``<first-seq>.seg``
+holds one record per line (``seq<TAB>kind<TAB>json``); a sibling ``.ack`` file
+lists the sequence numbers settled so far. Once a segment is sealed (the next
+one has been started) and every record in it is acknowledged, both files are
+deleted — that is the whole of compaction, and it never rewrites data.
+
+Appends are buffered writes: the hot path costs one ``write`` into a userspace
+buffer, and :meth:`Spool.flush` (called on a short timer by the repository)
+pushes the buffer to the OS. That survives a crash or restart of the bot
+process; surviving a power loss as well needs ``fsync=True``, at a steep cost
+in append throughput.
+
+A spool is bound to one event loop's thread, like the client that drains it,
+and is not safe to share between processes. Only reading records back is not:
+:meth:`Spool.unsent` says where they are from memory, and :func:`read_records`
+reads them from any thread, so a replay needn't block the loop on file I/O.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any
+
+from steeper._codec import Body
+
+logger = logging.getLogger("steeper")
+
+_SEGMENT_SUFFIX = ".seg"
+_ACK_SUFFIX = ".ack"
+
+# Built once: ``json.dumps`` with non-default arguments constructs a fresh
+# encoder on every call, which shows up on an append path this hot.
+_encode = json.JSONEncoder(separators=(",", ":")).encode
+
+
+@dataclass(frozen=True, slots=True)
+class SpoolRecord:
+    """One spooled forward awaiting acknowledgement."""
+
+    seq: int
+    kind: str
+    body: dict[str, Any]
+
+
+class _Segment:
+    __slots__ = ("start", "path", "ack_path", "pending", "size", "ack_file")
+
+    def __init__(self, directory: Path, start: int) -> None:
+        self.start = start
+        self.path = directory / f"{start:020d}{_SEGMENT_SUFFIX}"
+        self.ack_path = self.path.with_suffix(_ACK_SUFFIX)
+        # Sequence numbers written to this segment and not yet acknowledged.
+        self.pending: set[int] = set()
+        self.size = 0
+        self.ack_file: IO[str] | None = None
+
+
+class Spool:
+    """Append-only journal of forwards, compacted as the backend acknowledges them.
+
+    Args:
+        directory: Where segment files live; created if missing. One spool per
+            directory — two bots must not share one.
+        segment_bytes: Size at which the active segment is sealed and a new one
+            started. Smaller segments are reclaimed sooner after an outage.
+        max_bytes: Upper bound on the spool's size on disk. Past it, appends are
+            refused (and the forward falls back to at-most-once), so a long outage
+            can't fill the disk.
+        fsync: ``fsync`` on every :meth:`flush`, to survive power loss as well.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike[str],
+        *,
+        segment_bytes: int = 4 * 1024 * 1024,
+        max_bytes: int = 256 * 1024 * 1024,
+        fsync: bool = False,
+    ) -> None:
+        self._dir = Path(directory)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._segment_bytes = segment_bytes
+        self._max_bytes = max_bytes
+        self._fsync = fsync
+        self._segments: dict[int, _Segment] = {}
+        self._total_bytes = 0
+        self._full_warned = False
+        next_seq = self._recover()
+        self._next_seq = next_seq
+        self._active = self._open_segment(next_seq)
+        self._writer: IO[str] = open(self._active.path, "a", encoding="utf-8")
+
+    def _recover(self) -> int:
+        """Rebuild the pending sets from the files a previous process left behind."""
+        next_seq = 0
+        for path in sorted(self._dir.glob(f"*{_SEGMENT_SUFFIX}")):
+            try:
+                start = int(path.stem)
+            except ValueError:
+                continue
+            segment = _Segment(self._dir, start)
+            with open(path, encoding="utf-8") as fh:
+                for line in fh:
+                    seq = _seq_of(line)
+                    if seq is None:
+                        # A torn write from a crash mid-append; nothing after it
+                        # in this segment can be trusted either.
+                        break
+                    segment.pending.add(seq)
+                    next_seq = max(next_seq, seq + 1)
+            if segment.ack_path.exists():
+                with open(segment.ack_path, encoding="utf-8") as fh:
+                    for line in fh:
+                        if line.strip().isdigit():
+                            segment.pending.discard(int(line))
+            segment.size = path.stat().st_size
+            self._segments[start] = segment
+            self._total_bytes += segment.size
+            self._compact(segment, sealed=True)
+        return next_seq
+
+    def _open_segment(self, start: int) -> _Segment:
+        segment = _Segment(self._dir, start)
+        self._segments[start] = segment
+        return segment
+
+    @property
+    def pending_count(self) -> int:
+        """Records appended and not yet acknowledged."""
+        return sum(len(s.pending) for s in self._segments.values())
+
+    def append(self, kind: str, body: Body) -> int | None:
+        """Record a forward; return its sequence number, or ``None`` if the spool is full."""
+        extra = 0
+        if isinstance(body, bytes) and b"\n" not in body:
+            # Already encoded, perhaps with raw UTF-8: count its bytes, not characters.
+            payload = body.decode()
+            extra = len(body) - len(payload)
+        else:
+            payload = _encode(json.loads(body) if isinstance(body, bytes) else body)
+        line = f"{self._next_seq}\t{kind}\t{payload}\n"
+        # The encoder escapes non-ASCII by default, so characters are bytes here.
+        size = len(line) + extra
+        if self._total_bytes + size > self._max_bytes:
+            if not self._full_warned:
+                self._full_warned = True
+                logger.warning(
+                    "Steeper spool is full (%d bytes); new forwards are not spooled "
+                    "until the backend catches up",
+                    self._max_bytes,
+                )
+            return None
+        if self._active.size and self._active.size + size > self._segment_bytes:
+            self._roll()
+        seq = self._next_seq
+        self._next_seq += 1
+        self._writer.write(line)
+        self._active.pending.add(seq)
+        self._active.size += size
+        self._total_bytes += size
+        return seq
+
+    def ack(self, seq: int) -> None:
+        """Mark ``seq`` as settled; reclaim its segment if nothing else there is pending."""
+        segment = self._segment_of(seq)
+        if segment is None or seq not in segment.pending:
+            return
+        segment.pending.discard(seq)
+        if segment.ack_file is None:
+            segment.ack_file = open(segment.ack_path, "a", encoding="utf-8")
+        segment.ack_file.write(f"{seq}\n")
+        self._compact(segment, sealed=segment is not self._active)
+
+    def unsent(
+        self, exclude: set[int] | frozenset[int] = frozenset()
+    ) -> list[tuple[Path, frozenset[int]]]:
+        """Each segment file holding unacknowledged records, with their sequence numbers.
+
+        ``exclude`` skips records the caller is already sending, so a replay never
+        duplicates a live forward. Pass the result to :func:`read_records`.
+        """
+        self._writer.flush()
+        out: list[tuple[Path, frozenset[int]]] = []
+        for start in sorted(self._segments):
+            segment = self._segments[start]
+            wanted = segment.pending - exclude
+            if wanted:
+                out.append((segment.path, frozenset(wanted)))
+        return out
+
+    def pending(
+        self, *, limit: int, exclude: set[int] | frozenset[int] = frozenset()
+    ) -> list[SpoolRecord]:
+        """Return up to ``limit`` unacknowledged records, oldest first (see :meth:`unsent`)."""
+        return read_records(self.unsent(exclude), limit=limit)
+
+    def flush(self) -> None:
+        """Push buffered appends and acknowledgements to the OS."""
+        for handle in self._open_handles():
+            handle.flush()
+            if self._fsync:
+                os.fsync(handle.fileno())
+
+    def close(self) -> None:
+        self.flush()
+        for handle in self._open_handles():
+            handle.close()
+        for segment in self._segments.values():
+            segment.ack_file = None
+
+    def _open_handles(self) -> list[IO[str]]:
+        handles = [self._writer]
+        handles += [s.ack_file for s in self._segments.values() if s.ack_file is not None]
+        return [h for h in handles if not h.closed]
+
+    def _roll(self) -> None:
+        """Seal the active segment and start a new one at the next sequence number."""
+        sealed = self._active
+        self._writer.close()
+        self._active = self._open_segment(self._next_seq)
+        self._writer = open(self._active.path, "a", encoding="utf-8")
+        self._compact(sealed, sealed=True)
+
+    def _segment_of(self, seq: int) -> _Segment | None:
+        best: _Segment | None = None
+        for start, segment in self._segments.items():
+            if start <= seq and (best is None or start > best.start):
+                best = segment
+        return best
+
+    def _compact(self, segment: _Segment, *, sealed: bool) -> None:
+        if not sealed or segment.pending:
+            return
+        if segment.ack_file is not None:
+            segment.ack_file.close()
+            segment.ack_file = None
+        for path in (segment.path, segment.ack_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        del self._segments[segment.start]
+        self._total_bytes -= segment.size
+        self._full_warned = False
+
+
+def read_records(segments: list[tuple[Path, frozenset[int]]], *, limit: int) -> list[SpoolRecord]:
+    """Read up to ``limit`` of the records :meth:`Spool.unsent` listed, oldest first.
+
+    Touches only the files, so it may run in a thread while the spool's loop
+    goes on appending and acknowledging.
+    """
+    out: list[SpoolRecord] = []
+    for path, wanted in segments:
+        try:
+            fh = open(path, encoding="utf-8")
+        except FileNotFoundError:
+            # Compacted since it was listed: everything in it was acknowledged.
+            continue
+        with fh:
+            for line in fh:
+                seq = _seq_of(line)
+                if seq is None:
+                    break
+                if seq not in wanted:
+                    continue
+                _, kind, payload = line.rstrip("\n").split("\t", 2)
+                out.append(SpoolRecord(seq, kind, json.loads(payload)))
+                if len(out) >= limit:
+                    return out
+    return out
+
+
+def _seq_of(line: str) -> int | None:
+    """The sequence number of a complete record line, or ``None`` for a torn one."""
+    if not line.endswith("\n"):
+        return None
+    head, sep, _ = line.partition("\t")
+    if not sep or not head.isdigit():
+        return None
+    return int(head)
@@ -0,0 +1,109 @@
+"""HTTP transport settings for :class:`~steeper._client.SteeperClient`.
+
+By default the client is a plain ``httpx.AsyncClient``: HTTP/1.1, httpx's
+connection limits, and one ``timeout`` for every phase of a request. That is
+fine for a bot handling a few updates a second. At hundreds of forwards in
+flight, each HTTP/1.1 request holds a connection of its own, so the pool
+grows to its limit and every new connection pays a TCP and TLS handshake.
+HTTP/2 multiplexes all of them over one connection instead.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import httpx
+
+
+@dataclass(frozen=True, slots=True)
+class TransportPolicy:
+    """How :class:`~steeper._client.SteeperClient` talks HTTP to the backend.
+
+    Args:
+        http2: Negotiate HTTP/2, multiplexing concurrent requests over one
+            connection. Needs ``pip install steeper[http2]``; the backend (or the
+            proxy in front of it) must speak HTTP/2 over TLS, else HTTP/1.1 is used.
+        max_connections: Connections open at once; requests past it wait for one.
+        max_keepalive_connections: Idle connections kept open for reuse.
+        keepalive_expiry: Seconds an idle connection is kept before closing it.
+        connect_timeout: Seconds to establish a connection. ``None`` uses the
+            client's ``timeout``, as do the three below.
+        read_timeout: Seconds to wait for each chunk of the response.
+        write_timeout: Seconds to wait for each chunk of the request to be sent.
+        pool_timeout: Seconds to wait for a free connection from the pool.
+    """
+
+    http2: bool = False
+    max_connections: int | None = 100
+    max_keepalive_connections: int | None = 20
+    keepalive_expiry: float | None = 5.0
+    connect_timeout: float | None = None
+    read_timeout: float | None = None
+    write_timeout: float | None = None
+    pool_timeout: float | None = None
+
+    def __post_init__(self) -> None:
+        if self.max_connections is not None and self.max_connections < 1:
+            raise ValueError("max_connections must be at least 1")
+        if self.max_keepalive_connections is not None and self.max_keepalive_connections < 0:
+            raise ValueError("max_keepalive_connections must not be negative")
+        timeouts = (self.connect_timeout, self.read_timeout, self.write_timeout, self.pool_timeout)
+        if any(t is not None and t <= 0 for t in timeouts):
+            raise ValueError("timeouts must be positive")
+
+    @classmethod
+    def high_throughput(cls) -> TransportPolicy:
+        """Settings for bots forwarding hundreds of updates a second.
+
+        HTTP/2 carries every in-flight forward over a single connection, kept
+        alive across quiet spells so bursts never wait on a handshake. A short
+        connect timeout fails fast when the backend is unreachable, and a pool
+        timeout bounds how long a forward queues for a connection.
+        """
+        return cls(
+            http2=True,
+            max_connections=20,
+            max_keepalive_connections=20,
+            keepalive_expiry=120.0,
+            connect_timeout=3.0,
+            pool_timeout=5.0,
+        )
+
+    def client(self, timeout: float) -> httpx.AsyncClient:
+        """An ``httpx.AsyncClient`` with these settings; ``timeout`` covers unset phases."""
+        if self.http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError as exc:
+                raise ImportError(
+                    "HTTP/2 needs the h2 package. Install it with: pip install steeper[http2]"
+                ) from exc
+        # verify defaults to True; keep it explicit so TLS validation is never
+        # silently disabled by a future refactor.
+        return httpx.AsyncClient(
+            timeout=self.timeout(timeout),
+            limits=self.limits(),
+            http2=self.http2,
+            verify=True,
+        )
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def timeout(self, default: float) -> httpx.Timeout:
+        """Per-phase timeouts, each falling back to ``default``."""
+        return httpx.Timeout(
+            default,
+            connect=_or(self.connect_timeout, default),
+            read=_or(self.read_timeout, default),
+            write=_or(self.write_timeout, default),
+            pool=_or(self.pool_timeout, default),
+        )
+
+
+def _or(value: float | None, default: float) -> float:
+    return default if value is None else value
@@ -19,16 +19,26 @@ from __future__ import annotations
 
 import logging
 from collections.abc import Awaitable, Callable
+from functools import partial
 from typing import Any
 from weakref import WeakKeyDictionary
 
-from steeper._background import fire_and_forget
-from steeper.repository import OutgoingMessageSnapshot, SteeperRepository, text_from_message_body
+from steeper._raw import RawUpdateCache
+from steeper.repository import (
+    MESSAGE_METHODS,
+    OUTGOING_KIND,
+    OutgoingMessageSnapshot,
+    SteeperRepository,
+    outgoing_size,
+    text_from_message_body,
+)
 
 logger = logging.getLogger("steeper.aiogram")
 
 try:
     from aiogram import BaseMiddleware, Bot, Dispatcher
+    from aiogram.client.session.base import BaseSession
+    from aiogram.methods import GetUpdates
     from aiogram.types import Message, Update
 except ImportError as _exc:
     raise ImportError(
@@ -41,7 +51,9 @@ class _IncomingMiddleware(BaseMiddleware):
     """Outer middleware on ``Update`` — forwards raw updates to Steeper.
 
     Forwarding is fire-and-forget: a slow or unreachable Steeper backend must
-    neither delay the bot's own handler nor lose the update.
+    neither delay the bot's own handler nor lose the update. The update is
+    forwarded as Telegram sent it when :func:`_wrap_session_check_response` (or
+    the dispatcher's feed hooks) captured it, and dumped from the model otherwise.
     """
 
     def __init__(self, repository: SteeperRepository) -> None:
@@ -53,15 +65,21 @@ class _IncomingMiddleware(BaseMiddleware):
         event: Update,
         data: dict[str, Any],
     ) -> Any:
-        try:
-            raw = event.model_dump(mode="json")
-        except Exception:
-            logger.debug("Failed to build update payload", exc_info=True)
-        else:
-            fire_and_forget(self._repository.forward_update(raw))
+        # Checked before enqueueing: while the backend is down, skip the work entirely.
+        # The payload is built by the work item, not here, so the handler starts now
+        # (unless ``max_pending_bytes`` needs its encoded size up front).
+        repository = self._repository
+        if repository.accepting and repository.is_new_update(event.update_id):
+            repository.schedule_update(partial(_update_payload, repository.raw_updates), event)
         return await handler(event, data)
 
 
+def _update_payload(cache: RawUpdateCache | None, update: Update) -> dict[str, Any]:
+    """The update as Telegram sent it if it was captured, else a dump of the model."""
+    raw = cache.pop(update.update_id) if cache is not None else None
+    return raw if raw is not None else update.model_dump(mode="json")
+
+
 def _snapshot_from_aiogram_message(message: Message) -> OutgoingMessageSnapshot:
     text = text_from_message_body(text=message.text, caption=message.caption)
     date_val = int(message.date.timestamp()) if message.date else None
@@ -73,13 +91,25 @@ def _snapshot_from_aiogram_message(message: Message) -> OutgoingMessageSnapshot:
     )
 
 
+def _is_new_outgoing(repository: SteeperRepository, message: Message) -> bool:
+    text = text_from_message_body(text=message.text, caption=message.caption)
+    return repository.is_new_outgoing(message.chat.id, message.message_id, text)
+
+
+def _is_message_result(result: Any) -> bool:
+    """Whether ``result`` is a Message or, for a media group, a list of them."""
+    if isinstance(result, list):
+        return bool(result) and isinstance(result[0], Message)
+    return isinstance(result, Message)
+
+
 async def _log_aiogram_outgoing(repository: SteeperRepository, result: Any) -> None:
     if isinstance(result, Message):
         await repository.record_outgoing(_snapshot_from_aiogram_message(result))
         return
     if isinstance(result, list) and result and isinstance(result[0], Message):
-        for msg in result:
-            await repository.record_outgoing(_snapshot_from_aiogram_message(msg))
+        # A media group: one request for the whole album.
+        await repository.record_outgoing_many([_snapshot_from_aiogram_message(m) for m in result])
 
 
 # Maps each registered Bot to its repository. A WeakKeyDictionary so wrapping a
@@ -87,6 +117,7 @@ async def _log_aiogram_outgoing(repository: SteeperRepository, result: Any) -> N
 # this registry, so only bots set up with Steeper are logged.
 _bot_repos: WeakKeyDictionary[Bot, SteeperRepository] = WeakKeyDictionary()
 _orig_bot_call: Any = None
+_orig_check_response: Any = None
 
 # Marks a dispatcher that has already been set up, so a repeated ``setup()`` can't
 # stack a second outer middleware (and a second shutdown callback) on it.
@@ -114,19 +145,92 @@ def _wrap_bot_api_call(bot: Bot, repository: SteeperRepository) -> None:
         request_timeout: int | None = None,
     ) -> Any:
         result = await _orig_bot_call(self, method, request_timeout=request_timeout)
-        repo = _bot_repos.get(self)
-        if repo is not None:
-            # Fire-and-forget so logging never delays the bot's own API call.
-            fire_and_forget(_log_aiogram_outgoing(repo, result))
+        # Decided synchronously: most calls (long polls, chat actions, callback
+        # answers) never return a message, and must not cost a task each.
+        if (
+            getattr(method, "__api_method__", None) in MESSAGE_METHODS
+            and _is_message_result(result)
+            and (repo := _bot_repos.get(self)) is not None
+            and repo.accepting
+        ):
+            messages = result if isinstance(result, list) else [result]
+            # Repeats are dropped here, before they take a slot of the scheduler.
+            messages = [m for m in messages if _is_new_outgoing(repo, m)]
+            if messages:
+                # Fire-and-forget so logging never delays the bot's own API call.
+                repo.scheduler.submit(
+                    _log_aiogram_outgoing,
+                    repo,
+                    messages,
+                    key=messages[0].chat.id,
+                    kind=OUTGOING_KIND,
+                    size=outgoing_size(m.text or m.caption for m in messages),
+                )
         return result
 
     Bot.__call__ = patched  # type: ignore[method-assign]
 
 
+def _raw_cache(bot: Bot) -> RawUpdateCache | None:
+    """Where to capture ``bot``'s raw updates; ``None`` if they aren't wanted right now."""
+    repo = _bot_repos.get(bot)
+    if repo is None or not repo.accepting:
+        return None
+    return repo.raw_updates
+
+
+def _wrap_session_check_response() -> None:
+    """Capture ``getUpdates`` responses verbatim, before aiogram parses them into models.
+
+    ``BaseSession.check_response`` receives the response body as text from every
+    session implementation; it is patched on the class once, and scoped to
+    registered bots through :data:`_bot_repos` like the ``Bot.__call__`` patch.
+    """
+    global _orig_check_response
+    if _orig_check_response is not None:
+        return
+    _orig_check_response = BaseSession.check_response
+
+    def patched(self: BaseSession, bot: Bot, method: Any, status_code: int, content: str) -> Any:
+        response = _orig_check_response(self, bot, method, status_code, content)
+        cache = _raw_cache(bot) if isinstance(method, GetUpdates) else None
+        if cache is not None:
+            try:
+                cache.put_response(content)
+            except Exception:
+                # Capturing is an optimization; the middleware falls back to a dump.
+                logger.debug("Failed to capture raw updates", exc_info=True)
+        return response
+
+    BaseSession.check_response = patched  # type: ignore[method-assign]
+
+
+def _wrap_dispatcher_feeds(dp: Dispatcher) -> None:
+    """Capture update dicts fed to ``dp`` directly, as aiogram's webhook handlers do."""
+    orig_webhook = dp.feed_webhook_update
+    orig_raw = dp.feed_raw_update
+
+    async def feed_webhook_update(bot: Bot, update: Any, *args: Any, **kwargs: Any) -> Any:
+        cache = _raw_cache(bot) if isinstance(update, dict) else None
+        if cache is not None:
+            cache.put_many([update])
+        return await orig_webhook(bot, update, *args, **kwargs)
+
+    async def feed_raw_update(bot: Bot, update: dict[str, Any], **kwargs: Any) -> Any:
+        cache = _raw_cache(bot)
+        if cache is not None:
+            cache.put_many([update])
+        return await orig_raw(bot, update, **kwargs)
+
+    dp.feed_webhook_update = feed_webhook_update  # type: ignore[method-assign]
+    dp.feed_raw_update = feed_raw_update  # type: ignore[method-assign]
+
+
 class SteeperMiddleware:
     """All-in-one Steeper integration for aiogram v3.
 
-    Call :meth:`setup` to register both incoming and outgoing hooks.
+    Call :meth:`setup` to register both incoming and outgoing hooks. Extra keyword
+    arguments (e.g. ``batch_size``) are passed on to :class:`SteeperRepository`.
     """
 
     def __init__(
@@ -136,23 +240,27 @@ class SteeperMiddleware:
         bot_token: str,
         *,
         timeout: float = 10.0,
+        **repository_options: Any,
     ) -> None:
         self._repository = SteeperRepository(
             base_url=base_url,
             bot_id=bot_id,
             bot_token=bot_token,
             timeout=timeout,
+            **repository_options,
         )
         self._incoming = _IncomingMiddleware(self._repository)
 
     def setup(self, dp: Dispatcher, bot: Bot) -> None:
         """Register Steeper on the dispatcher and bot.
 
-        - Incoming updates are forwarded via an outer Update middleware.
+        - Incoming updates are forwarded via an outer Update middleware — verbatim, as
+          captured from ``getUpdates`` responses and webhook bodies, whenever possible.
         - Outgoing traffic is observed by wrapping :meth:`Bot.__call__`, so any API call that
           returns a :class:`~aiogram.types.Message` (``send_message``, ``send_photo``, media
           groups, etc.) is logged to Steeper.
-        - The HTTP client is closed on dispatcher shutdown.
+        - Replaying the spool (with ``spool_dir``) starts on dispatcher startup, and the
+          HTTP client is closed on dispatcher shutdown.
 
         Calling this more than once for the same dispatcher is a no-op: re-registering
         would forward every update twice.
@@ -163,12 +271,16 @@ class SteeperMiddleware:
         setattr(dp, _SETUP_MARKER, True)
 
         dp.update.outer_middleware(self._incoming)
+        dp.startup.register(self._repository.start)
         dp.shutdown.register(self.aclose)
         _wrap_bot_api_call(bot, self._repository)
+        if self._repository.raw_updates is not None:
+            _wrap_session_check_response()
+            _wrap_dispatcher_feeds(dp)
         logger.info("Steeper middleware registered for aiogram")
 
     async def aclose(self) -> None:
-        """Close the underlying HTTP client.
+        """Send what is still pending (up to ``drain_timeout`` seconds), then close the client.
 
         Registered as a dispatcher shutdown callback by :meth:`setup`, so bots driven by
         ``start_polling`` need not call it; call it yourself if you drive the dispatcher
@@ -20,16 +20,23 @@ from __future__ import annotations
 import hashlib
 import logging
 from collections.abc import Awaitable, Callable
+from functools import partial
 from typing import Any
 from weakref import WeakSet
 
-from steeper._background import fire_and_forget
-from steeper.repository import OutgoingMessageSnapshot, SteeperRepository, text_from_message_body
+from steeper._raw import RawUpdateCache
+from steeper.repository import (
+    MESSAGE_METHODS,
+    OUTGOING_KIND,
+    SteeperRepository,
+    outgoing_size,
+    snapshots_from_message_json,
+)
 
 logger = logging.getLogger("steeper.ptb")
 
 try:
-    from telegram import Bot, Message, Update
+    from telegram import Bot, Update
     from telegram.ext import (
         Application,
         BaseHandler,
@@ -42,6 +49,12 @@ except ImportError as _exc:
     ) from _exc
 
 
+def _update_payload(cache: RawUpdateCache | None, update: Update) -> dict[str, Any]:
+    """The update as Telegram sent it if ``getUpdates`` was captured, else ``to_dict``."""
+    raw = cache.pop(update.update_id) if cache is not None else None
+    return raw if raw is not None else update.to_dict(recursive=True)
+
+
 class _SteeperHandler(BaseHandler[Update, ContextTypes.DEFAULT_TYPE, None]):
     """Low-priority handler that intercepts every update for Steeper logging."""
 
@@ -61,48 +74,20 @@ class _SteeperHandler(BaseHandler[Update, ContextTypes.DEFAULT_TYPE, None]):
     ) -> None:
         # Fire-and-forget: PTB processes updates sequentially by default, so
         # awaiting the Steeper round-trip here would stall the whole bot
-        # whenever the backend is slow or unreachable.
-        try:
-            raw = update.to_dict(recursive=True)
-        except Exception:
-            logger.debug("Failed to build update payload", exc_info=True)
+        # whenever the backend is slow or unreachable. The payload is built by
+        # the work item too, so not even serialization runs ahead of handlers
+        # (unless ``max_pending_bytes`` needs its encoded size up front).
+        if not self._repository.accepting or not self._repository.is_new_update(update.update_id):
             return
-        fire_and_forget(self._repository.forward_update(raw))
+        self._repository.schedule_update(
+            partial(_update_payload, self._repository.raw_updates), update
+        )
 
     @staticmethod
     async def _noop(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         pass
 
 
-def _messages_from_ptb_post_result(bot: Any, result: Any) -> list[Message]:
-    """Turn raw ``_post`` JSON into :class:`telegram.Message` instances when applicable."""
-    if result is True:
-        return []
-    if isinstance(result, dict) and "message_id" in result:
-        m = Message.de_json(result, bot)
-        return [m] if m else []
-    if isinstance(result, list) and result:
-        if isinstance(result[0], dict) and "message_id" in result[0]:
-            return list(Message.de_list(result, bot))
-    return []
-
-
-def _snapshot_from_ptb_message(message: Message) -> OutgoingMessageSnapshot:
-    text = text_from_message_body(text=message.text, caption=message.caption)
-    date_val = int(message.date.timestamp()) if message.date else None
-    return OutgoingMessageSnapshot(
-        chat_id=message.chat.id,
-        message_id=message.message_id,
-        text=text,
-        date=date_val,
-    )
-
-
-async def _log_ptb_outgoing(bot: Any, repository: SteeperRepository, result: Any) -> None:
-    for msg in _messages_from_ptb_post_result(bot, result):
-        await repository.record_outgoing(_snapshot_from_ptb_message(msg))
-
-
 # Maps each registered bot to its repository, keyed by the SHA-256 of the bot
 # token rather than by the Bot object: PTB's objects define ``__slots__`` and are
 # not weak-referenceable, and the digest keeps the raw token out of this global.
@@ -116,12 +101,27 @@ _orig_bot_post: Any = None
 _setup_applications: WeakSet[Application] = WeakSet()  # type: ignore[type-arg]
 
 
+# Token digests by ``id(bot)``, so ``Bot._post`` hashes each bot's token once
+# rather than on every API call. Each entry holds the bot itself: while it is
+# cached, its id can't be reused by another object. Bots are few and long-lived;
+# the bound only matters for code that creates throwaway ones.
+_bot_keys: dict[int, tuple[Any, str]] = {}
+_BOT_KEYS_LIMIT = 64
+
+
 def _bot_key(bot: Any) -> str:
-    return hashlib.sha256(bot.token.encode()).hexdigest()
+    cached = _bot_keys.get(id(bot))
+    if cached is not None and cached[0] is bot:
+        return cached[1]
+    key = hashlib.sha256(bot.token.encode()).hexdigest()
+    if len(_bot_keys) >= _BOT_KEYS_LIMIT:
+        _bot_keys.clear()
+    _bot_keys[id(bot)] = (bot, key)
+    return key
 
 
 def _wrap_bot_post(application: Application, repository: SteeperRepository) -> None:  # type: ignore[type-arg]
-    """Intercept ``Bot._post`` so any response that decodes to Message(s) is logged.
+    """Intercept ``Bot._post`` so any response that holds Message JSON is logged.
 
     The wrapper is installed on :class:`telegram.Bot` itself rather than on the
     instance: PTB freezes its objects and defines ``__slots__``, so ``bot._post =
@@ -144,14 +144,52 @@ def _wrap_bot_post(application: Application, repository: SteeperRepository) -> N
     ) -> Any:
         result = await _orig_bot_post(self, endpoint, data, **kwargs)
         repo = _bot_repos.get(_bot_key(self))
-        if repo is not None:
-            # Fire-and-forget so logging never delays the bot's own API call.
-            fire_and_forget(_log_ptb_outgoing(self, repo, result))
+        if repo is not None and repo.accepting:
+            if endpoint == "getUpdates":
+                # Telegram's own JSON, decoded and not yet turned into Updates; PTB
+                # never alters it (``de_json`` copies), so it can be forwarded as is.
+                if repo.raw_updates is not None and isinstance(result, list):
+                    repo.raw_updates.put_many(result)
+            elif endpoint in MESSAGE_METHODS:
+                # Read straight from the JSON: building PTB Message objects just to
+                # take four fields from them is most of the cost of a broadcast.
+                snapshots = snapshots_from_message_json(result)
+                # Repeats are dropped here, before they take a slot of the scheduler.
+                snapshots = [
+                    s for s in snapshots if repo.is_new_outgoing(s.chat_id, s.message_id, s.text)
+                ]
+                if snapshots:
+                    # Fire-and-forget so logging never delays the bot's own API call.
+                    repo.scheduler.submit(
+                        repo.record_outgoing_many,
+                        snapshots,
+                        key=snapshots[0].chat_id,
+                        kind=OUTGOING_KIND,
+                        size=outgoing_size(s.text for s in snapshots),
+                    )
         return result
 
     Bot._post = patched  # type: ignore[method-assign]
 
 
+def _chain_post_init(
+    application: Application,  # type: ignore[type-arg]
+    start: Callable[[], Awaitable[None]],
+) -> None:
+    """Append ``start`` to the application's ``post_init`` callback.
+
+    Chained for the same reason as :func:`_chain_post_shutdown`.
+    """
+    orig = getattr(application, "post_init", None)
+
+    async def patched(app: Application) -> None:  # type: ignore[type-arg]
+        if orig is not None:
+            await orig(app)
+        await start()
+
+    application.post_init = patched
+
+
 def _chain_post_shutdown(
     application: Application,  # type: ignore[type-arg]
     close: Callable[[], Awaitable[None]],
@@ -177,7 +215,8 @@ def _chain_post_shutdown(
 class SteeperMiddleware:
     """All-in-one Steeper integration for python-telegram-bot v20+.
 
-    Call :meth:`setup` to register both incoming and outgoing hooks.
+    Call :meth:`setup` to register both incoming and outgoing hooks. Extra keyword
+    arguments (e.g. ``batch_size``) are passed on to :class:`SteeperRepository`.
     """
 
     def __init__(
@@ -187,21 +226,26 @@ class SteeperMiddleware:
         bot_token: str,
         *,
         timeout: float = 10.0,
+        **repository_options: Any,
     ) -> None:
         self._repository = SteeperRepository(
             base_url=base_url,
             bot_id=bot_id,
             bot_token=bot_token,
             timeout=timeout,
+            **repository_options,
         )
 
     def setup(self, application: Application) -> None:  # type: ignore[type-arg]
         """Register Steeper hooks on a PTB Application.
 
-        - Incoming: a low-priority handler that captures every Update.
+        - Incoming: a low-priority handler that captures every Update, forwarded as
+          Telegram sent it when polling (``getUpdates`` responses are captured raw).
         - Outgoing: ``Bot._post`` is wrapped so JSON that represents sent/edited messages
           (``sendMessage``, ``sendPhoto``, ``sendMediaGroup``, ``editMessageText``, etc.) is
           logged to Steeper.
+        - Replaying the spool (with ``spool_dir``) starts from ``post_init``, and the
+          HTTP client is closed from ``post_shutdown``.
         """
         if application in _setup_applications:
             logger.debug("Steeper is already set up on this application; ignoring")
@@ -210,11 +254,12 @@ class SteeperMiddleware:
 
         application.add_handler(_SteeperHandler(self._repository), group=-1)
         _wrap_bot_post(application, self._repository)
+        _chain_post_init(application, self._repository.start)
         _chain_post_shutdown(application, self.aclose)
         logger.info("Steeper middleware registered for python-telegram-bot")
 
     async def aclose(self) -> None:
-        """Close the underlying HTTP client.
+        """Send what is still pending (up to ``drain_timeout`` seconds), then close the client.
 
         Chained onto ``Application.post_shutdown`` by :meth:`setup`, so bots driven by
         ``run_polling``/``run_webhook`` need not call it. A bare ``Application.shutdown()``
@@ -19,10 +19,18 @@ from __future__ import annotations
 
 import json
 import logging
+from functools import partial
 from typing import Any
 
-from steeper._background import fire_and_forget_threadsafe, run_threadsafe
-from steeper.repository import OutgoingMessageSnapshot, SteeperRepository, text_from_message_body
+from steeper._background import run_threadsafe
+from steeper._raw import RawUpdateCache
+from steeper.repository import (
+    MESSAGE_METHODS,
+    OUTGOING_KIND,
+    SteeperRepository,
+    outgoing_size,
+    snapshots_from_message_json,
+)
 
 logger = logging.getLogger("steeper.telebot")
 
@@ -44,41 +52,6 @@ _token_repos: dict[str, SteeperRepository] = {}
 _SETUP_MARKER = "_steeper_setup"
 
 
-def _telebot_snapshots_from_result(result: Any) -> list[OutgoingMessageSnapshot]:
-    """Build snapshots from raw ``apihelper`` JSON (``result`` field)."""
-    if result is None or result is True:
-        return []
-    if isinstance(result, dict) and "message_id" in result and "chat" in result:
-        return [_snapshot_from_telebot_dict(result)]
-    if isinstance(result, list):
-        out: list[OutgoingMessageSnapshot] = []
-        for item in result:
-            if isinstance(item, dict) and "message_id" in item and "chat" in item:
-                out.append(_snapshot_from_telebot_dict(item))
-        return out
-    return []
-
-
-def _snapshot_from_telebot_dict(d: dict[str, Any]) -> OutgoingMessageSnapshot:
-    chat = d["chat"]
-    chat_id = chat["id"] if isinstance(chat, dict) else chat.id
-    text = text_from_message_body(text=d.get("text"), caption=d.get("caption"))
-    raw_date = d.get("date")
-    date_val: int | None
-    if isinstance(raw_date, int):
-        date_val = raw_date
-    elif isinstance(raw_date, float):
-        date_val = int(raw_date)
-    else:
-        date_val = None
-    return OutgoingMessageSnapshot(
-        chat_id=chat_id,
-        message_id=d["message_id"],
-        text=text,
-        date=date_val,
-    )
-
-
 def _ensure_apihelper_patch() -> None:
     global _apihelper_orig
     if _apihelper_orig is not None:
@@ -97,9 +70,25 @@ def _ensure_apihelper_patch() -> None:
         result = _apihelper_orig(token, method_name, method, params, files)
         try:
             repo = _token_repos.get(token)
-            if repo is not None:
-                for snap in _telebot_snapshots_from_result(result):
-                    fire_and_forget_threadsafe(repo.record_outgoing(snap))
+            if repo is not None and repo.accepting and method_name == "getUpdates":
+                # Telegram's JSON, before telebot builds Updates from it; claimed by
+                # process_new_updates instead of reconstructing each update.
+                if repo.raw_updates is not None and isinstance(result, list):
+                    repo.raw_updates.put_many(result)
+            elif method_name in MESSAGE_METHODS and repo is not None and repo.accepting:
+                snapshots = snapshots_from_message_json(result)
+                # Repeats are dropped here, before they take a slot of the scheduler.
+                snapshots = [
+                    s for s in snapshots if repo.is_new_outgoing(s.chat_id, s.message_id, s.text)
+                ]
+                if snapshots:
+                    repo.scheduler.submit_threadsafe(
+                        repo.record_outgoing_many,
+                        snapshots,
+                        key=snapshots[0].chat_id,
+                        kind=OUTGOING_KIND,
+                        size=outgoing_size(s.text for s in snapshots),
+                    )
         except Exception:
             # Logging to Steeper must never break the bot's own API call.
             logger.debug("Failed to log outgoing telebot message", exc_info=True)
@@ -135,6 +124,12 @@ def _full_update_from_telebot(update: tg_types.Update) -> dict[str, Any]:
     return raw
 
 
+def _update_payload(cache: RawUpdateCache | None, update: tg_types.Update) -> dict[str, Any]:
+    """The update as ``getUpdates`` returned it if captured, else a reconstruction."""
+    raw = cache.pop(update.update_id) if cache is not None else None
+    return raw if raw is not None else _full_update_from_telebot(update)
+
+
 def _wrap_process_new_updates(bot: _telebot.TeleBot, repository: SteeperRepository) -> None:
     """Wrap ``TeleBot.process_new_updates`` — the single funnel for every update type.
 
@@ -148,13 +143,15 @@ def _wrap_process_new_updates(bot: _telebot.TeleBot, repository: SteeperReposito
     orig = bot.process_new_updates
 
     def patched(updates: Any) -> Any:
-        for update in updates or []:
-            try:
-                raw = _full_update_from_telebot(update)
-            except Exception:
-                logger.debug("Failed to build update payload", exc_info=True)
-                continue
-            fire_and_forget_threadsafe(repository.forward_update(raw))
+        # Checked once per batch: while the backend is down, enqueue nothing at all.
+        # Payloads are built on the background loop, off the polling thread (unless
+        # ``max_pending_bytes`` needs their encoded size up front).
+        if repository.accepting:
+            build = partial(_update_payload, repository.raw_updates)
+            for update in updates or []:
+                if not repository.is_new_update(update.update_id):
+                    continue
+                repository.schedule_update(build, update, threadsafe=True)
         return orig(updates)
 
     bot.process_new_updates = patched  # type: ignore[assignment]
@@ -163,7 +160,8 @@ def _wrap_process_new_updates(bot: _telebot.TeleBot, repository: SteeperReposito
 class SteeperMiddleware:
     """All-in-one Steeper integration for pyTelegramBotAPI.
 
-    Call :meth:`setup` to register both incoming and outgoing hooks.
+    Call :meth:`setup` to register both incoming and outgoing hooks. Extra keyword
+    arguments (e.g. ``batch_size``) are passed on to :class:`SteeperRepository`.
     """
 
     def __init__(
@@ -173,12 +171,14 @@ class SteeperMiddleware:
         bot_token: str,
         *,
         timeout: float = 10.0,
+        **repository_options: Any,
     ) -> None:
         self._repository = SteeperRepository(
             base_url=base_url,
             bot_id=bot_id,
             bot_token=bot_token,
             timeout=timeout,
+            **repository_options,
         )
 
     def setup(self, bot: _telebot.TeleBot) -> None:
@@ -186,23 +186,28 @@ class SteeperMiddleware:
 
         - Incoming: ``TeleBot.process_new_updates`` is wrapped so every update (with its real
           ``update_id`` and full payload) is forwarded to Steeper, for both polling and webhooks.
+          Polled updates are forwarded exactly as ``getUpdates`` returned them.
         - Outgoing: ``telebot.apihelper._make_request`` is wrapped (scoped to this bot's token)
           so API responses that contain full message objects are logged to Steeper.
         """
         _token_repos[bot.token] = self._repository
         _ensure_apihelper_patch()
         _wrap_process_new_updates(bot, self._repository)
+        # No startup hook either: start replaying the spool (if any) right away.
+        run_threadsafe(self._repository.start())
 
         logger.info("Steeper middleware registered for pyTelegramBotAPI")
 
     def close(self, *, timeout: float = 5.0) -> None:
-        """Close the underlying HTTP client, blocking until it is done.
+        """Send what is still pending, then close the HTTP client, blocking until done.
 
-        pyTelegramBotAPI is synchronous and offers no shutdown hook, so this has to be
-        called by hand — typically in a ``finally`` around ``bot.polling()``. Best-effort:
-        it never raises.
+        Waits up to the repository's ``drain_timeout`` for pending forwards, and
+        ``timeout`` seconds more for the rest. pyTelegramBotAPI is synchronous and
+        offers no shutdown hook, so this has to be called by hand — typically in a
+        ``finally`` around ``bot.polling()``. Best-effort: it never raises.
         """
-        run_threadsafe(self._repository.aclose(), timeout=timeout)
+        repository = self._repository
+        run_threadsafe(repository.aclose(), timeout=repository.drain_timeout + timeout)
 
     @property
     def repository(self) -> SteeperRepository:
@@ -2,11 +2,42 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any
+import asyncio
+import contextlib
+import logging
+import os
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import asdict, dataclass
+from typing import Any, TypeVar
 
+from steeper._background import (
+    DEFAULT_CONCURRENCY,
+    DROP_NEWEST,
+    HIGH,
+    LOW,
+    AdaptiveLimit,
+    ConcurrencyPolicy,
+    Scheduler,
+    StalenessPolicy,
+)
+from steeper._batch import Batcher, SendOrder
+from steeper._breaker import DEFAULT_CIRCUIT_BREAKER, CircuitBreakerPolicy
 from steeper._client import SteeperClient
+from steeper._coalesce import Coalescer
+from steeper._codec import AUTO, Body, JsonCodec
+from steeper._compression import CompressionPolicy
 from steeper._config import SteeperConfig
+from steeper._dedupe import DedupeCache, DedupePolicy
+from steeper._fairness import FairnessPolicy
+from steeper._hub import SteeperHub
+from steeper._raw import RawUpdateCache
+from steeper._retry import RetryPolicy
+from steeper._spool import Spool, read_records
+from steeper._transport import TransportPolicy
+
+logger = logging.getLogger("steeper")
+
+_T = TypeVar("_T")
 
 
 @dataclass(frozen=True, slots=True)
@@ -24,12 +55,286 @@ def text_from_message_body(*, text: str | None, caption: str | None) -> str:
     return (text or caption or "").strip()
 
 
+def snapshot_from_message_dict(message: dict[str, Any]) -> OutgoingMessageSnapshot:
+    """Build a snapshot straight from a Bot API ``Message`` JSON object.
+
+    Integrations see the API's decoded JSON before their framework builds objects
+    from it; reading the four fields a snapshot needs from the dict skips that.
+    """
+    chat = message["chat"]
+    chat_id = chat["id"] if isinstance(chat, dict) else chat.id
+    text = text_from_message_body(text=message.get("text"), caption=message.get("caption"))
+    raw_date = message.get("date")
+    date_val: int | None
+    if isinstance(raw_date, int):
+        date_val = raw_date
+    elif isinstance(raw_date, float):
+        date_val = int(raw_date)
+    else:
+        date_val = None
+    return OutgoingMessageSnapshot(
+        chat_id=chat_id,
+        message_id=message["message_id"],
+        text=text,
+        date=date_val,
+    )
+
+
+def snapshots_from_message_json(result: Any) -> list[OutgoingMessageSnapshot]:
+    """Snapshots of the message(s) in a Bot API ``result``; empty if it holds none."""
+    if isinstance(result, dict):
+        if "message_id" in result and "chat" in result:
+            return [snapshot_from_message_dict(result)]
+        return []
+    if isinstance(result, list):
+        return [
+            snapshot_from_message_dict(item)
+            for item in result
+            if isinstance(item, dict) and "message_id" in item and "chat" in item
+        ]
+    return []
+
+
+# Update types the backend turns into domain chats. Under overload, everything
+# else (callback queries, chat-member changes, polls, ...) is shed first.
+_CONVERSATION_UPDATES = ("message", "edited_message")
+
+
+def update_priority(update: Any) -> int:
+    """Scheduling priority of an update: HIGH for conversations, LOW otherwise.
+
+    ``update`` is a raw update dict or a framework's update object; all three
+    frameworks expose ``message`` and ``edited_message`` as attributes.
+    """
+    if isinstance(update, dict):
+        # ``get`` rather than ``in``: some frameworks dump unset fields as None.
+        fields = [update.get(key) for key in _CONVERSATION_UPDATES]
+    else:
+        fields = [getattr(update, key, None) for key in _CONVERSATION_UPDATES]
+    return HIGH if any(field is not None for field in fields) else LOW
+
+
+# Every optional field of the Bot API's ``Update``; each holds the payload of one
+# type of update, and an update has exactly one of them.
+UPDATE_TYPES = (
+    "message",
+    "edited_message",
+    "channel_post",
+    "edited_channel_post",
+    "business_connection",
+    "business_message",
+    "edited_business_message",
+    "deleted_business_messages",
+    "message_reaction",
+    "message_reaction_count",
+    "inline_query",
+    "chosen_inline_result",
+    "callback_query",
+    "shipping_query",
+    "pre_checkout_query",
+    "purchased_paid_media",
+    "poll",
+    "poll_answer",
+    "my_chat_member",
+    "chat_member",
+    "chat_join_request",
+    "chat_boost",
+    "removed_chat_boost",
+)
+
+
+def _field(obj: Any, name: str) -> Any:
+    return obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+
+
+#: Scheduling ``kind`` of the bot's own outgoing messages; updates use their type.
+OUTGOING_KIND = "outgoing"
+
+
+def update_kind(update: Any) -> str:
+    """An update's type — the field holding its payload, e.g. ``callback_query``.
+
+    ``update`` is a raw update dict or a framework's update object. Types this
+    version doesn't know are all ``"update"``.
+    """
+    for name in UPDATE_TYPES:
+        if _field(update, name) is not None:
+            return name
+    return "update"
+
+
+def update_chat_id(update: Any) -> int | None:
+    """The chat an update belongs to, for ordering its forward; ``None`` if it has none.
+
+    ``update`` is a raw update dict or a framework's update object. Updates with
+    no chat of their own (inline queries, a callback query on an inline message)
+    belong to their user's private chat, whose id is the user's.
+    """
+    payload = _field(update, update_kind(update))
+    if payload is None:
+        return None
+    chat = _field(payload, "chat") or _field(_field(payload, "message"), "chat")
+    if chat is None:
+        # Dicts say "from"; the frameworks rename it, which is a keyword.
+        chat = _field(payload, "from") or _field(payload, "from_user")
+        chat = chat or _field(payload, "user")
+    chat_id = _field(chat, "id") if chat is not None else None
+    return chat_id if isinstance(chat_id, int) else None
+
+
+# Roughly what logging a message encodes to beyond its text: ids, date, keys.
+_MESSAGE_OVERHEAD = 80
+
+
+def outgoing_size(texts: Iterable[str | None]) -> int:
+    """Roughly the encoded size of logging messages with ``texts``, for a byte budget."""
+    return sum(_MESSAGE_OVERHEAD + len(text or "") for text in texts)
+
+
+# Bot API methods whose result is the message (or, for ``sendMediaGroup``, the
+# messages) the bot just sent or edited. Integrations check an outgoing call
+# against this before doing any work for it, so the bulk of a bot's API traffic
+# (``getUpdates``, ``sendChatAction``, ``answerCallbackQuery``, ...) costs one
+# set lookup. ``copyMessage`` is absent: it returns only a ``MessageId``.
+MESSAGE_METHODS = frozenset(
+    {
+        "sendMessage",
+        "forwardMessage",
+        "sendPhoto",
+        "sendLivePhoto",
+        "sendAudio",
+        "sendDocument",
+        "sendVideo",
+        "sendAnimation",
+        "sendVoice",
+        "sendVideoNote",
+        "sendPaidMedia",
+        "sendMediaGroup",
+        "sendLocation",
+        "sendVenue",
+        "sendContact",
+        "sendPoll",
+        "sendChecklist",
+        "sendDice",
+        "sendSticker",
+        "sendInvoice",
+        "sendGame",
+        "sendRichMessage",
+        "editMessageText",
+        "editMessageCaption",
+        "editMessageMedia",
+        "editMessageLiveLocation",
+        "stopMessageLiveLocation",
+        "editMessageChecklist",
+        "editMessageReplyMarkup",
+        "setGameScore",
+    }
+)
+
+
+# Kinds of spooled record; see :mod:`steeper._spool`.
+_UPDATE = "update"
+_MESSAGE = "message"
+
+# How long appended spool records may sit in the userspace buffer.
+_SPOOL_FLUSH_INTERVAL = 0.2
+# Pause between replay attempts while the backend is down.
+_REPLAY_INTERVAL = 5.0
+# Records per bulk request when replaying the spool.
+_REPLAY_BATCH = 100
+
+#: Seconds :meth:`SteeperRepository.aclose` waits for pending forwards by default.
+DRAIN_TIMEOUT = 5.0
+
+
 class SteeperRepository:
     """Sync layer for Steeper: forwards incoming updates and records outgoing bot messages.
 
     Integrations should call :meth:`forward_update` for webhook-style incoming traffic and
     :meth:`record_outgoing` (or helpers that build :class:`OutgoingMessageSnapshot`) for every
     bot-originated message you want mirrored to Steeper.
+
+    Batching is opt-in: with ``batch_size`` set, incoming updates forwarded within
+    ``batch_window`` seconds of each other (up to ``batch_size`` of them) share one
+    bulk request instead of one POST each, and so do outgoing messages.
+
+    So is durability: with ``spool_dir`` set, every forward is appended to an on-disk
+    :class:`~steeper._spool.Spool` before it is sent and kept there until the backend
+    settles it. While the backend is down, forwards are only spooled, and a background
+    replay sends them in bulk once it is back — including whatever a previous process
+    left behind.
+
+    Pass a :class:`~steeper.RetryPolicy` as ``retry`` to retry transient failures
+    (network errors, 5xx, 429) with backoff before giving up on a forward. A circuit
+    breaker (``circuit_breaker``, on by default) stops sending while the backend is
+    down; integrations check :attr:`accepting` to skip building payloads meanwhile.
+    ``transport`` (a :class:`~steeper.TransportPolicy`) tunes the HTTP connection
+    pool, per-phase timeouts and HTTP/2, and ``compression`` (a
+    :class:`~steeper.CompressionPolicy`) compresses large request bodies. ``codec``
+    picks the JSON encoder: ``"auto"`` (orjson, then msgspec, then the stdlib),
+    one of those by name, or any object with ``encode``/``decode``.
+
+    ``coalesce_window`` (seconds) holds outgoing messages that long and logs only
+    the latest version of each ``(chat_id, message_id)``, for bots that stream
+    text by editing one message many times a second. Superseded versions are
+    never sent or spooled.
+
+    With ``dedupe`` (a :class:`~steeper.DedupePolicy`), updates whose ``update_id``
+    was forwarded recently, and outgoing messages whose text is the one last
+    forwarded for their chat and message id, are dropped instead of sent again;
+    integrations ask :meth:`is_new_update` and :meth:`is_new_outgoing` before
+    scheduling a forward.
+
+    Integrations forward incoming updates exactly as Telegram sent them wherever
+    they can capture them at the framework's transport layer (see
+    :mod:`steeper._raw`); ``capture_raw=False`` rebuilds every update from the
+    framework's objects instead.
+
+    Integrations hand forwards to :attr:`scheduler`. By default each one runs as its
+    own task; with ``workers`` set, a fixed pool of that many worker coroutines per
+    event loop drains a bounded queue instead, which is cheaper at high update rates.
+    ``overflow`` picks what is shed once the in-flight limit is reached:
+    ``"drop-newest"`` (the default), ``"drop-oldest"`` (needs ``workers``) or ``"priority"``, which
+    sheds other updates before ``message``/``edited_message`` ones and outgoing
+    messages (see :func:`update_priority`).
+
+    That limit adapts to the backend by default: ``concurrency`` (a
+    :class:`~steeper.ConcurrencyPolicy`) starts it at 512 and lets it grow while
+    requests stay fast and shrink when they fail or their smoothed latency climbs
+    well above its long-run baseline. ``None`` keeps it at a fixed ceiling of 512.
+
+    Integrations submit each forward with its chat id as the scheduling key, so
+    by default a chat's updates and the bot's replies in it reach the backend in
+    order, one after another, while different chats still go concurrently; the
+    backend can't log a reply to a user it hasn't stored yet. With batching or
+    coalescing, a forward's turn ends once it has joined a batch or window, in
+    order, so a chat's forwards still share requests; batches then go out one
+    at a time, a batch of updates before the outgoing messages that followed
+    them, so the order still holds. ``ordered=False`` sends everything
+    concurrently.
+
+    With ``fairness`` (a :class:`~steeper.FairnessPolicy`), one chat may hold only
+    its share of the in-flight limit, so a flooding chat is shed before it crowds
+    out every other conversation; one update type is held to its share too, but
+    only once three quarters of the limit is taken.
+
+    On shutdown, :meth:`aclose` first calls :meth:`flush`: it stops taking new
+    forwards and gives those already scheduled up to ``drain_timeout`` seconds
+    to be sent, so a deploy doesn't lose the tail of the bot's traffic.
+
+    Bots in one process can share a :class:`~steeper.SteeperHub` (``hub``): its
+    HTTP connection pool, and its worker pools if it has ``workers``, replace
+    the repository's own, so ``transport`` and ``workers`` stay with the hub.
+
+    ``max_pending_bytes`` bounds the memory pending forwards hold, alongside
+    their count: once they add up to that many bytes, further ones are shed per
+    ``overflow`` like at the in-flight limit. Incoming updates are then held
+    encoded, as the compact bytes that will be sent, from the moment they are
+    scheduled (see :meth:`schedule_update`).
+
+    With ``staleness`` (a :class:`~steeper.StalenessPolicy`), a forward that
+    waited for its turn longer than its update type's TTL is dropped rather than
+    sent late, keeping the backend's capacity for what is happening now.
     """
 
     def __init__(
@@ -39,13 +344,101 @@ class SteeperRepository:
         bot_token: str,
         *,
         timeout: float = 10.0,
+        batch_size: int | None = None,
+        batch_window: float = 0.05,
+        spool_dir: str | os.PathLike[str] | None = None,
+        retry: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreakerPolicy | None = DEFAULT_CIRCUIT_BREAKER,
+        workers: int | None = None,
+        overflow: str = DROP_NEWEST,
+        transport: TransportPolicy | None = None,
+        compression: CompressionPolicy | None = None,
+        codec: str | JsonCodec = AUTO,
+        capture_raw: bool = True,
+        coalesce_window: float | None = None,
+        dedupe: DedupePolicy | None = None,
+        concurrency: ConcurrencyPolicy | None = DEFAULT_CONCURRENCY,
+        hub: SteeperHub | None = None,
+        ordered: bool = True,
+        fairness: FairnessPolicy | None = None,
+        drain_timeout: float = DRAIN_TIMEOUT,
+        max_pending_bytes: int | None = None,
+        staleness: StalenessPolicy | None = None,
     ) -> None:
+        if drain_timeout < 0:
+            raise ValueError("drain_timeout must not be negative")
+        if max_pending_bytes is not None and max_pending_bytes < 1:
+            raise ValueError("max_pending_bytes must be at least 1")
+        self._drain_timeout = drain_timeout
+        self._max_pending_bytes = max_pending_bytes
+        self._closing = False
         self._config = SteeperConfig(
             base_url=base_url,
             bot_id=bot_id,
             bot_token=bot_token,
         )
-        self._client = SteeperClient(self._config, timeout=timeout)
+        limiter = AdaptiveLimit(concurrency) if concurrency is not None else None
+        self._client = SteeperClient(
+            self._config,
+            timeout=timeout,
+            retry=retry,
+            circuit_breaker=circuit_breaker,
+            transport=transport,
+            compression=compression,
+            codec=codec,
+            limiter=limiter,
+            http=hub.http if hub is not None else None,
+        )
+        self._update_batcher: Batcher[Body, bool] | None = None
+        self._outgoing_batcher: Batcher[dict[str, Any], bool] | None = None
+        if batch_size is not None:
+            # Shared, updates first: a reply's batch waits for its update's.
+            order = SendOrder()
+            self._update_batcher = Batcher(
+                self._client.forward_updates,
+                max_size=batch_size,
+                max_delay=batch_window,
+                order=order,
+            )
+            self._outgoing_batcher = Batcher(
+                self._client.log_bot_messages,
+                max_size=batch_size,
+                max_delay=batch_window,
+                order=order,
+            )
+        self._coalescer: Coalescer[tuple[Any, Any], dict[str, Any]] | None = None
+        if coalesce_window is not None:
+            self._coalescer = Coalescer(
+                self._deliver_messages,
+                key=lambda body: (body["chat_id"], body["message_id"]),
+                window=coalesce_window,
+            )
+        self._seen_updates: DedupeCache | None = None
+        self._seen_messages: DedupeCache | None = None
+        if dedupe is not None:
+            self._seen_updates = DedupeCache(dedupe, kind=_UPDATE)
+            self._seen_messages = DedupeCache(dedupe, kind=_MESSAGE)
+        self._spool = Spool(spool_dir) if spool_dir is not None else None
+        self._replay_task: asyncio.Task[None] | None = None
+        self._flush_handle: asyncio.TimerHandle | None = None
+        # Spooled records currently being sent by a live forward, which the
+        # replay must leave alone.
+        self._live: set[int] = set()
+        self._backend_down = False
+        self._scheduler = Scheduler(
+            workers=workers,
+            overflow=overflow,
+            limiter=limiter,
+            name=bot_id,
+            pools=hub.pools if hub is not None else None,
+            ordered=ordered,
+            fairness=fairness,
+            max_bytes=max_pending_bytes,
+            staleness=staleness,
+        )
+        self._raw_updates = (
+            RawUpdateCache(decode=self._client.codec.decode) if capture_raw else None
+        )
 
     @property
     def config(self) -> SteeperConfig:
@@ -56,18 +449,264 @@ class SteeperRepository:
         """Low-level HTTP client (same instance integrations have always used)."""
         return self._client
 
-    async def forward_update(self, update: dict[str, Any]) -> None:
-        """POST a raw Telegram update JSON to Steeper."""
-        await self._client.forward_update(update)
+    @property
+    def scheduler(self) -> Scheduler:
+        """Runs forwards in the background; see :class:`~steeper._background.Scheduler`."""
+        return self._scheduler
+
+    @property
+    def raw_updates(self) -> RawUpdateCache | None:
+        """Updates captured verbatim by the integration; ``None`` with ``capture_raw=False``."""
+        return self._raw_updates
+
+    @property
+    def drain_timeout(self) -> float:
+        """Seconds :meth:`aclose` waits for pending forwards."""
+        return self._drain_timeout
+
+    @property
+    def accepting(self) -> bool:
+        """Whether forwarding now can achieve anything; cheap and safe from any thread.
+
+        ``False`` once shutting down, and while the circuit breaker is open — unless
+        there is a spool, which keeps everything for later and so must still see
+        every forward.
+        """
+        if self._closing:
+            return False
+        return self._spool is not None or self._client.accepting
+
+    def is_new_update(self, update_id: int) -> bool:
+        """Whether ``update_id`` has not been forwarded recently; always true without ``dedupe``.
+
+        Records it, so ask once per update, right before scheduling its forward.
+        """
+        seen = self._seen_updates
+        return seen is None or seen.first_sighting(update_id)
+
+    def is_new_outgoing(self, chat_id: int, message_id: int, text: str | None) -> bool:
+        """Whether this is not the text last logged for the message; always true without ``dedupe``.
+
+        Unlike :meth:`is_new_update` it records nothing: a message counts as logged
+        once it has been sent or spooled, so one that was shed or failed is logged
+        if it comes again.
+        """
+        seen = self._seen_messages
+        return seen is None or not seen.seen((chat_id, message_id), text)
+
+    async def forward_update(self, update: Body) -> None:
+        """POST a raw Telegram update JSON to Steeper, as a dict or already encoded.
+
+        With batching enabled this returns once the batch holding ``update`` has
+        been sent.
+        """
+        await self._deliver(_UPDATE, [update])
+
+    async def forward_update_from(self, build: Callable[[_T], dict[str, Any]], source: _T) -> None:
+        """Forward the update ``build(source)`` returns, building it only now.
+
+        Integrations schedule this with the framework's update object, so the
+        serialization runs in the background rather than ahead of the bot's
+        handlers. A ``build`` that raises drops the update, logged at debug level.
+        """
+        try:
+            update = build(source)
+        except Exception:
+            logger.debug("Failed to build update payload", exc_info=True)
+            return
+        await self.forward_update(update)
+
+    def schedule_update(
+        self, build: Callable[[_T], dict[str, Any]], source: _T, *, threadsafe: bool = False
+    ) -> None:
+        """Have :attr:`scheduler` forward the update ``build(source)`` returns.
+
+        Integrations call this with the framework's update object, which also
+        gives the forward its priority, chat and type. The payload is normally
+        built by the scheduled work, in the background. With ``max_pending_bytes``
+        it is built and encoded here instead: the byte budget needs its size, and
+        while it waits the forward holds only those bytes, not the framework's
+        objects. ``threadsafe`` submits from a thread without a running loop.
+        """
+        scheduler = self._scheduler
+        submit = scheduler.submit_threadsafe if threadsafe else scheduler.submit
+        priority = update_priority(source)
+        key = update_chat_id(source)
+        kind = update_kind(source)
+        if self._max_pending_bytes is None:
+            submit(self.forward_update_from, build, source, priority=priority, key=key, kind=kind)
+            return
+        try:
+            body = self._client.codec.encode(build(source))
+        except Exception:
+            logger.debug("Failed to build update payload", exc_info=True)
+            return
+        submit(self.forward_update, body, priority=priority, key=key, kind=kind, size=len(body))
 
     async def record_outgoing(self, snapshot: OutgoingMessageSnapshot) -> None:
         """Log a single outgoing bot message to Steeper."""
-        await self._client.log_bot_message(
-            chat_id=snapshot.chat_id,
-            text=snapshot.text,
-            message_id=snapshot.message_id,
-            date=snapshot.date,
-        )
+        await self.record_outgoing_many([snapshot])
+
+    async def record_outgoing_many(self, snapshots: Sequence[OutgoingMessageSnapshot]) -> None:
+        """Log several outgoing bot messages to Steeper in one request.
+
+        Meant for API calls that return many messages at once (``sendMediaGroup``)
+        and for callers that already hold a batch, e.g. a broadcast loop.
+        """
+        if self._seen_messages is not None:
+            # Integrations have checked already; this catches a repeat logged while
+            # the forward waited, and callers that don't check.
+            snapshots = [
+                s for s in snapshots if self.is_new_outgoing(s.chat_id, s.message_id, s.text)
+            ]
+            if not snapshots:
+                return
+        bodies = [asdict(s) for s in snapshots]
+        if self._coalescer is None:
+            await self._deliver_messages(bodies)
+            return
+        if len(bodies) == 1:
+            await self._coalescer.add(bodies[0])
+        else:
+            await asyncio.gather(*(self._coalescer.add(body) for body in bodies))
+
+    async def _deliver_messages(self, bodies: list[dict[str, Any]]) -> None:
+        delivered = await self._deliver(_MESSAGE, bodies)
+        seen = self._seen_messages
+        if delivered and seen is not None:
+            for body in bodies:
+                seen.record((body["chat_id"], body["message_id"]), body["text"])
+
+    async def _deliver(self, kind: str, bodies: Sequence[Any]) -> bool:
+        """Send ``bodies``; whether they were delivered or are kept in the spool for replay."""
+        spool = self._spool
+        if spool is None:
+            return await self._send(kind, bodies)
+        self._start_spooling()
+        seqs = [spool.append(kind, body) for body in bodies]
+        live = {seq for seq in seqs if seq is not None}
+        if self._backend_down and len(live) == len(bodies):
+            # Safely on disk; the replay delivers it once the backend is back,
+            # instead of this forward waiting out the full timeout now.
+            return True
+        self._live |= live
+        try:
+            settled = await self._send(kind, bodies)
+        finally:
+            self._live -= live
+        if settled:
+            for seq in live:
+                spool.ack(seq)
+        else:
+            self._backend_down = True
+        return settled or len(live) == len(bodies)
+
+    async def _send(self, kind: str, bodies: Sequence[Any]) -> bool:
+        batcher = self._update_batcher if kind == _UPDATE else self._outgoing_batcher
+        if batcher is not None:
+            return all(await asyncio.gather(*(batcher.add(body) for body in bodies)))
+        if kind == _UPDATE:
+            return await self._client.forward_updates(bodies)
+        return await self._client.log_bot_messages(bodies)
+
+    async def start(self) -> None:
+        """Start replaying what a previous process left in the spool.
+
+        Integrations call this as the bot starts; otherwise the replay waits for
+        the first forward, which a quiet bot may not see for a long time. A no-op
+        without ``spool_dir``.
+        """
+        if self._spool is not None and not self._closing:
+            self._start_spooling()
+
+    def _start_spooling(self) -> None:
+        """Arm the buffered-write flush timer and the replay task on the running loop."""
+        loop = asyncio.get_running_loop()
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(_SPOOL_FLUSH_INTERVAL, self._flush_spool)
+        if self._replay_task is None or self._replay_task.done():
+            self._replay_task = loop.create_task(self._replay_spool())
+
+    def _flush_spool(self) -> None:
+        self._flush_handle = None
+        if self._spool is None:
+            return
+        try:
+            self._spool.flush()
+        except OSError:
+            logger.warning("Failed to flush the Steeper spool", exc_info=True)
+
+    async def _replay_spool(self) -> None:
+        """Send spooled records no live forward is handling, oldest first, in bulk."""
+        spool = self._spool
+        assert spool is not None
+        while True:
+            try:
+                unsent = spool.unsent(exclude=self._live)
+                records = []
+                if unsent:
+                    # File I/O and decoding: off the loop, so handlers don't wait on it.
+                    records = await asyncio.to_thread(read_records, unsent, limit=_REPLAY_BATCH)
+            except (OSError, ValueError):
+                # An unreadable segment must not kill the replay for good.
+                logger.warning("Failed to read the Steeper spool", exc_info=True)
+                await asyncio.sleep(_REPLAY_INTERVAL)
+                continue
+            if not records:
+                await asyncio.sleep(_SPOOL_FLUSH_INTERVAL)
+                continue
+            updates = [r for r in records if r.kind == _UPDATE]
+            messages = [r for r in records if r.kind == _MESSAGE]
+            settled = True
+            if updates:
+                settled = await self._client.forward_updates([r.body for r in updates])
+            if settled and messages:
+                settled = await self._client.log_bot_messages([r.body for r in messages])
+            if not settled:
+                self._backend_down = True
+                await asyncio.sleep(_REPLAY_INTERVAL)
+                continue
+            self._backend_down = False
+            for record in records:
+                spool.ack(record.seq)
+
+    async def flush(self, timeout: float | None = None) -> int:
+        """Stop taking new forwards and wait for the scheduled ones to be sent.
+
+        Waits up to ``timeout`` seconds (``drain_timeout`` if ``None``); queued
+        forwards still go out batched and in order. Returns how many were still
+        pending at the deadline — abandoned, unless a spool keeps them for the
+        next process.
+        """
+        self._closing = True
+        timeout = self._drain_timeout if timeout is None else timeout
+        abandoned = await self._scheduler.drain(timeout)
+        if abandoned:
+            logger.warning(
+                "Steeper gave up on %d pending forwards after waiting %.1fs at shutdown",
+                abandoned,
+                timeout,
+            )
+        return abandoned
 
     async def aclose(self) -> None:
+        """Flush pending forwards (see :meth:`flush`), then release every resource."""
+        await self.flush()
+        self._scheduler.close()
+        if self._coalescer is not None:
+            # First: what it still holds goes through the batcher and spool below.
+            await self._coalescer.flush()
+        for batcher in (self._update_batcher, self._outgoing_batcher):
+            if batcher is not None:
+                await batcher.flush()
+        if self._replay_task is not None:
+            self._replay_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._replay_task
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._spool is not None:
+            # Whatever is still unacknowledged stays on disk for the next process.
+            self._spool.close()
         await self._client.close()
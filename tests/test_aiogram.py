@@ -4,7 +4,8 @@ The integration patches ``Bot.__call__`` at class level and keeps its state in
 module globals, so every test restores both.
 """
 
-from collections.abc import Iterator
+import json
+from collections.abc import Iterator, Sequence
 from datetime import datetime, timezone
 from typing import Any
 
@@ -12,8 +13,20 @@ import httpx
 import pytest
 import respx
 from aiogram import Bot, Dispatcher
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import (
+    AnswerCallbackQuery,
+    EditMessageText,
+    GetUpdates,
+    SendChatAction,
+    SendMessage,
+)
 from aiogram.types import Chat, Message, Update
 
+from steeper import DedupePolicy
+from steeper._background import Scheduler
+from steeper._codec import StdlibCodec
+from steeper._raw import RawUpdateCache
 from steeper.integrations import aiogram as integration
 from steeper.integrations.aiogram import (
     SteeperMiddleware,
@@ -31,13 +44,25 @@ BASE_URL = "https://api.example.com"
 @pytest.fixture(autouse=True)
 def _restore_patch_state() -> Iterator[None]:
     orig_call = Bot.__call__
+    orig_check = BaseSession.check_response
     saved = integration._orig_bot_call
+    saved_check = integration._orig_check_response
     yield
     Bot.__call__ = orig_call  # type: ignore[method-assign]
+    BaseSession.check_response = orig_check  # type: ignore[method-assign]
     integration._orig_bot_call = saved
+    integration._orig_check_response = saved_check
     integration._bot_repos.clear()
 
 
+_MESSAGE_DICT: dict[str, Any] = {
+    "message_id": 7,
+    "date": 1700000000,
+    "chat": {"id": 42, "type": "private"},
+    "text": "hello",
+}
+
+
 def _middleware() -> SteeperMiddleware:
     return SteeperMiddleware(base_url=BASE_URL, bot_id=BOT_ID, bot_token=BOT_TOKEN)
 
@@ -56,16 +81,36 @@ def _message(**overrides: Any) -> Message:
 class _RecordingRepository:
     """Stands in for SteeperRepository; records instead of sending."""
 
+    accepting = True
+    scheduler = Scheduler()
+    raw_updates = None
+
     def __init__(self) -> None:
         self.updates: list[dict[str, Any]] = []
         self.outgoing: list[OutgoingMessageSnapshot] = []
 
+    def is_new_update(self, update_id: int) -> bool:
+        return True
+
+    def is_new_outgoing(self, chat_id: int, message_id: int, text: str | None) -> bool:
+        return True
+
     async def forward_update(self, update: dict[str, Any]) -> None:
         self.updates.append(update)
 
+    async def forward_update_from(self, build: Any, source: Any) -> None:
+        # The real one, so a failing build is handled as in production.
+        await SteeperRepository.forward_update_from(self, build, source)  # type: ignore[arg-type]
+
+    def schedule_update(self, build: Any, source: Any, *, threadsafe: bool = False) -> None:
+        self.scheduler.submit(self.forward_update_from, build, source)
+
     async def record_outgoing(self, snapshot: OutgoingMessageSnapshot) -> None:
         self.outgoing.append(snapshot)
 
+    async def record_outgoing_many(self, snapshots: Sequence[OutgoingMessageSnapshot]) -> None:
+        self.outgoing.extend(snapshots)
+
 
 def test_snapshot_uses_text_and_message_fields() -> None:
     snapshot = _snapshot_from_aiogram_message(_message())
@@ -217,6 +262,14 @@ async def test_dispatcher_shutdown_closes_the_client() -> None:
     assert middleware.client._http.is_closed
 
 
+def test_dispatcher_startup_starts_the_repository() -> None:
+    dp = Dispatcher()
+    middleware = _middleware()
+    middleware.setup(dp, Bot(token=BOT_TOKEN))
+
+    assert [h for h in dp.startup.handlers if h.callback == middleware.repository.start]
+
+
 def test_repository_and_client_are_exposed() -> None:
     middleware = _middleware()
 
@@ -228,3 +281,164 @@ async def _yield() -> None:
     import asyncio
 
     await asyncio.sleep(0)
+
+
+async def test_nothing_is_built_while_the_backend_is_down() -> None:
+    repo = _RecordingRepository()
+    repo.accepting = False
+    middleware = _IncomingMiddleware(repo)  # type: ignore[arg-type]
+
+    class _Exploding(Update):
+        def model_dump(self, **kwargs: Any) -> dict[str, Any]:
+            raise AssertionError("must not serialize while the breaker is open")
+
+    async def handler(event: Update, data: dict[str, Any]) -> str:
+        return "handled"
+
+    assert await middleware(handler, _Exploding(update_id=1), {}) == "handled"
+    assert repo.updates == []
+
+
+async def test_polled_updates_are_forwarded_as_telegram_sent_them() -> None:
+    bot = Bot(token=BOT_TOKEN)
+    repo = _RecordingRepository()
+    repo.raw_updates = RawUpdateCache(decode=StdlibCodec().decode)  # type: ignore[assignment]
+    integration._bot_repos[bot] = repo  # type: ignore[assignment]
+    integration._wrap_session_check_response()
+    # ``future_field`` is unknown to aiogram's models, so a dump would lose it.
+    raw = {"update_id": 9, "message": {**_MESSAGE_DICT, "future_field": 1}}
+    body = json.dumps({"ok": True, "result": [raw]})
+
+    updates = bot.session.check_response(bot, GetUpdates(), 200, body)
+    middleware = _IncomingMiddleware(repo)  # type: ignore[arg-type]
+
+    async def handler(event: Update, data: dict[str, Any]) -> None:
+        return None
+
+    await middleware(handler, updates.result[0], {})
+    for _ in range(3):
+        await _yield()
+
+    assert repo.updates == [raw]
+    assert len(repo.raw_updates) == 0
+    await bot.session.close()
+
+
+@respx.mock
+async def test_webhook_updates_fed_to_the_dispatcher_are_forwarded_verbatim() -> None:
+    dp = Dispatcher()
+    bot = Bot(token=BOT_TOKEN)
+    middleware = _middleware()
+    route = respx.post(middleware.repository.config.webhook_url).mock(
+        return_value=httpx.Response(200)
+    )
+    middleware.setup(dp, bot)
+    raw = {"update_id": 3, "message": {**_MESSAGE_DICT, "future_field": 1}}
+
+    await dp.feed_webhook_update(bot, raw)
+    for _ in range(5):
+        await _yield()
+
+    assert json.loads(route.calls.last.request.content) == raw
+    await middleware.aclose()
+    await bot.session.close()
+
+
+async def test_an_uncaptured_update_falls_back_to_a_dump() -> None:
+    repo = _RecordingRepository()
+    repo.raw_updates = RawUpdateCache(decode=StdlibCodec().decode)  # type: ignore[assignment]
+    middleware = _IncomingMiddleware(repo)  # type: ignore[arg-type]
+
+    async def handler(event: Update, data: dict[str, Any]) -> None:
+        return None
+
+    await middleware(handler, Update(update_id=1, message=_message()), {})
+    for _ in range(3):
+        await _yield()
+
+    assert repo.updates[0]["message"]["text"] == "hello"
+
+
+async def test_the_payload_is_built_after_the_handler_starts() -> None:
+    repo = _RecordingRepository()
+    middleware = _IncomingMiddleware(repo)  # type: ignore[arg-type]
+    events: list[str] = []
+
+    class _Recording(Update):
+        def model_dump(self, **kwargs: Any) -> dict[str, Any]:
+            events.append("dump")
+            return super().model_dump(**kwargs)
+
+    async def handler(event: Update, data: dict[str, Any]) -> None:
+        events.append("handler")
+
+    await middleware(handler, _Recording(update_id=1, message=_message()), {})
+    for _ in range(3):
+        await _yield()
+
+    assert events == ["handler", "dump"]
+    assert repo.updates[0]["update_id"] == 1
+
+
+class _SpyScheduler:
+    """Records what would have been scheduled."""
+
+    def __init__(self) -> None:
+        self.submitted: list[tuple[Any, ...]] = []
+
+    def submit(self, fn: Any, *args: Any, **kwargs: Any) -> None:
+        self.submitted.append((fn, *args))
+
+
+@pytest.mark.parametrize(
+    ("method", "result", "logged"),
+    [
+        (SendMessage(chat_id=42, text="hello"), _message(), True),
+        (SendChatAction(chat_id=42, action="typing"), True, False),
+        (AnswerCallbackQuery(callback_query_id="1"), True, False),
+        # An inline message edit returns True, not the message.
+        (EditMessageText(inline_message_id="1", text="hi"), True, False),
+    ],
+)
+async def test_only_calls_returning_messages_schedule_work(
+    method: Any, result: Any, logged: bool
+) -> None:
+    bot = Bot(token=BOT_TOKEN)
+    repo = _RecordingRepository()
+    repo.scheduler = _SpyScheduler()  # type: ignore[assignment]
+
+    async def fake_call(self: Bot, method: Any, request_timeout: int | None = None) -> Any:
+        return result
+
+    Bot.__call__ = fake_call  # type: ignore[method-assign]
+    integration._wrap_bot_api_call(bot, repo)  # type: ignore[arg-type]
+
+    assert await bot(method) is result
+    assert len(repo.scheduler.submitted) == (1 if logged else 0)
+    await bot.session.close()
+
+
+@respx.mock
+async def test_a_repeated_message_is_dropped_before_it_is_scheduled() -> None:
+    bot = Bot(token=BOT_TOKEN)
+    repo = SteeperRepository(
+        base_url=BASE_URL, bot_id=BOT_ID, bot_token=BOT_TOKEN, dedupe=DedupePolicy()
+    )
+    respx.post(repo.config.bot_message_url).mock(return_value=httpx.Response(200))
+    await repo.record_outgoing(_snapshot_from_aiogram_message(_message()))
+    scheduler, spy = repo.scheduler, _SpyScheduler()
+    repo._scheduler = spy  # type: ignore[assignment]
+
+    async def fake_call(self: Bot, method: Any, request_timeout: int | None = None) -> Any:
+        return _message(text=method.text)
+
+    Bot.__call__ = fake_call  # type: ignore[method-assign]
+    integration._wrap_bot_api_call(bot, repo)
+
+    await bot(SendMessage(chat_id=42, text="hello"))
+    await bot(SendMessage(chat_id=42, text="hello!"))
+
+    assert [args[2][0].text for args in spy.submitted] == ["hello!"]
+    repo._scheduler = scheduler
+    await repo.aclose()
+    await bot.session.close()
@@ -1,18 +1,38 @@
 import asyncio
+import math
+import random
 import threading
 import time
+from typing import Any
 
 import pytest
 
 from steeper import _background
-from steeper._background import fire_and_forget, fire_and_forget_threadsafe, run_threadsafe
+from steeper._background import (
+    DROP_OLDEST,
+    HIGH,
+    LOW,
+    PRIORITY,
+    AdaptiveLimit,
+    Bulkhead,
+    ConcurrencyPolicy,
+    Scheduler,
+    StalenessPolicy,
+    WorkerPool,
+    WorkItem,
+    fire_and_forget,
+    fire_and_forget_threadsafe,
+    run_threadsafe,
+)
 
 
 @pytest.fixture(autouse=True)
-def _reset_drop_state() -> None:
-    """Drop accounting is module-global; keep it from leaking between tests."""
-    _background._dropped_total = 0
-    _background._drop_warned = False
+def _reset_drop_state(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The module-level functions account against a shared default bulkhead; give
+    each test a fresh one (a task left pending on an earlier test's loop would
+    hold one of its in-flight slots forever)."""
+    monkeypatch.setattr(_background, "_default_bulkhead", Bulkhead())
+    monkeypatch.setattr(_background, "_process_limit", _background.PROCESS_MAX_IN_FLIGHT)
 
 
 async def test_runs_coroutine_to_completion() -> None:
@@ -84,7 +104,7 @@ async def test_drops_work_past_the_in_flight_cap(
         await asyncio.sleep(0)
 
         assert started == _background.MAX_IN_FLIGHT
-        assert _background._dropped_total == 10
+        assert _background._default_bulkhead.dropped_total == 10
 
         release.set()
         for _ in range(3):
@@ -107,14 +127,14 @@ async def test_queue_draining_rearms_the_warning() -> None:
     for _ in range(_background.MAX_IN_FLIGHT + 1):
         fire_and_forget(blocked())
     await asyncio.sleep(0)
-    assert _background._drop_warned is True
+    assert _background._default_bulkhead._drop_warned is True
 
     release.set()
-    while _background._tasks:
+    while _background._default_bulkhead.in_flight:
         await asyncio.sleep(0)
 
     # Drained: a later outage is a new event and deserves its own warning.
-    assert _background._drop_warned is False
+    assert _background._default_bulkhead._drop_warned is False
 
 
 def test_threadsafe_drops_work_past_the_in_flight_cap() -> None:
@@ -126,15 +146,15 @@ def test_threadsafe_drops_work_past_the_in_flight_cap() -> None:
     try:
         for _ in range(_background.MAX_IN_FLIGHT + 5):
             fire_and_forget_threadsafe(blocked())
-        assert _background._dropped_total >= 5
+        assert _background._default_bulkhead.dropped_total >= 5
     finally:
         release.set()
         # Drain before returning: the background loop is shared, and leaving it
         # at the cap would make whatever test runs next drop its own work.
         deadline = time.monotonic() + 10
-        while _background._background_loop._in_flight and time.monotonic() < deadline:
+        while _background._in_flight() and time.monotonic() < deadline:
             time.sleep(0.01)
-        assert not _background._background_loop._in_flight
+        assert not _background._in_flight()
 
 
 def test_run_threadsafe_waits_for_completion() -> None:
@@ -154,3 +174,670 @@ def test_run_threadsafe_swallows_failures() -> None:
         raise RuntimeError("boom")
 
     run_threadsafe(boom(), timeout=5)
+
+
+async def test_worker_pool_runs_items_on_a_fixed_set_of_workers() -> None:
+    pool = WorkerPool(workers=2)
+    running = 0
+    peak = 0
+    done: list[int] = []
+
+    async def work(n: int) -> None:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0)
+        running -= 1
+        done.append(n)
+
+    for n in range(10):
+        pool.put(WorkItem(work, (n,)))
+    while pool.pending:
+        await asyncio.sleep(0)
+
+    assert done == list(range(10))
+    assert peak == 2
+    pool.close()
+
+
+async def test_worker_pool_survives_failing_items() -> None:
+    pool = WorkerPool(workers=1)
+    done = asyncio.Event()
+
+    async def boom() -> None:
+        raise RuntimeError("boom")
+
+    async def work() -> None:
+        done.set()
+
+    pool.put(WorkItem(boom, ()))
+    pool.put(WorkItem(work, ()))
+    await asyncio.wait_for(done.wait(), timeout=1)
+    pool.close()
+
+
+async def test_worker_pool_drops_items_past_its_limit() -> None:
+    pool = WorkerPool(workers=2, limit=5)
+    release = asyncio.Event()
+
+    async def blocked() -> None:
+        await release.wait()
+
+    for _ in range(8):
+        pool.put(WorkItem(blocked, ()))
+    await asyncio.sleep(0)
+
+    assert pool.pending == 5
+    assert _background._default_bulkhead.dropped_total == 3
+    release.set()
+    while pool.pending:
+        await asyncio.sleep(0)
+    # Drained: the next overflow warns again.
+    assert _background._default_bulkhead._drop_warned is False
+    pool.close()
+
+
+async def test_closing_a_worker_pool_releases_items_parked_behind_a_busy_key() -> None:
+    bulkhead = Bulkhead()
+    pool = WorkerPool(workers=2, bulkhead=bulkhead)
+    release = asyncio.Event()
+
+    for _ in range(3):
+        pool.put(WorkItem(release.wait, (), key=42))
+    for _ in range(3):
+        await asyncio.sleep(0)
+    # One runs; the other worker parked the rest behind it.
+    assert bulkhead.in_flight == 3
+
+    pool.close()
+    await asyncio.sleep(0)
+
+    assert bulkhead.in_flight == 0
+    assert pool.pending == 0
+
+
+def test_worker_pool_rejects_zero_workers() -> None:
+    with pytest.raises(ValueError):
+        WorkerPool(workers=0)
+    with pytest.raises(ValueError):
+        Scheduler(workers=0)
+
+
+async def test_scheduler_with_workers_uses_one_pool_per_loop() -> None:
+    scheduler = Scheduler(workers=3)
+    done = asyncio.Event()
+
+    async def work(event: asyncio.Event) -> None:
+        event.set()
+
+    scheduler.submit(work, done)
+    await asyncio.wait_for(done.wait(), timeout=1)
+
+    # Nothing beyond the three workers is left running on this loop.
+    assert scheduler._group is not None
+    pool = scheduler._group._pools[asyncio.get_running_loop()]
+    assert len(pool._workers) == 3
+    scheduler.close()
+    assert not scheduler._group._pools
+
+
+async def test_scheduler_without_workers_creates_a_task_per_forward() -> None:
+    scheduler = Scheduler()
+    done = asyncio.Event()
+
+    async def work() -> None:
+        done.set()
+
+    scheduler.submit(work)
+    await asyncio.wait_for(done.wait(), timeout=1)
+    assert scheduler._group is None
+
+
+def test_scheduler_threadsafe_runs_on_the_background_loop() -> None:
+    scheduler = Scheduler(workers=2)
+    done = threading.Event()
+
+    async def work() -> None:
+        done.set()
+
+    scheduler.submit_threadsafe(work)
+    assert done.wait(timeout=5)
+
+
+async def test_drop_oldest_evicts_queued_work_for_new_work() -> None:
+    pool = WorkerPool(workers=1, limit=3, overflow=DROP_OLDEST)
+    release = asyncio.Event()
+    done: list[int] = []
+
+    async def work(n: int) -> None:
+        await release.wait()
+        done.append(n)
+
+    pool.put(WorkItem(work, (0,)))
+    await asyncio.sleep(0)
+    for n in range(1, 5):
+        pool.put(WorkItem(work, (n,)))
+    release.set()
+    while pool.pending:
+        await asyncio.sleep(0)
+
+    # 0 was already running; 1 and 2 were the oldest queued when 3 and 4 arrived.
+    assert done == [0, 3, 4]
+    assert _background._default_bulkhead.dropped_total == 2
+    pool.close()
+
+
+async def _drained(pool: WorkerPool) -> None:
+    while pool.pending:
+        await asyncio.sleep(0)
+
+
+async def test_an_eviction_that_empties_the_queue_keeps_the_pool_working() -> None:
+    bulkhead = Bulkhead()
+    pool = WorkerPool(workers=1, limit=2, overflow=DROP_OLDEST, bulkhead=bulkhead)
+    release = asyncio.Event()
+    done: list[int] = []
+
+    async def work(n: int) -> None:
+        await release.wait()
+        done.append(n)
+
+    pool.put(WorkItem(work, (0,)))
+    await asyncio.sleep(0)
+    # 1 is the only one queued; 2 evicts it, leaving the queue empty meanwhile.
+    pool.put(WorkItem(work, (1,)))
+    pool.put(WorkItem(work, (2,)))
+    release.set()
+    await asyncio.wait_for(_drained(pool), timeout=1)
+    pool.put(WorkItem(work, (3,)))
+    await asyncio.wait_for(_drained(pool), timeout=1)
+
+    assert done == [0, 2, 3]
+    assert bulkhead.in_flight == 0
+    pool.close()
+
+
+async def test_priority_overflow_keeps_headroom_for_high_priority_work() -> None:
+    pool = WorkerPool(workers=1, limit=8, overflow=PRIORITY)
+    release = asyncio.Event()
+
+    async def blocked() -> None:
+        await release.wait()
+
+    for _ in range(8):
+        pool.put(WorkItem(blocked, (), LOW))
+    assert pool.pending == 6
+    for _ in range(3):
+        pool.put(WorkItem(blocked, (), HIGH))
+    assert pool.pending == 8
+    assert _background._default_bulkhead.dropped_total == 3
+
+    release.set()
+    while pool.pending:
+        await asyncio.sleep(0)
+    pool.close()
+
+
+async def test_priority_overflow_applies_to_the_task_engine() -> None:
+    scheduler = Scheduler(overflow=PRIORITY)
+    release = asyncio.Event()
+
+    async def blocked() -> None:
+        await release.wait()
+
+    try:
+        for _ in range(_background.MAX_IN_FLIGHT):
+            scheduler.submit(blocked, priority=LOW)
+        low_admitted = scheduler.bulkhead.in_flight
+        scheduler.submit(blocked, priority=HIGH)
+        assert scheduler.bulkhead.in_flight == low_admitted + 1
+        assert low_admitted < _background.MAX_IN_FLIGHT
+    finally:
+        release.set()
+        while scheduler.bulkhead.in_flight:
+            await asyncio.sleep(0)
+
+
+async def test_drops_are_counted_by_reason() -> None:
+    pool = WorkerPool(workers=1, limit=4, overflow=PRIORITY)
+    release = asyncio.Event()
+    before = _background._DROPPED.value("low-priority share reached")
+
+    async def blocked() -> None:
+        await release.wait()
+
+    for _ in range(4):
+        pool.put(WorkItem(blocked, (), LOW))
+
+    assert _background._DROPPED.value("low-priority share reached") == before + 1
+    release.set()
+    while pool.pending:
+        await asyncio.sleep(0)
+    pool.close()
+
+
+def _limit(**options: float) -> AdaptiveLimit:
+    return AdaptiveLimit(ConcurrencyPolicy(**options))  # type: ignore[arg-type]
+
+
+def test_the_limit_grows_while_requests_stay_fast() -> None:
+    limit = _limit(initial=10, min_limit=1, max_limit=100)
+
+    for i in range(100):
+        limit.record(float(i), 0.01, ok=True)
+
+    # One per window of ``limit`` requests: 10 + 1/10 + 1/10.1 + ...
+    assert 17 <= limit.current <= 20
+
+
+def test_the_limit_stops_at_max_limit() -> None:
+    limit = _limit(initial=10, min_limit=1, max_limit=11)
+
+    for i in range(1000):
+        limit.record(float(i), 0.01, ok=True)
+
+    assert limit.current == 11
+
+
+def test_a_failure_shrinks_the_limit_once_per_window() -> None:
+    limit = _limit(initial=100, backoff=0.5)
+    limit.record(0.0, 0.01, ok=True)
+
+    # All sent before the first decrease: one window, one decrease.
+    for _ in range(10):
+        limit.record(0.0, 0.01, ok=False)
+    assert limit.current == 50
+
+    limit.record(time.perf_counter() + 1, 0.01, ok=False)
+    assert limit.current == 25
+
+
+def test_sustained_latency_well_above_the_baseline_counts_as_congestion() -> None:
+    limit = _limit(initial=100, tolerance=2.0, backoff=0.5)
+    for _ in range(100):
+        limit.record(0.0, 0.01, ok=True)
+    assert limit.current == 100
+
+    # One slow request barely moves the recent average...
+    limit.record(0.0, 0.05, ok=True)
+    assert limit.current == 101
+
+    # ...but a run of them does, and then the limit shrinks (once per window).
+    for _ in range(20):
+        limit.record(0.0, 0.05, ok=True)
+    assert limit.current == 50
+
+
+def test_jitter_on_a_healthy_backend_does_not_shrink_the_limit() -> None:
+    limit = _limit(initial=512, min_limit=16, max_limit=4096)
+    rng = random.Random(7)
+
+    # Log-normal around 20 ms: most requests near it, some several times slower.
+    for _ in range(5000):
+        limit.record(time.perf_counter(), rng.lognormvariate(math.log(0.02), 0.5), ok=True)
+
+    assert limit.current >= 512
+
+
+def test_the_limit_never_drops_below_min_limit() -> None:
+    limit = _limit(initial=20, min_limit=16, backoff=0.5)
+
+    limit.record(0.0, 1.0, ok=False)
+
+    assert limit.current == 16
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"min_limit": 0},
+        {"initial": 8, "min_limit": 16},
+        {"initial": 8000},
+        {"tolerance": 1.0},
+        {"backoff": 1.0},
+        {"backoff": 0},
+    ],
+)
+def test_concurrency_policy_rejects_nonsense(options: dict[str, float]) -> None:
+    with pytest.raises(ValueError):
+        ConcurrencyPolicy(**options)  # type: ignore[arg-type]
+
+
+async def test_the_scheduler_sheds_at_the_adaptive_limit() -> None:
+    limit = _limit(initial=20, min_limit=4, backoff=0.5)
+    limit.record(0.0, 1.0, ok=False)
+    scheduler = Scheduler(limiter=limit)
+    release = asyncio.Event()
+    started = 0
+
+    async def blocked() -> None:
+        nonlocal started
+        started += 1
+        await release.wait()
+
+    for _ in range(15):
+        scheduler.submit(blocked)
+    await asyncio.sleep(0)
+
+    assert started == 10
+    assert scheduler.bulkhead.dropped_total == 5
+    release.set()
+    await asyncio.sleep(0)
+
+
+async def test_a_worker_pool_follows_the_adaptive_limit() -> None:
+    limit = _limit(initial=20, min_limit=4, backoff=0.5)
+    limit.record(0.0, 1.0, ok=False)
+    pool = WorkerPool(workers=2, limiter=limit)
+    release = asyncio.Event()
+
+    for _ in range(15):
+        pool.put(WorkItem(release.wait, ()))
+
+    assert pool.pending == 10
+    pool.close()
+
+
+async def test_a_saturated_scheduler_does_not_starve_another() -> None:
+    stuck = Scheduler(workers=1, name="stuck")
+    healthy = Scheduler(workers=1, name="healthy")
+    release = asyncio.Event()
+    done = asyncio.Event()
+
+    for _ in range(_background.MAX_IN_FLIGHT + 3):
+        stuck.submit(release.wait)
+
+    async def work() -> None:
+        done.set()
+
+    healthy.submit(work)
+    await asyncio.wait_for(done.wait(), 1)
+    assert stuck.bulkhead.dropped_total == 3
+    assert healthy.bulkhead.dropped_total == 0
+    release.set()
+    stuck.close()
+    healthy.close()
+
+
+async def test_drop_warnings_name_the_scheduler(caplog: pytest.LogCaptureFixture) -> None:
+    pool = WorkerPool(workers=1, limit=1, bulkhead=Bulkhead("bot-a"))
+    release = asyncio.Event()
+
+    with caplog.at_level("WARNING", logger="steeper"):
+        for _ in range(2):
+            pool.put(WorkItem(release.wait, ()))
+
+    assert "for bot-a" in caplog.records[0].getMessage()
+    pool.close()
+
+
+async def test_the_process_limit_caps_every_scheduler_together() -> None:
+    before = _background._DROPPED.value("process limit reached")
+    _background.set_process_limit(_background._process_in_flight + 3)
+    first = WorkerPool(workers=1, limit=10, bulkhead=Bulkhead())
+    second = WorkerPool(workers=1, limit=10, bulkhead=Bulkhead())
+    release = asyncio.Event()
+
+    for _ in range(2):
+        first.put(WorkItem(release.wait, ()))
+        second.put(WorkItem(release.wait, ()))
+
+    assert first.pending + second.pending == 3
+    assert _background._DROPPED.value("process limit reached") == before + 1
+    first.close()
+    second.close()
+
+
+def test_the_process_limit_must_be_positive() -> None:
+    with pytest.raises(ValueError):
+        _background.set_process_limit(0)
+
+
+async def test_schedulers_sharing_pools_take_turns() -> None:
+    pools = _background.PoolGroup(1)
+    busy = Scheduler(pools=pools, name="busy")
+    quiet = Scheduler(pools=pools, name="quiet")
+    order: list[str] = []
+
+    async def work(name: str) -> None:
+        order.append(name)
+
+    for _ in range(3):
+        busy.submit(work, "busy")
+    quiet.submit(work, "quiet")
+    while len(order) < 4:
+        await asyncio.sleep(0)
+
+    # The quiet scheduler's one item doesn't wait behind the busy one's backlog.
+    assert order == ["busy", "quiet", "busy", "busy"]
+    assert busy.bulkhead is not quiet.bulkhead
+    quiet.close()
+    pools.close()
+
+
+async def test_closing_a_scheduler_keeps_shared_pools_running() -> None:
+    pools = _background.PoolGroup(1)
+    leaving = Scheduler(pools=pools)
+    staying = Scheduler(pools=pools)
+    release = asyncio.Event()
+    done = asyncio.Event()
+
+    async def work() -> None:
+        done.set()
+
+    leaving.submit(release.wait)
+    await asyncio.sleep(0)
+    leaving.submit(release.wait)
+    leaving.close()
+    # The running item finishes; the queued one is gone.
+    assert leaving.bulkhead.in_flight == 1
+    staying.submit(work)
+    release.set()
+    await asyncio.wait_for(done.wait(), 1)
+    pools.close()
+
+
+def test_a_scheduler_takes_workers_or_shared_pools_not_both() -> None:
+    with pytest.raises(ValueError):
+        Scheduler(workers=2, pools=_background.PoolGroup(2))
+
+
+async def _run_keyed(scheduler: Scheduler) -> list[str]:
+    events: list[str] = []
+    gate = asyncio.Event()
+
+    async def work(name: str, wait: bool) -> None:
+        events.append(f"{name} start")
+        if wait:
+            await gate.wait()
+        events.append(f"{name} end")
+
+    scheduler.submit(work, "a1", True, key=1)
+    scheduler.submit(work, "a2", False, key=1)
+    scheduler.submit(work, "b1", False, key=2)
+    for _ in range(5):
+        await asyncio.sleep(0)
+    gate.set()
+    while len(events) < 6:
+        await asyncio.sleep(0)
+    return events
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+async def test_work_with_the_same_key_runs_in_order(workers: int | None) -> None:
+    scheduler = Scheduler(workers=workers)
+
+    events = await _run_keyed(scheduler)
+
+    # a2 waits for a1 to finish; b1, another key, doesn't.
+    assert events.index("a2 start") > events.index("a1 end")
+    assert events.index("b1 end") < events.index("a1 end")
+    assert not scheduler._key_locks
+    scheduler.close()
+
+
+async def test_unordered_schedulers_ignore_keys() -> None:
+    scheduler = Scheduler(ordered=False)
+
+    events = await _run_keyed(scheduler)
+
+    assert events.index("a2 start") < events.index("a1 end")
+
+
+async def test_a_dropped_keyed_item_does_not_block_its_successors() -> None:
+    pool = WorkerPool(workers=1, limit=2)
+    release = asyncio.Event()
+    done = asyncio.Event()
+
+    async def work() -> None:
+        done.set()
+
+    pool.put(WorkItem(release.wait, (), key=1))
+    pool.put(WorkItem(release.wait, (), key=1))
+    pool.put(WorkItem(release.wait, (), key=1))  # over the limit: dropped
+    await asyncio.sleep(0)
+    release.set()
+    while pool.pending:
+        await asyncio.sleep(0)
+    pool.put(WorkItem(work, (), key=1))
+    await asyncio.wait_for(done.wait(), 1)
+    assert not pool._lane.running
+    pool.close()
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+async def test_drain_waits_for_admitted_work_and_refuses_new_work(workers: int | None) -> None:
+    scheduler = Scheduler(workers=workers)
+    done: list[int] = []
+
+    async def work(n: int) -> None:
+        await asyncio.sleep(0.01)
+        done.append(n)
+
+    for n in range(3):
+        scheduler.submit(work, n)
+
+    assert await scheduler.drain(timeout=1) == 0
+    assert sorted(done) == [0, 1, 2]
+    scheduler.submit(work, 3)
+    assert scheduler.bulkhead.in_flight == 0
+    scheduler.close()
+
+
+async def test_drain_reports_what_is_left_at_the_deadline() -> None:
+    scheduler = Scheduler()
+    release = asyncio.Event()
+
+    scheduler.submit(release.wait)
+    scheduler.submit(release.wait)
+
+    assert await scheduler.drain(timeout=0.01) == 2
+    release.set()
+    await scheduler.bulkhead.drained()
+
+
+def test_drain_waits_for_threadsafe_work() -> None:
+    scheduler = Scheduler()
+    done = threading.Event()
+
+    async def work() -> None:
+        await asyncio.sleep(0.01)
+        done.set()
+
+    scheduler.submit_threadsafe(work)
+    assert asyncio.run(scheduler.drain(timeout=5)) == 0
+    assert done.is_set()
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+async def test_the_byte_budget_sheds_work_that_would_exceed_it(workers: int | None) -> None:
+    scheduler = Scheduler(workers=workers, max_bytes=100)
+    release = asyncio.Event()
+
+    for _ in range(3):
+        scheduler.submit(release.wait, size=40)
+
+    assert scheduler.bulkhead.in_flight == 2
+    assert scheduler.bulkhead.pending_bytes == 80
+    assert scheduler.bulkhead.dropped_total == 1
+    release.set()
+    await scheduler.bulkhead.drained()
+    assert scheduler.bulkhead.pending_bytes == 0
+    scheduler.close()
+
+
+async def test_work_larger_than_the_byte_budget_is_admitted_alone() -> None:
+    bulkhead = Bulkhead(max_bytes=100)
+
+    assert bulkhead.acquire(10, size=500) is None
+    assert bulkhead.acquire(10, size=1) == "byte budget reached"
+    bulkhead.release(size=500)
+    assert bulkhead.pending_bytes == 0
+
+
+async def test_drop_oldest_evicts_enough_work_to_fit_the_byte_budget() -> None:
+    pool = WorkerPool(workers=1, overflow=DROP_OLDEST, bulkhead=Bulkhead(max_bytes=100))
+    release = asyncio.Event()
+    done: list[int] = []
+
+    async def work(n: int) -> None:
+        await release.wait()
+        done.append(n)
+
+    pool.put(WorkItem(work, (0,), size=10))
+    await asyncio.sleep(0)
+    for n in range(1, 4):
+        pool.put(WorkItem(work, (n,), size=30))
+    pool.put(WorkItem(work, (4,), size=60))
+    release.set()
+    while pool.pending:
+        await asyncio.sleep(0)
+
+    # 60 more bytes needed two of the queued 30-byte items gone, oldest first.
+    assert done == [0, 3, 4]
+    pool.close()
+
+
+def test_the_byte_budget_must_be_positive() -> None:
+    with pytest.raises(ValueError, match="max_bytes"):
+        Bulkhead(max_bytes=0)
+
+
+@pytest.mark.parametrize("workers", [None, 1])
+async def test_work_that_waited_past_its_ttl_is_dropped(workers: int | None) -> None:
+    scheduler = Scheduler(
+        workers=workers, staleness=StalenessPolicy(kinds={"callback_query": 0.01})
+    )
+    release = asyncio.Event()
+    done: list[str] = []
+    before = _background._DROPPED.value("stale")
+
+    async def work(name: str) -> None:
+        await release.wait()
+        done.append(name)
+
+    # One chat, so the later items wait for the first one whatever the engine.
+    for name, kind in (("first", "message"), ("late", "callback_query"), ("kept", "message")):
+        scheduler.submit(work, name, key=42, kind=kind)
+    await asyncio.sleep(0.05)
+    release.set()
+    await scheduler.drain(timeout=1)
+
+    assert done == ["first", "kept"]
+    assert _background._DROPPED.value("stale") == before + 1
+    scheduler.close()
+
+
+def test_the_staleness_policy_picks_the_ttl_of_the_kind() -> None:
+    policy = StalenessPolicy(ttl=60, kinds={"callback_query": 5})
+
+    assert policy.ttl_for("callback_query") == 5
+    assert policy.ttl_for("message") == 60
+    assert policy.ttl_for(None) == 60
+    assert StalenessPolicy().ttl_for("message") is None
+
+
+@pytest.mark.parametrize("options", [{"ttl": 0}, {"kinds": {"message": -1}}])
+def test_the_staleness_policy_rejects_nonsense(options: dict[str, Any]) -> None:
+    with pytest.raises(ValueError):
+        StalenessPolicy(**options)
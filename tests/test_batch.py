@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from steeper._batch import Batcher, SendOrder
+
+
+class _Recorder:
+    def __init__(self) -> None:
+        self.batches: list[list[int]] = []
+
+    async def send(self, items: list[int]) -> None:
+        self.batches.append(list(items))
+
+
+async def test_items_within_the_window_share_one_send() -> None:
+    sink = _Recorder()
+    batcher = Batcher(sink.send, max_size=100, max_delay=0.01)
+
+    await asyncio.gather(*(batcher.add(i) for i in range(5)))
+
+    assert sink.batches == [[0, 1, 2, 3, 4]]
+
+
+async def test_a_full_batch_is_sent_without_waiting_for_the_window() -> None:
+    sink = _Recorder()
+    batcher = Batcher(sink.send, max_size=2, max_delay=60)
+
+    await asyncio.wait_for(asyncio.gather(*(batcher.add(i) for i in range(4))), timeout=1)
+
+    assert sink.batches == [[0, 1], [2, 3]]
+
+
+async def test_flush_sends_a_partial_batch() -> None:
+    sink = _Recorder()
+    batcher = Batcher(sink.send, max_size=100, max_delay=60)
+    waiter = asyncio.ensure_future(batcher.add(1))
+    await asyncio.sleep(0)
+
+    await batcher.flush()
+    await waiter
+
+    assert sink.batches == [[1]]
+
+
+async def test_a_failed_send_reaches_every_submitter() -> None:
+    async def boom(items: list[int]) -> None:
+        raise RuntimeError("boom")
+
+    batcher = Batcher(boom, max_size=2, max_delay=60)
+
+    results = await asyncio.gather(batcher.add(1), batcher.add(2), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+async def test_batchers_sharing_an_order_send_one_at_a_time_first_come_first() -> None:
+    sent: list[str] = []
+
+    async def slow(items: list[str]) -> None:
+        await asyncio.sleep(0.02)
+        sent.extend(items)
+
+    async def fast(items: list[str]) -> None:
+        sent.extend(items)
+
+    order = SendOrder()
+    first = Batcher(slow, max_size=100, max_delay=60, order=order)
+    second = Batcher(fast, max_size=1, max_delay=60, order=order)
+
+    # The full batch of the second flushes the first's pending one ahead of it.
+    await asyncio.wait_for(asyncio.gather(first.add("update"), second.add("reply")), timeout=1)
+
+    assert sent == ["update", "reply"]
+
+
+def test_rejects_a_non_positive_size() -> None:
+    with pytest.raises(ValueError, match="at least 1"):
+        Batcher(_Recorder().send, max_size=0, max_delay=0.01)
@@ -0,0 +1,64 @@
+import pytest
+
+from steeper import CircuitBreakerPolicy
+from steeper._breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def _breaker(**policy: float) -> CircuitBreaker:
+    return CircuitBreaker(CircuitBreakerPolicy(**policy))  # type: ignore[arg-type]
+
+
+def _fail(breaker: CircuitBreaker, times: int) -> None:
+    for _ in range(times):
+        assert breaker.allow()
+        breaker.record(False)
+
+
+def test_opens_after_consecutive_failures() -> None:
+    breaker = _breaker(failure_threshold=3)
+
+    _fail(breaker, 2)
+    assert breaker.state == CLOSED
+    _fail(breaker, 1)
+
+    assert breaker.state == OPEN
+    assert breaker.is_open
+    assert not breaker.allow()
+
+
+def test_a_success_resets_the_failure_count() -> None:
+    breaker = _breaker(failure_threshold=2)
+
+    _fail(breaker, 1)
+    breaker.allow()
+    breaker.record(True)
+    _fail(breaker, 1)
+
+    assert breaker.state == CLOSED
+
+
+def test_half_open_admits_one_probe_that_closes_it(monkeypatch: pytest.MonkeyPatch) -> None:
+    breaker = _breaker(failure_threshold=1, reset_timeout=10)
+    _fail(breaker, 1)
+    clock = breaker._open_until
+    monkeypatch.setattr("steeper._breaker.time.monotonic", lambda: clock)
+
+    assert breaker.state == HALF_OPEN
+    assert not breaker.is_open
+    assert breaker.allow()
+    assert not breaker.allow(), "only one probe at a time"
+
+    breaker.record(True)
+    assert breaker.state == CLOSED
+
+
+def test_a_failed_probe_reopens_it(monkeypatch: pytest.MonkeyPatch) -> None:
+    breaker = _breaker(failure_threshold=1, reset_timeout=10)
+    _fail(breaker, 1)
+    clock = breaker._open_until
+    monkeypatch.setattr("steeper._breaker.time.monotonic", lambda: clock)
+
+    assert breaker.allow()
+    breaker.record(False)
+
+    assert breaker.is_open
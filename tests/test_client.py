@@ -1,8 +1,14 @@
+import asyncio
+import json
+import time
+from typing import Any
+
 import httpx
 import pytest
 import respx
 
-from steeper import SteeperConfig
+from steeper import CircuitBreakerPolicy, RetryPolicy, SteeperConfig
+from steeper._background import AdaptiveLimit, ConcurrencyPolicy
 from steeper._client import SteeperClient
 
 BOT_ID = "d74d82b4-7c00-408d-b611-2411e0b3c6f8"
@@ -87,3 +93,286 @@ async def test_token_hash_is_redacted_from_error_logs(caplog: pytest.LogCaptureF
     for record in caplog.records:
         assert client._config.token_hash not in record.getMessage()
     await client.close()
+
+
+@respx.mock
+async def test_forward_updates_sends_one_bulk_request() -> None:
+    client = _client()
+    route = respx.post(client._config.webhook_batch_url).mock(
+        return_value=httpx.Response(200, json={"results": [{"ok": True}, {"ok": True}]})
+    )
+    single = respx.post(client._config.webhook_url).mock(return_value=httpx.Response(200))
+
+    updates = [{"update_id": 1}, {"update_id": 2}]
+    await client.forward_updates(updates)
+
+    import json
+
+    assert route.call_count == 1
+    assert not single.called
+    request = route.calls.last.request
+    assert request.headers["x-telegram-bot-api-secret-token"] == client._config.token_hash
+    assert json.loads(request.content) == {"updates": updates}
+    await client.close()
+
+
+@respx.mock
+async def test_forward_updates_logs_each_rejected_item(caplog: pytest.LogCaptureFixture) -> None:
+    client = _client()
+    respx.post(client._config.webhook_batch_url).mock(
+        return_value=httpx.Response(
+            200, json={"results": [{"ok": True}, {"ok": False, "detail": "malformed"}]}
+        )
+    )
+
+    with caplog.at_level("WARNING", logger="steeper"):
+        await client.forward_updates([{"update_id": 1}, {"update_id": 2}])
+
+    rejected = [r.getMessage() for r in caplog.records]
+    assert rejected == ["Steeper webhook rejected update_id 2: malformed"]
+    await client.close()
+
+
+@respx.mock
+async def test_encoded_updates_are_sent_as_they_are() -> None:
+    client = _client()
+    route = respx.post(client._config.webhook_url).mock(return_value=httpx.Response(200))
+    body = b'{"update_id":1,"message":{"text":"\xc3\xa9"}}'
+
+    await client.forward_update(body)
+
+    assert route.calls.last.request.content == body
+    await client.close()
+
+
+@respx.mock
+async def test_encoded_updates_are_spliced_into_bulk_requests(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    client = _client()
+    route = respx.post(client._config.webhook_batch_url).mock(
+        return_value=httpx.Response(
+            200, json={"results": [{"ok": True}, {"ok": False, "detail": "malformed"}]}
+        )
+    )
+
+    with caplog.at_level("WARNING", logger="steeper"):
+        await client.forward_updates([{"update_id": 1}, b'{"update_id":2}'])
+
+    import json
+
+    assert json.loads(route.calls.last.request.content) == {
+        "updates": [{"update_id": 1}, {"update_id": 2}]
+    }
+    assert [r.getMessage() for r in caplog.records] == [
+        "Steeper webhook rejected update_id 2: malformed"
+    ]
+    await client.close()
+
+
+@respx.mock
+async def test_forward_updates_falls_back_when_the_backend_has_no_bulk_endpoint() -> None:
+    client = _client()
+    bulk = respx.post(client._config.webhook_batch_url).mock(return_value=httpx.Response(404))
+    single = respx.post(client._config.webhook_url).mock(return_value=httpx.Response(200))
+
+    await client.forward_updates([{"update_id": 1}, {"update_id": 2}])
+    await client.forward_updates([{"update_id": 3}, {"update_id": 4}])
+
+    # The missing endpoint is remembered: only the first batch tries it.
+    assert bulk.call_count == 1
+    assert single.call_count == 4
+    await client.close()
+
+
+@respx.mock
+async def test_the_fallback_sends_items_concurrently_but_a_message_s_versions_in_order() -> None:
+    client = _client()
+    respx.post(client._config.bot_message_batch_url).mock(return_value=httpx.Response(404))
+    in_flight = peak = 0
+    logged: list[str] = []
+
+    async def store(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        logged.append(json.loads(request.content)["text"])
+        return httpx.Response(200)
+
+    respx.post(client._config.bot_message_url).mock(side_effect=store)
+    messages = [
+        {"chat_id": 42, "message_id": 7, "text": "v1"},
+        {"chat_id": 43, "message_id": 1, "text": "other"},
+        {"chat_id": 42, "message_id": 7, "text": "v2"},
+    ]
+
+    assert await client.log_bot_messages(messages) is True
+
+    assert peak == 2
+    assert logged.index("v1") < logged.index("v2")
+    await client.close()
+
+
+@respx.mock
+async def test_forward_updates_failure_is_non_fatal(caplog: pytest.LogCaptureFixture) -> None:
+    client = _client()
+    respx.post(client._config.webhook_batch_url).mock(return_value=httpx.Response(500))
+
+    with caplog.at_level("WARNING", logger="steeper"):
+        await client.forward_updates([{"update_id": 1}, {"update_id": 2}])
+
+    assert any("batch webhook failed" in r.message for r in caplog.records)
+    await client.close()
+
+
+@respx.mock
+async def test_log_bot_messages_sends_one_bulk_request() -> None:
+    client = _client()
+    route = respx.post(client._config.bot_message_batch_url).mock(return_value=httpx.Response(200))
+
+    await client.log_bot_messages(
+        [
+            {"chat_id": 42, "text": "a", "message_id": 7, "date": 1700000000},
+            {"chat_id": 42, "text": "b", "message_id": 8},
+        ]
+    )
+
+    import json
+
+    messages = json.loads(route.calls.last.request.content)["messages"]
+    assert route.call_count == 1
+    assert messages[0] == {"chat_id": 42, "text": "a", "message_id": 7, "date": 1700000000}
+    assert isinstance(messages[1]["date"], int) and messages[1]["date"] > 0
+    await client.close()
+
+
+def _retrying_client(**policy: Any) -> SteeperClient:
+    cfg = SteeperConfig(base_url=BASE_URL, bot_id=BOT_ID, bot_token=BOT_TOKEN)
+    return SteeperClient(cfg, retry=RetryPolicy(backoff=0.001, jitter=False, **policy))
+
+
+@respx.mock
+async def test_transient_failures_are_retried() -> None:
+    client = _retrying_client(attempts=3)
+    url = client._config.webhook_url
+    route = respx.post(url).mock(
+        side_effect=[
+            httpx.ConnectError("reset", request=httpx.Request("POST", url)),
+            httpx.Response(503),
+            httpx.Response(200),
+        ]
+    )
+
+    assert await client.forward_update({"update_id": 1}) is True
+    assert route.call_count == 3
+    await client.close()
+
+
+@pytest.mark.parametrize("status", [400, 403, 404])
+@respx.mock
+async def test_permanent_statuses_are_not_retried(status: int) -> None:
+    client = _retrying_client(attempts=3)
+    route = respx.post(client._config.webhook_url).mock(return_value=httpx.Response(status))
+
+    assert await client.forward_update({"update_id": 1}) is True
+    assert route.call_count == 1
+    await client.close()
+
+
+@respx.mock
+async def test_gives_up_after_the_last_attempt() -> None:
+    client = _retrying_client(attempts=2)
+    route = respx.post(client._config.webhook_url).mock(return_value=httpx.Response(502))
+
+    assert await client.forward_update({"update_id": 1}) is False
+    assert route.call_count == 2
+    await client.close()
+
+
+@respx.mock
+async def test_a_retry_after_past_the_deadline_gives_up_at_once() -> None:
+    client = _retrying_client(attempts=5, deadline=1.0)
+    route = respx.post(client._config.webhook_url).mock(
+        return_value=httpx.Response(429, headers={"Retry-After": "2"})
+    )
+
+    assert await client.forward_update({"update_id": 1}) is False
+    assert route.call_count == 1
+    await client.close()
+
+
+@respx.mock
+async def test_a_retry_after_past_max_backoff_gives_up_at_once() -> None:
+    client = _retrying_client(attempts=5, max_backoff=1.0)
+    route = respx.post(client._config.webhook_url).mock(
+        return_value=httpx.Response(429, headers={"Retry-After": "5"})
+    )
+
+    # Retrying after max_backoff rather than the 5s asked for would be refused again.
+    assert await client.forward_update({"update_id": 1}) is False
+    assert route.call_count == 1
+    await client.close()
+
+
+@respx.mock
+async def test_a_fractional_retry_after_is_honoured() -> None:
+    client = _retrying_client(attempts=2)
+    route = respx.post(client._config.webhook_url).mock(
+        side_effect=[
+            httpx.Response(429, headers={"Retry-After": "0.05"}),
+            httpx.Response(200),
+        ]
+    )
+
+    started = time.monotonic()
+    assert await client.forward_update({"update_id": 1}) is True
+    assert time.monotonic() - started >= 0.05
+    assert route.call_count == 2
+    await client.close()
+
+
+@respx.mock
+async def test_the_retry_budget_bounds_amplification() -> None:
+    client = _retrying_client(attempts=5, budget_burst=2, budget_ratio=0)
+    route = respx.post(client._config.webhook_url).mock(return_value=httpx.Response(503))
+
+    for _ in range(3):
+        await client.forward_update({"update_id": 1})
+
+    # 3 first tries, plus the 2 retries the budget holds.
+    assert route.call_count == 5
+    await client.close()
+
+
+@respx.mock
+async def test_an_open_breaker_stops_sending(caplog: pytest.LogCaptureFixture) -> None:
+    cfg = SteeperConfig(base_url=BASE_URL, bot_id=BOT_ID, bot_token=BOT_TOKEN)
+    client = SteeperClient(cfg, circuit_breaker=CircuitBreakerPolicy(failure_threshold=2))
+    route = respx.post(cfg.webhook_url).mock(return_value=httpx.Response(503))
+
+    with caplog.at_level("WARNING", logger="steeper"):
+        for _ in range(5):
+            assert await client.forward_update({"update_id": 1}) is False
+
+    assert route.call_count == 2
+    assert not client.accepting
+    assert any("pausing forwards" in r.message for r in caplog.records)
+    await client.close()
+
+
+@respx.mock
+async def test_requests_feed_the_adaptive_limit() -> None:
+    limit = AdaptiveLimit(ConcurrencyPolicy(initial=100, backoff=0.5))
+    cfg = SteeperConfig(base_url=BASE_URL, bot_id=BOT_ID, bot_token=BOT_TOKEN)
+    client = SteeperClient(cfg, circuit_breaker=None, limiter=limit)
+    route = respx.post(cfg.webhook_url).mock(return_value=httpx.Response(200))
+
+    await client.forward_update({"update_id": 1})
+    assert limit.current == 100
+
+    route.mock(return_value=httpx.Response(503))
+    await client.forward_update({"update_id": 2})
+    assert limit.current == 50
+    await client.close()
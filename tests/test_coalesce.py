@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from steeper._coalesce import Coalescer
+
+
+class _Recorder:
+    def __init__(self) -> None:
+        self.sends: list[list[tuple[str, int]]] = []
+
+    async def send(self, items: list[tuple[str, int]]) -> None:
+        self.sends.append(list(items))
+
+
+def _coalescer(sink: _Recorder, window: float) -> Coalescer[str, tuple[str, int]]:
+    return Coalescer(sink.send, key=lambda item: item[0], window=window)
+
+
+async def test_only_the_latest_item_per_key_is_sent() -> None:
+    sink = _Recorder()
+    coalescer = _coalescer(sink, 0.01)
+
+    await asyncio.gather(*(coalescer.add(("a", version)) for version in range(5)))
+
+    assert sink.sends == [[("a", 4)]]
+
+
+async def test_keys_keep_the_position_of_their_first_item() -> None:
+    sink = _Recorder()
+    coalescer = _coalescer(sink, 0.01)
+
+    await asyncio.gather(coalescer.add(("a", 1)), coalescer.add(("b", 1)), coalescer.add(("a", 2)))
+
+    assert sink.sends == [[("a", 2), ("b", 1)]]
+
+
+async def test_a_later_window_sends_again() -> None:
+    sink = _Recorder()
+    coalescer = _coalescer(sink, 0.01)
+
+    await coalescer.add(("a", 1))
+    await coalescer.add(("a", 2))
+
+    assert sink.sends == [[("a", 1)], [("a", 2)]]
+
+
+async def test_a_window_is_sent_only_after_the_one_before_it() -> None:
+    stored: list[str] = []
+    delays = iter([0.05, 0])
+
+    async def send(items: list[tuple[str, str]]) -> None:
+        # The older version's request is the slow one.
+        await asyncio.sleep(next(delays))
+        stored.extend(text for _, text in items)
+
+    coalescer: Coalescer[str, tuple[str, str]] = Coalescer(send, key=lambda i: i[0], window=0)
+    first = asyncio.ensure_future(coalescer.add(("a", "v1")))
+    await asyncio.sleep(0.01)
+    await coalescer.add(("a", "v2"))
+    await first
+
+    assert stored == ["v1", "v2"]
+
+
+async def test_flush_sends_what_is_pending() -> None:
+    sink = _Recorder()
+    coalescer = _coalescer(sink, 60)
+    waiter = asyncio.ensure_future(coalescer.add(("a", 1)))
+    await asyncio.sleep(0)
+
+    await coalescer.flush()
+    await waiter
+
+    assert sink.sends == [[("a", 1)]]
+
+
+async def test_a_failed_send_reaches_every_submitter() -> None:
+    async def boom(items: list[tuple[str, int]]) -> None:
+        raise RuntimeError("boom")
+
+    coalescer: Coalescer[str, tuple[str, int]] = Coalescer(boom, key=lambda i: i[0], window=0)
+
+    results = await asyncio.gather(
+        coalescer.add(("a", 1)), coalescer.add(("a", 2)), return_exceptions=True
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_rejects_a_negative_window() -> None:
+    with pytest.raises(ValueError, match="negative"):
+        _coalescer(_Recorder(), -1)
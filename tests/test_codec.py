@@ -0,0 +1,71 @@
+import json
+from typing import Any
+
+import httpx
+import pytest
+import respx
+
+from steeper import SteeperConfig
+from steeper._client import SteeperClient
+from steeper._codec import OrjsonCodec, StdlibCodec, resolve_codec
+
+CONFIG = SteeperConfig("https://api.example.com", "d74d82b4-7c00-408d-b611-2411e0b3c6f8", "1:A")
+
+PAYLOAD = {"update_id": 1, "message": {"text": "héllo ✓", "entities": [], "ok": True}}
+
+
+def test_stdlib_codec_matches_httpx_json_bodies() -> None:
+    expected = httpx.Request("POST", "https://x", json=PAYLOAD).content
+    assert StdlibCodec().encode(PAYLOAD) == expected
+
+
+def test_orjson_codec_round_trips() -> None:
+    pytest.importorskip("orjson")
+    codec = OrjsonCodec()
+    assert json.loads(codec.encode(PAYLOAD)) == PAYLOAD
+    assert codec.decode(codec.encode(PAYLOAD)) == PAYLOAD
+
+
+def test_auto_prefers_an_installed_native_codec() -> None:
+    pytest.importorskip("orjson")
+    assert resolve_codec().name == "orjson"
+
+
+def test_names_resolve_and_unknown_names_are_rejected() -> None:
+    assert resolve_codec("json").name == "json"
+    with pytest.raises(ValueError):
+        resolve_codec("yaml")
+
+
+def test_missing_library_raises_import_error(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(__import__("sys").modules, "msgspec", None)
+    with pytest.raises(ImportError, match="msgspec"):
+        resolve_codec("msgspec")
+
+
+class _CountingCodec:
+    name = "counting"
+
+    def __init__(self) -> None:
+        self.encoded = 0
+
+    def encode(self, obj: Any) -> bytes:
+        self.encoded += 1
+        return json.dumps(obj).encode()
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+@respx.mock
+async def test_client_encodes_once_per_request_with_its_codec() -> None:
+    codec = _CountingCodec()
+    client = SteeperClient(CONFIG, codec=codec)
+    route = respx.post(CONFIG.webhook_url).mock(return_value=httpx.Response(200))
+
+    await client.forward_update(PAYLOAD)
+
+    assert codec.encoded == 1
+    assert json.loads(route.calls.last.request.content) == PAYLOAD
+    assert route.calls.last.request.headers["content-type"] == "application/json"
+    await client.close()
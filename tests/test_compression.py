@@ -0,0 +1,105 @@
+"""Request compression, checked against a stand-in for the backend.
+
+The stand-in decodes bodies the way the backend's HTTP stack does — by their
+``Content-Encoding`` — and answers 415 for encodings it doesn't know.
+"""
+
+import gzip
+import json
+import sys
+from typing import Any
+
+import httpx
+import pytest
+import respx
+
+from steeper import CompressionPolicy, SteeperConfig
+from steeper._client import SteeperClient
+
+CONFIG = SteeperConfig("https://api.example.com", "d74d82b4-7c00-408d-b611-2411e0b3c6f8", "1:A")
+
+# Verbose enough to cross the default threshold, like a real update with a reply chain.
+BIG_UPDATE: dict[str, Any] = {
+    "update_id": 1,
+    "message": {
+        "message_id": 7,
+        "chat": {"id": 42, "type": "private", "first_name": "Ada"},
+        "text": "pricing? " * 200,
+    },
+}
+
+
+class _Backend:
+    """Accepts what a backend with gzip (only) support would accept."""
+
+    def __init__(self) -> None:
+        self.received: list[Any] = []
+        self.encodings: list[str | None] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        encoding = request.headers.get("content-encoding")
+        self.encodings.append(encoding)
+        body = request.content
+        if encoding == "gzip":
+            body = gzip.decompress(body)
+        elif encoding is not None:
+            return httpx.Response(415)
+        assert request.headers["content-type"] == "application/json"
+        self.received.append(json.loads(body))
+        return httpx.Response(200)
+
+
+@respx.mock
+async def test_large_bodies_are_gzipped_and_decode_to_the_same_json() -> None:
+    backend = _Backend()
+    respx.post(CONFIG.webhook_url).mock(side_effect=backend)
+    client = SteeperClient(CONFIG, compression=CompressionPolicy())
+
+    assert await client.forward_update(BIG_UPDATE) is True
+
+    assert backend.encodings == ["gzip"]
+    assert backend.received == [BIG_UPDATE]
+    await client.close()
+
+
+@respx.mock
+async def test_bodies_below_the_threshold_are_sent_as_they_are() -> None:
+    backend = _Backend()
+    respx.post(CONFIG.webhook_url).mock(side_effect=backend)
+    client = SteeperClient(CONFIG, compression=CompressionPolicy(min_bytes=1024))
+
+    await client.forward_update({"update_id": 2})
+
+    assert backend.encodings == [None]
+    assert backend.received == [{"update_id": 2}]
+    await client.close()
+
+
+@respx.mock
+async def test_unsupported_encoding_falls_back_to_plain_bodies_for_good() -> None:
+    calls: list[str | None] = []
+
+    def gzip_unaware(request: httpx.Request) -> httpx.Response:
+        encoding = request.headers.get("content-encoding")
+        calls.append(encoding)
+        return httpx.Response(415 if encoding else 200)
+
+    respx.post(CONFIG.webhook_url).mock(side_effect=gzip_unaware)
+    client = SteeperClient(CONFIG, compression=CompressionPolicy(min_bytes=0))
+
+    assert await client.forward_update(BIG_UPDATE) is True
+    assert await client.forward_update(BIG_UPDATE) is True
+
+    assert calls == ["gzip", None, None]
+    await client.close()
+
+
+def test_missing_library_points_at_the_extra(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(sys.modules, "brotli", None)
+    with pytest.raises(ImportError, match=r"steeper\[brotli\]"):
+        SteeperClient(CONFIG, compression=CompressionPolicy(algorithm="br"))
+
+
+def test_unknown_algorithm_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        CompressionPolicy(algorithm="lzma")
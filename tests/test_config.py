@@ -67,3 +67,33 @@ def test_no_warning_for_localhost_http(caplog: pytest.LogCaptureFixture) -> None
 
 def test_repr_does_not_leak_bot_token() -> None:
     assert BOT_TOKEN not in repr(_config())
+
+
+def test_webhook_batch_url_uses_bot_id() -> None:
+    assert _config().webhook_batch_url == (
+        f"https://api.example.com/v1/communications/webhook/{BOT_ID}/batch"
+    )
+
+
+def test_bot_message_batch_url_uses_bot_id() -> None:
+    assert _config().bot_message_batch_url == (
+        f"https://api.example.com/v1/communications/webhook/{BOT_ID}/bot-message/batch"
+    )
+
+
+def test_derived_values_are_computed_once() -> None:
+    cfg = _config()
+    assert cfg.token_hash is cfg.token_hash
+    assert cfg.webhook_url is cfg.webhook_url
+
+
+def test_auth_headers_are_read_only() -> None:
+    cfg = _config()
+    assert dict(cfg.auth_headers) == {"x-telegram-bot-api-secret-token": cfg.token_hash}
+    with pytest.raises(TypeError):
+        cfg.auth_headers["x"] = "y"  # type: ignore[index]
+
+
+def test_derived_values_do_not_affect_equality() -> None:
+    assert _config() == _config()
+    assert "token_hash" not in repr(_config())
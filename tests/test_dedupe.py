@@ -0,0 +1,81 @@
+import pytest
+
+from steeper._dedupe import DedupeCache, DedupePolicy
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> _Clock:
+    clock = _Clock()
+    monkeypatch.setattr("steeper._dedupe.time.monotonic", clock)
+    return clock
+
+
+def test_a_repeat_is_not_a_first_sighting(clock: _Clock) -> None:
+    cache = DedupeCache(DedupePolicy(), kind="update")
+
+    assert cache.first_sighting(1) is True
+    assert cache.first_sighting(1) is False
+    assert cache.first_sighting(2) is True
+
+
+def test_seen_only_checks_and_record_remembers(clock: _Clock) -> None:
+    cache = DedupeCache(DedupePolicy(), kind="message")
+
+    assert cache.seen((42, 7), "A") is False
+    assert cache.seen((42, 7), "A") is False
+    cache.record((42, 7), "A")
+    assert cache.seen((42, 7), "A") is True
+    assert cache.seen((42, 7), "B") is False
+
+
+def test_keys_expire_after_the_ttl(clock: _Clock) -> None:
+    cache = DedupeCache(DedupePolicy(ttl=10), kind="update")
+    cache.first_sighting(1)
+
+    clock.now += 11
+
+    assert cache.first_sighting(1) is True
+    assert len(cache) == 1
+
+
+def test_the_oldest_keys_go_first_past_the_size(clock: _Clock) -> None:
+    cache = DedupeCache(DedupePolicy(size=2), kind="update")
+    for key in (1, 2, 3):
+        cache.first_sighting(key)
+
+    assert len(cache) == 2
+    assert cache.first_sighting(3) is False
+    assert cache.first_sighting(1) is True
+
+
+def test_tuple_keys_are_compared_by_value(clock: _Clock) -> None:
+    cache = DedupeCache(DedupePolicy(), kind="message")
+
+    assert cache.first_sighting((42, 7, "hello")) is True
+    assert cache.first_sighting((42, 7, "hello")) is False
+    assert cache.first_sighting((42, 7, "hello!")) is True
+
+
+def test_only_a_repeat_of_the_latest_value_is_dropped(clock: _Clock) -> None:
+    cache = DedupeCache(DedupePolicy(), kind="message")
+
+    # An edit from A to B and back to A: each is new to the message.
+    assert cache.first_sighting((42, 7), "A") is True
+    assert cache.first_sighting((42, 7), "B") is True
+    assert cache.first_sighting((42, 7), "A") is True
+    assert cache.first_sighting((42, 7), "A") is False
+    assert len(cache) == 1
+
+
+@pytest.mark.parametrize("options", [{"size": 0}, {"ttl": 0}, {"ttl": -1}])
+def test_policy_rejects_nonsense(options: dict[str, float]) -> None:
+    with pytest.raises(ValueError):
+        DedupePolicy(**options)  # type: ignore[arg-type]
@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from steeper import _background
+from steeper._background import AdaptiveLimit, ConcurrencyPolicy, Scheduler
+from steeper._fairness import (
+    CHAT_QUOTA_REACHED,
+    KIND_QUOTA_REACHED,
+    FairnessPolicy,
+    Quotas,
+)
+
+
+def test_a_chat_is_held_to_its_share() -> None:
+    quotas = Quotas(FairnessPolicy(chat_share=0.1))
+
+    for _ in range(10):
+        assert quotas.refusal(42, None, cap=100, in_flight=0) is None
+        quotas.add(42, None)
+
+    assert quotas.refusal(42, None, cap=100, in_flight=0) == CHAT_QUOTA_REACHED
+    assert quotas.refusal(43, None, cap=100, in_flight=0) is None
+    quotas.add(42, None, -1)
+    assert quotas.refusal(42, None, cap=100, in_flight=0) is None
+
+
+def test_an_update_type_is_held_to_its_share_under_contention() -> None:
+    quotas = Quotas(FairnessPolicy(kind_share=0.5))
+
+    for _ in range(3):
+        quotas.add(None, "callback_query")
+
+    assert quotas.refusal(None, "callback_query", cap=4, in_flight=2) is None
+    assert quotas.refusal(None, "callback_query", cap=4, in_flight=3) == KIND_QUOTA_REACHED
+    assert quotas.refusal(None, "message", cap=4, in_flight=3) is None
+    for _ in range(3):
+        quotas.add(None, "callback_query", -1)
+    assert not quotas._kinds
+
+
+def test_every_chat_may_hold_at_least_one() -> None:
+    quotas = Quotas(FairnessPolicy(chat_share=0.01))
+
+    assert quotas.refusal(1, None, cap=10, in_flight=0) is None
+
+
+def test_memory_is_fixed_however_many_chats() -> None:
+    quotas = Quotas(FairnessPolicy(slots=64))
+
+    for chat in range(10_000):
+        quotas.add(chat, None)
+
+    assert all(len(row) == 64 for row in quotas._rows)
+    # Count-min never undercounts: each chat reads at least its own count.
+    assert all(quotas.chat_count(chat) >= 1 for chat in range(0, 10_000, 97))
+
+
+async def test_one_update_type_may_use_the_whole_limit_while_it_is_free() -> None:
+    limit = AdaptiveLimit(ConcurrencyPolicy(initial=8, min_limit=1, max_limit=8))
+    scheduler = Scheduler(limiter=limit, fairness=FairnessPolicy(kind_share=0.5))
+    release = asyncio.Event()
+    before = _background._DROPPED.value(KIND_QUOTA_REACHED)
+
+    # Past half the limit, but nothing else is waiting for the slots.
+    for _ in range(6):
+        scheduler.submit(release.wait, kind="callback_query")
+    assert scheduler.bulkhead.in_flight == 6
+    assert _background._DROPPED.value(KIND_QUOTA_REACHED) == before
+
+    # Three quarters of the limit is taken: now the share holds.
+    scheduler.submit(release.wait, kind="callback_query")
+    scheduler.submit(release.wait, kind="message")
+    assert scheduler.bulkhead.in_flight == 7
+    assert _background._DROPPED.value(KIND_QUOTA_REACHED) == before + 1
+    release.set()
+    while scheduler.bulkhead.in_flight:
+        await asyncio.sleep(0)
+    scheduler.close()
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{"chat_share": 0}, {"chat_share": 1.5}, {"kind_share": 0}, {"slots": 0}],
+)
+def test_fairness_policy_rejects_nonsense(options: dict[str, float]) -> None:
+    with pytest.raises(ValueError):
+        FairnessPolicy(**options)  # type: ignore[arg-type]
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+async def test_a_flooding_chat_does_not_crowd_out_the_others(workers: int | None) -> None:
+    scheduler = Scheduler(workers=workers, fairness=FairnessPolicy(chat_share=0.1))
+    release = asyncio.Event()
+    before = _background._DROPPED.value(CHAT_QUOTA_REACHED)
+
+    for _ in range(_background.MAX_IN_FLIGHT):
+        scheduler.submit(release.wait, key=1, kind="message")
+    for chat in range(2, 12):
+        scheduler.submit(release.wait, key=chat, kind="message")
+
+    flood_share = int(_background.MAX_IN_FLIGHT * 0.1)
+    assert scheduler.bulkhead.in_flight == flood_share + 10
+    assert _background._DROPPED.value(CHAT_QUOTA_REACHED) - before == (
+        _background.MAX_IN_FLIGHT - flood_share
+    )
+    release.set()
+    while scheduler.bulkhead.in_flight:
+        await asyncio.sleep(0)
+    scheduler.close()
@@ -0,0 +1,84 @@
+import httpx
+import pytest
+import respx
+
+import steeper
+from steeper import SteeperConfig
+from steeper._client import SteeperClient
+from steeper._metrics import MetricsRegistry, _Metric
+
+BOT_ID = "d74d82b4-7c00-408d-b611-2411e0b3c6f8"
+
+
+def test_counter_renders_one_series_per_label_value() -> None:
+    registry = MetricsRegistry()
+    counter = registry.counter("things_total", "Things.", ("kind",))
+    counter.inc("a")
+    counter.inc("a")
+    counter.inc("b", amount=3)
+
+    assert counter.value("a") == 2
+    assert registry.render() == (
+        "# HELP things_total Things.\n"
+        "# TYPE things_total counter\n"
+        'things_total{kind="a"} 2\n'
+        'things_total{kind="b"} 3\n'
+    )
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency.", ("endpoint",), buckets=(0.1, 1))
+    histogram.observe(0.05, "x")
+    histogram.observe(0.5, "x")
+    histogram.observe(5, "x")
+
+    snapshot = registry.snapshot()
+    assert snapshot['latency_seconds_bucket{endpoint="x",le="0.1"}'] == 1
+    assert snapshot['latency_seconds_bucket{endpoint="x",le="1"}'] == 2
+    assert snapshot['latency_seconds_bucket{endpoint="x",le="+Inf"}'] == 3
+    assert snapshot['latency_seconds_sum{endpoint="x"}'] == 5.55
+    assert snapshot['latency_seconds_count{endpoint="x"}'] == 3
+
+
+def test_gauge_reads_its_callback_on_collection() -> None:
+    registry = MetricsRegistry()
+    depth = [0]
+    registry.gauge("depth", "Depth.", lambda: depth[0])
+    depth[0] = 7
+    assert registry.snapshot() == {"depth": 7}
+
+
+def test_label_values_are_escaped() -> None:
+    registry = MetricsRegistry()
+    registry.counter("odd_total", "Odd.", ("reason",)).inc('say "hi"\n')
+    assert 'odd_total{reason="say \\"hi\\"\\n"} 1' in registry.render()
+
+
+def test_a_metric_without_samples_cannot_be_created() -> None:
+    class Incomplete(_Metric):
+        kind = "gauge"
+
+    with pytest.raises(TypeError):
+        Incomplete("incomplete", "Incomplete.")  # type: ignore[abstract]
+
+
+@respx.mock
+async def test_client_records_requests_bytes_latency_and_items() -> None:
+    metrics = steeper.metrics
+    client = SteeperClient(SteeperConfig("https://api.example.com", BOT_ID, "123:ABC"))
+    respx.post(client._config.webhook_url).mock(return_value=httpx.Response(200))
+    before = metrics.snapshot()
+
+    await client.forward_update({"update_id": 1})
+    await client.close()
+
+    after = metrics.snapshot()
+
+    def delta(key: str) -> float:
+        return after.get(key, 0) - before.get(key, 0)
+
+    assert delta('steeper_requests_total{endpoint="webhook",status="200"}') == 1
+    assert delta('steeper_request_bytes_total{endpoint="webhook"}') == len(b'{"update_id":1}')
+    assert delta('steeper_request_duration_seconds_count{endpoint="webhook"}') == 1
+    assert delta('steeper_sent_total{kind="update"}') == 1
@@ -6,7 +6,7 @@ asserted here, and every test restores the patch state.
 """
 
 import asyncio
-from collections.abc import Iterator
+from collections.abc import Iterator, Sequence
 from datetime import datetime, timezone
 from typing import Any
 
@@ -16,13 +16,12 @@ import respx
 from telegram import Bot, Chat, Message, Update
 from telegram.ext import ApplicationBuilder
 
+from steeper._background import Scheduler
 from steeper.integrations import ptb as integration
 from steeper.integrations.ptb import (
     SteeperMiddleware,
+    _chain_post_init,
     _chain_post_shutdown,
-    _log_ptb_outgoing,
-    _messages_from_ptb_post_result,
-    _snapshot_from_ptb_message,
     _SteeperHandler,
 )
 from steeper.repository import OutgoingMessageSnapshot, SteeperRepository
@@ -47,6 +46,7 @@ def _restore_patch_state() -> Iterator[None]:
     Bot._post = orig_post  # type: ignore[method-assign]
     integration._orig_bot_post = saved
     integration._bot_repos.clear()
+    integration._bot_keys.clear()
     integration._setup_applications.clear()
 
 
@@ -72,55 +72,35 @@ def _message(**overrides: Any) -> Message:
 class _RecordingRepository:
     """Stands in for SteeperRepository; records instead of sending."""
 
+    accepting = True
+    scheduler = Scheduler()
+    raw_updates = None
+
     def __init__(self) -> None:
         self.updates: list[dict[str, Any]] = []
         self.outgoing: list[OutgoingMessageSnapshot] = []
 
-    async def forward_update(self, update: dict[str, Any]) -> None:
-        self.updates.append(update)
-
-    async def record_outgoing(self, snapshot: OutgoingMessageSnapshot) -> None:
-        self.outgoing.append(snapshot)
-
-
-def test_snapshot_uses_text_and_message_fields() -> None:
-    assert _snapshot_from_ptb_message(_message()) == OutgoingMessageSnapshot(
-        chat_id=42, message_id=7, text="hello", date=1700000000
-    )
-
-
-def test_snapshot_falls_back_to_caption() -> None:
-    assert _snapshot_from_ptb_message(_message(text=None, caption="  a photo  ")).text == "a photo"
-
+    def is_new_update(self, update_id: int) -> bool:
+        return True
 
-def test_decodes_a_single_message_response() -> None:
-    messages = _messages_from_ptb_post_result(None, _MESSAGE_JSON)
+    def is_new_outgoing(self, chat_id: int, message_id: int, text: str | None) -> bool:
+        return True
 
-    assert [m.message_id for m in messages] == [7]
-
-
-def test_decodes_a_media_group_response() -> None:
-    payload = [_MESSAGE_JSON, {**_MESSAGE_JSON, "message_id": 8}]
-
-    messages = _messages_from_ptb_post_result(None, payload)
-
-    assert [m.message_id for m in messages] == [7, 8]
-
-
-@pytest.mark.parametrize(
-    "result",
-    [True, None, {"ok": True}, [], [{"not": "a message"}], "text"],
-)
-def test_responses_that_are_not_messages_decode_to_nothing(result: Any) -> None:
-    assert _messages_from_ptb_post_result(None, result) == []
+    async def forward_update(self, update: dict[str, Any]) -> None:
+        self.updates.append(update)
 
+    async def forward_update_from(self, build: Any, source: Any) -> None:
+        # The real one, so a failing build is handled as in production.
+        await SteeperRepository.forward_update_from(self, build, source)  # type: ignore[arg-type]
 
-async def test_log_outgoing_records_every_message() -> None:
-    repo = _RecordingRepository()
+    def schedule_update(self, build: Any, source: Any, *, threadsafe: bool = False) -> None:
+        self.scheduler.submit(self.forward_update_from, build, source)
 
-    await _log_ptb_outgoing(None, repo, [_MESSAGE_JSON, {**_MESSAGE_JSON, "message_id": 8}])  # type: ignore[arg-type]
+    async def record_outgoing(self, snapshot: OutgoingMessageSnapshot) -> None:
+        self.outgoing.append(snapshot)
 
-    assert [s.message_id for s in repo.outgoing] == [7, 8]
+    async def record_outgoing_many(self, snapshots: Sequence[OutgoingMessageSnapshot]) -> None:
+        self.outgoing.extend(snapshots)
 
 
 def test_handler_accepts_updates_and_rejects_other_objects() -> None:
@@ -225,6 +205,24 @@ async def test_post_shutdown_chain_runs_the_original_then_closes() -> None:
     assert order == ["original", "close"]
 
 
+async def test_post_init_chain_runs_the_original_then_starts() -> None:
+    app = _application()
+    order: list[str] = []
+
+    async def original(application: Any) -> None:
+        order.append("original")
+
+    app.post_init = original
+
+    async def start() -> None:
+        order.append("start")
+
+    _chain_post_init(app, start)
+    await app.post_init(app)
+
+    assert order == ["original", "start"]
+
+
 async def test_post_shutdown_chain_works_without_an_original() -> None:
     app = _application()
     closed = False
@@ -265,3 +263,107 @@ def test_repository_and_client_are_exposed() -> None:
 
     assert isinstance(middleware.repository, SteeperRepository)
     assert middleware.client is middleware.repository.client
+
+
+@respx.mock
+async def test_polled_updates_are_forwarded_as_telegram_sent_them() -> None:
+    app = _application()
+    middleware = _middleware()
+    route = respx.post(middleware.repository.config.webhook_url).mock(
+        return_value=httpx.Response(200)
+    )
+    # ``future_field`` is unknown to PTB, so ``to_dict`` would lose it.
+    raw = {"update_id": 9, "message": {**_MESSAGE_JSON, "future_field": 1}}
+
+    async def fake_post(self: Any, endpoint: str, data: Any = None, **kwargs: Any) -> Any:
+        return [raw]
+
+    Bot._post = fake_post  # type: ignore[method-assign]
+    middleware.setup(app)
+    [result] = await app.bot._post("getUpdates", {})
+    handler = _SteeperHandler(middleware.repository)
+
+    await handler.handle_update(Update.de_json(result, app.bot), app, None, None)  # type: ignore[arg-type]
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+    import json
+
+    assert json.loads(route.calls.last.request.content) == raw
+    assert middleware.repository.raw_updates is not None
+    assert len(middleware.repository.raw_updates) == 0
+    await middleware.aclose()
+
+
+@pytest.mark.parametrize(
+    ("endpoint", "result", "logged"),
+    [
+        ("sendMessage", _MESSAGE_JSON, True),
+        ("sendMediaGroup", [_MESSAGE_JSON, _MESSAGE_JSON], True),
+        ("sendChatAction", True, False),
+        ("getMe", {"id": 1, "is_bot": True, "first_name": "bot"}, False),
+        # An inline message edit returns True, not the message.
+        ("editMessageText", True, False),
+    ],
+)
+async def test_only_calls_returning_messages_schedule_work(
+    endpoint: str, result: Any, logged: bool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    app = _application()
+    middleware = _middleware()
+    submitted: list[Any] = []
+    monkeypatch.setattr(
+        middleware.repository.scheduler, "submit", lambda fn, *args, **kw: submitted.append(fn)
+    )
+
+    async def fake_post(self: Any, endpoint: str, data: Any = None, **kwargs: Any) -> Any:
+        return result
+
+    Bot._post = fake_post  # type: ignore[method-assign]
+    middleware.setup(app)
+
+    assert await app.bot._post(endpoint, {}) == result
+    assert len(submitted) == (1 if logged else 0)
+    await middleware.aclose()
+
+
+@respx.mock
+async def test_a_media_group_is_logged_in_one_request() -> None:
+    app = _application()
+    middleware = _middleware()
+    route = respx.post(middleware.repository.config.bot_message_batch_url).mock(
+        return_value=httpx.Response(200)
+    )
+    group = [_MESSAGE_JSON, {**_MESSAGE_JSON, "message_id": 8}]
+
+    async def fake_post(self: Any, endpoint: str, data: Any = None, **kwargs: Any) -> Any:
+        return group
+
+    Bot._post = fake_post  # type: ignore[method-assign]
+    middleware.setup(app)
+
+    await app.bot._post("sendMediaGroup", {})
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+    assert route.call_count == 1
+    await middleware.aclose()
+
+
+def test_the_bot_key_is_hashed_once_per_bot(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(integration, "_bot_keys", {})
+    bot, other = Bot(BOT_TOKEN), Bot("999:ZZZ")
+    calls = 0
+    sha256 = integration.hashlib.sha256
+
+    def counting_sha256(data: bytes) -> Any:
+        nonlocal calls
+        calls += 1
+        return sha256(data)
+
+    monkeypatch.setattr(integration.hashlib, "sha256", counting_sha256)
+
+    keys = {integration._bot_key(b) for b in (bot, other, bot, other)}
+
+    assert calls == 2
+    assert len(keys) == 2
@@ -0,0 +1,56 @@
+"""Tests for the raw update cache."""
+
+import json
+
+from steeper._codec import StdlibCodec
+from steeper._raw import RawUpdateCache
+
+
+def _cache(limit: int = 8) -> RawUpdateCache:
+    return RawUpdateCache(decode=StdlibCodec().decode, limit=limit)
+
+
+def test_an_update_is_claimed_once() -> None:
+    cache = _cache()
+    update = {"update_id": 1, "message": {"text": "hi"}}
+
+    cache.put_many([update])
+
+    assert cache.pop(1) is update
+    assert cache.pop(1) is None
+
+
+def test_malformed_entries_are_ignored() -> None:
+    cache = _cache()
+
+    cache.put_many([{"message": {}}, {"update_id": "1"}, "update", None])
+
+    assert len(cache) == 0
+
+
+def test_the_oldest_updates_are_evicted_past_the_limit() -> None:
+    cache = _cache(limit=2)
+
+    cache.put_many({"update_id": i} for i in range(3))
+
+    assert cache.pop(0) is None
+    assert cache.pop(1) == {"update_id": 1}
+    assert cache.pop(2) == {"update_id": 2}
+
+
+def test_a_get_updates_response_body_is_decoded() -> None:
+    cache = _cache()
+    body = json.dumps({"ok": True, "result": [{"update_id": 4}, {"update_id": 5}]})
+
+    cache.put_response(body)
+
+    assert len(cache) == 2
+    assert cache.pop(5) == {"update_id": 5}
+
+
+def test_an_error_response_captures_nothing() -> None:
+    cache = _cache()
+
+    cache.put_response(b'{"ok": false, "description": "Conflict"}')
+
+    assert len(cache) == 0
@@ -0,0 +1,601 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import Any
+
+import httpx
+import pytest
+import respx
+
+from steeper import (
+    DedupePolicy,
+    OutgoingMessageSnapshot,
+    StalenessPolicy,
+    SteeperHub,
+    SteeperRepository,
+    TransportPolicy,
+    _background,
+)
+from steeper._background import HIGH, LOW, AdaptiveLimit
+from steeper.repository import (
+    OUTGOING_KIND,
+    snapshot_from_message_dict,
+    snapshots_from_message_json,
+    update_chat_id,
+    update_kind,
+    update_priority,
+)
+
+BOT_ID = "d74d82b4-7c00-408d-b611-2411e0b3c6f8"
+BOT_TOKEN = "123456:ABC-DEF"
+OTHER_BOT_ID = "0b7c55e2-3f1a-4c1e-9a52-6f1c2d8e4b90"
+BASE_URL = "https://api.example.com"
+
+_MESSAGE_JSON = {
+    "message_id": 7,
+    "chat": {"id": 42, "type": "private"},
+    "date": 1700000000,
+    "text": "hello",
+}
+
+
+def _repository(**options: object) -> SteeperRepository:
+    return SteeperRepository(base_url=BASE_URL, bot_id=BOT_ID, bot_token=BOT_TOKEN, **options)  # type: ignore[arg-type]
+
+
+@respx.mock
+async def test_forwards_are_sent_one_by_one_by_default() -> None:
+    repo = _repository()
+    route = respx.post(repo.config.webhook_url).mock(return_value=httpx.Response(200))
+
+    await asyncio.gather(*(repo.forward_update({"update_id": i}) for i in range(3)))
+
+    assert route.call_count == 3
+    await repo.aclose()
+
+
+@respx.mock
+async def test_batching_coalesces_concurrent_forwards() -> None:
+    repo = _repository(batch_size=10, batch_window=0.01)
+    route = respx.post(repo.config.webhook_batch_url).mock(return_value=httpx.Response(200))
+
+    await asyncio.gather(*(repo.forward_update({"update_id": i}) for i in range(3)))
+
+    assert route.call_count == 1
+    body = json.loads(route.calls.last.request.content)
+    assert [u["update_id"] for u in body["updates"]] == [0, 1, 2]
+    await repo.aclose()
+
+
+@respx.mock
+async def test_record_outgoing_many_sends_one_request() -> None:
+    repo = _repository()
+    route = respx.post(repo.config.bot_message_batch_url).mock(return_value=httpx.Response(200))
+    snapshots = [OutgoingMessageSnapshot(chat_id=42, message_id=i, text="x") for i in (7, 8)]
+
+    await repo.record_outgoing_many(snapshots)
+
+    body = json.loads(route.calls.last.request.content)
+    assert route.call_count == 1
+    assert [m["message_id"] for m in body["messages"]] == [7, 8]
+    await repo.aclose()
+
+
+@respx.mock
+async def test_batching_coalesces_separate_outgoing_messages() -> None:
+    repo = _repository(batch_size=10, batch_window=0.01)
+    route = respx.post(repo.config.bot_message_batch_url).mock(return_value=httpx.Response(200))
+
+    await asyncio.gather(
+        *(
+            repo.record_outgoing(OutgoingMessageSnapshot(chat_id=42, message_id=i, text="x"))
+            for i in range(3)
+        )
+    )
+
+    assert route.call_count == 1
+    await repo.aclose()
+
+
+@respx.mock
+async def test_spooled_forwards_are_acked_once_delivered(tmp_path: Path) -> None:
+    repo = _repository(spool_dir=tmp_path)
+    respx.post(repo.config.webhook_url).mock(return_value=httpx.Response(200))
+
+    await repo.forward_update({"update_id": 1})
+
+    assert repo._spool is not None and repo._spool.pending_count == 0
+    await repo.aclose()
+
+
+@respx.mock
+async def test_spool_replays_what_an_outage_left_behind(tmp_path: Path) -> None:
+    repo = _repository(spool_dir=tmp_path)
+    respx.post(repo.config.webhook_url).mock(return_value=httpx.Response(503))
+
+    await repo.forward_update({"update_id": 1})
+    await repo.forward_update({"update_id": 2})
+    await repo.aclose()
+
+    # A fresh process with the backend back up delivers both in one bulk request.
+    respx.post(repo.config.webhook_url).mock(return_value=httpx.Response(200))
+    bulk = respx.post(repo.config.webhook_batch_url).mock(return_value=httpx.Response(200))
+    restarted = _repository(spool_dir=tmp_path)
+    await restarted.forward_update({"update_id": 3})
+    for _ in range(50):
+        if restarted._spool is not None and restarted._spool.pending_count == 0:
+            break
+        await asyncio.sleep(0.01)
+
+    assert restarted._spool is not None and restarted._spool.pending_count == 0
+    body = json.loads(bulk.calls.last.request.content)
+    assert [u["update_id"] for u in body["updates"]] == [1, 2]
+    await restarted.aclose()
+
+
+@respx.mock
+async def test_start_replays_the_spool_before_any_new_forward(tmp_path: Path) -> None:
+    repo = _repository(spool_dir=tmp_path)
+    respx.post(repo.config.webhook_url).mock(return_value=httpx.Response(503))
+    await repo.forward_update({"update_id": 1})
+    await repo.forward_update({"update_id": 2})
+    await repo.aclose()
+
+    bulk = respx.post(repo.config.webhook_batch_url).mock(return_value=httpx.Response(200))
+    restarted = _repository(spool_dir=tmp_path)
+    await restarted.start()
+    for _ in range(50):
+        if bulk.called:
+            break
+        await asyncio.sleep(0.01)
+
+    assert [u["update_id"] for u in json.loads(bulk.calls.last.request.content)["updates"]] == [
+        1,
+        2,
+    ]
+    await restarted.aclose()
+
+
+def test_conversation_updates_outrank_the_rest() -> None:
+    assert update_priority({"update_id": 1, "message": {"text": "hi"}}) == HIGH
+    assert update_priority({"update_id": 1, "edited_message": {"text": "hi"}}) == HIGH
+    assert update_priority({"update_id": 1, "callback_query": {"data": "x"}}) == LOW
+    # aiogram dumps every field, unset ones as None.
+    assert update_priority({"update_id": 1, "message": None, "poll": {"id": "1"}}) == LOW
+
+
+@respx.mock
+async def test_coalescing_logs_only_the_final_edit() -> None:
+    repo = _repository(coalesce_window=0.01)
+    route = respx.post(repo.config.bot_message_url).mock(return_value=httpx.Response(200))
+    edits = [
+        OutgoingMessageSnapshot(chat_id=42, message_id=7, text="hel" + "lo"[:n], date=1)
+        for n in range(3)
+    ]
+
+    await asyncio.gather(*(repo.record_outgoing(edit) for edit in edits))
+
+    assert route.call_count == 1
+    assert json.loads(route.calls.last.request.content)["text"] == "hello"
+    await repo.aclose()
+
+
+@respx.mock
+async def test_aclose_sends_what_coalescing_still_holds() -> None:
+    repo = _repository(coalesce_window=60)
+    route = respx.post(repo.config.bot_message_url).mock(return_value=httpx.Response(200))
+    pending = asyncio.ensure_future(
+        repo.record_outgoing(OutgoingMessageSnapshot(chat_id=42, message_id=7, text="hi"))
+    )
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+    await repo.aclose()
+    await pending
+
+    assert route.called
+
+
+def test_every_update_is_new_without_dedupe() -> None:
+    repo = _repository()
+
+    assert repo.is_new_update(1) and repo.is_new_update(1)
+
+
+def test_dedupe_reports_a_repeated_update_id() -> None:
+    repo = _repository(dedupe=DedupePolicy())
+
+    assert repo.is_new_update(1) is True
+    assert repo.is_new_update(1) is False
+
+
+@respx.mock
+async def test_dedupe_drops_a_repeated_outgoing_message() -> None:
+    repo = _repository(dedupe=DedupePolicy())
+    route = respx.post(repo.config.bot_message_url).mock(return_value=httpx.Response(200))
+    snapshot = OutgoingMessageSnapshot(chat_id=42, message_id=7, text="hi", date=1)
+
+    await repo.record_outgoing(snapshot)
+    await repo.record_outgoing(snapshot)
+    await repo.record_outgoing(OutgoingMessageSnapshot(chat_id=42, message_id=7, text="edited"))
+
+    assert route.call_count == 2
+    await repo.aclose()
+
+
+@respx.mock
+async def test_dedupe_logs_again_a_message_that_failed_to_send() -> None:
+    repo = _repository(dedupe=DedupePolicy(), retry=None)
+    route = respx.post(repo.config.bot_message_url).mock(
+        side_effect=[httpx.Response(503), httpx.Response(200), httpx.Response(200)]
+    )
+    snapshot = OutgoingMessageSnapshot(chat_id=42, message_id=7, text="hi", date=1)
+
+    await repo.record_outgoing(snapshot)
+    assert repo.is_new_outgoing(42, 7, "hi")
+    await repo.record_outgoing(snapshot)
+    assert not repo.is_new_outgoing(42, 7, "hi")
+    await repo.record_outgoing(snapshot)
+
+    assert route.call_count == 2
+    await repo.aclose()
+
+
+@respx.mock
+async def test_dedupe_keeps_an_edit_back_to_an_earlier_text() -> None:
+    repo = _repository(dedupe=DedupePolicy())
+    route = respx.post(repo.config.bot_message_url).mock(return_value=httpx.Response(200))
+
+    for text in ("A", "B", "A"):
+        await repo.record_outgoing(OutgoingMessageSnapshot(chat_id=42, message_id=7, text=text))
+
+    assert route.call_count == 3
+    assert json.loads(route.calls.last.request.content)["text"] == "A"
+    await repo.aclose()
+
+
+def test_update_priority_reads_framework_objects_by_attribute() -> None:
+    class _Update:
+        def __init__(self, **fields: object) -> None:
+            self.message = fields.get("message")
+            self.edited_message = fields.get("edited_message")
+
+    assert update_priority(_Update(message=object())) == HIGH
+    assert update_priority(_Update(edited_message=object())) == HIGH
+    assert update_priority(_Update()) == LOW
+
+
+@respx.mock
+async def test_forward_update_from_builds_the_payload_when_run() -> None:
+    repo = _repository()
+    route = respx.post(repo.config.webhook_url).mock(return_value=httpx.Response(200))
+
+    await repo.forward_update_from(lambda update_id: {"update_id": update_id}, 5)
+
+    assert json.loads(route.calls.last.request.content) == {"update_id": 5}
+    await repo.aclose()
+
+
+@respx.mock
+async def test_forward_update_from_drops_an_update_that_fails_to_build() -> None:
+    repo = _repository()
+    route = respx.post(repo.config.webhook_url).mock(return_value=httpx.Response(200))
+
+    def build(source: object) -> dict[str, object]:
+        raise ValueError("nope")
+
+    await repo.forward_update_from(build, None)
+
+    assert not route.called
+    await repo.aclose()
+
+
+@respx.mock
+async def test_schedule_update_builds_the_payload_in_the_background() -> None:
+    repo = _repository()
+    route = respx.post(repo.config.webhook_url).mock(return_value=httpx.Response(200))
+    built: list[int] = []
+
+    def build(update: dict[str, Any]) -> dict[str, Any]:
+        built.append(update["update_id"])
+        return update
+
+    repo.schedule_update(build, {"update_id": 1, "message": {"chat": {"id": 42}}})
+    assert built == []
+    await repo.flush()
+
+    assert built == [1]
+    assert route.call_count == 1
+    await repo.aclose()
+
+
+@respx.mock
+async def test_a_byte_budget_holds_updates_encoded_and_sheds_past_it() -> None:
+    repo = _repository(max_pending_bytes=200)
+    route = respx.post(repo.config.webhook_url).mock(return_value=httpx.Response(200))
+    update = {"update_id": 1, "message": {"chat": {"id": 42}, "text": "x" * 40}}
+
+    for _ in range(3):
+        repo.schedule_update(dict, update)
+
+    # Encoded when scheduled: two of 94 bytes fit in 200, the third is shed.
+    assert repo.scheduler.bulkhead.in_flight == 2
+    assert repo.scheduler.bulkhead.pending_bytes == 2 * len(
+        json.dumps(update, separators=(",", ":"))
+    )
+    await repo.flush()
+    assert route.call_count == 2
+    assert json.loads(route.calls.last.request.content) == update
+    await repo.aclose()
+
+
+@respx.mock
+async def test_a_per_kind_ttl_applies_to_polls() -> None:
+    repo = _repository(workers=1, staleness=StalenessPolicy(kinds={"poll": 0.01}))
+    route = respx.post(repo.config.webhook_url).mock(return_value=httpx.Response(200))
+    release = asyncio.Event()
+    before = _background._DROPPED.value("stale")
+
+    async def stuck() -> None:
+        await release.wait()
+
+    # The only worker is busy, so the poll waits past its TTL.
+    repo.scheduler.submit(stuck)
+    repo.schedule_update(dict, {"update_id": 1, "poll": {"id": "p"}})
+    await asyncio.sleep(0.05)
+    release.set()
+    await repo.flush()
+
+    assert route.call_count == 0
+    assert _background._DROPPED.value("stale") == before + 1
+    await repo.aclose()
+
+
+def test_the_byte_budget_must_be_positive() -> None:
+    with pytest.raises(ValueError, match="max_pending_bytes"):
+        _repository(max_pending_bytes=0)
+
+
+def test_drop_oldest_overflow_needs_workers() -> None:
+    with pytest.raises(ValueError):
+        _repository(overflow="drop-oldest")
+    with pytest.raises(ValueError):
+        _repository(overflow="random")
+
+
+@respx.mock
+async def test_bots_on_a_hub_share_one_http_client() -> None:
+    hub = SteeperHub(workers=2)
+    first = _repository(hub=hub)
+    second = SteeperRepository(
+        base_url=BASE_URL, bot_id=OTHER_BOT_ID, bot_token="654321:XYZ", hub=hub
+    )
+    route = respx.post(first.config.webhook_url).mock(return_value=httpx.Response(200))
+    respx.post(second.config.webhook_url).mock(return_value=httpx.Response(200))
+
+    assert first.client._http is second.client._http is hub.http
+    assert first.scheduler.bulkhead is not second.scheduler.bulkhead
+    first.scheduler.submit(first.forward_update, {"update_id": 1})
+    second.scheduler.submit(second.forward_update, {"update_id": 2})
+    while respx.calls.call_count < 2:
+        await asyncio.sleep(0)
+    assert route.call_count == 1
+
+    # A bot leaving doesn't close the connections the others still use.
+    await first.aclose()
+    assert not hub.http.is_closed
+    await second.aclose()
+    await hub.aclose()
+    assert hub.http.is_closed
+
+
+@respx.mock
+async def test_aclose_sends_pending_forwards_first() -> None:
+    repo = _repository(batch_size=10, batch_window=0.05)
+    route = respx.post(repo.config.webhook_batch_url).mock(return_value=httpx.Response(200))
+
+    for i in range(3):
+        repo.scheduler.submit(repo.forward_update, {"update_id": i})
+    await repo.aclose()
+
+    assert not repo.accepting
+    assert route.call_count == 1
+    assert len(json.loads(route.calls.last.request.content)["updates"]) == 3
+
+
+@respx.mock
+async def test_flush_reports_forwards_abandoned_at_the_deadline(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    repo = _repository(drain_timeout=0.01)
+    release = asyncio.Event()
+
+    async def stuck(update: dict[str, Any]) -> None:
+        await release.wait()
+
+    repo.scheduler.submit(stuck, {"update_id": 1})
+    assert await repo.flush() == 1
+    assert "gave up on 1 pending forwards" in caplog.text
+    release.set()
+    await repo.aclose()
+
+
+def test_the_in_flight_limit_adapts_by_default() -> None:
+    assert isinstance(_repository().scheduler._limiter, AdaptiveLimit)
+    assert _repository(concurrency=None).scheduler._limiter is None
+
+
+def test_a_hub_keeps_the_transport_and_workers() -> None:
+    hub = SteeperHub(workers=2)
+    with pytest.raises(ValueError):
+        _repository(hub=hub, workers=4)
+    with pytest.raises(ValueError):
+        _repository(hub=hub, transport=TransportPolicy())
+
+
+@pytest.mark.parametrize(
+    ("update", "chat_id"),
+    [
+        ({"update_id": 1, "message": {"chat": {"id": 42}}}, 42),
+        ({"update_id": 1, "edited_message": None, "channel_post": {"chat": {"id": -100}}}, -100),
+        (
+            {"update_id": 1, "callback_query": {"from": {"id": 7}, "message": {"chat": {"id": 9}}}},
+            9,
+        ),
+        ({"update_id": 1, "inline_query": {"from": {"id": 7}}}, 7),
+        ({"update_id": 1, "poll_answer": {"user": {"id": 5}}}, 5),
+        ({"update_id": 1, "poll": {"id": "p"}}, None),
+        ({"update_id": 1, "business_connection": {"user": {"id": 3}}}, 3),
+        ({"update_id": 1, "deleted_business_messages": {"chat": {"id": 4}}}, 4),
+        ({"update_id": 1, "purchased_paid_media": {"from": {"id": 6}}}, 6),
+    ],
+)
+def test_update_chat_id_finds_the_chat_of_any_update(update: dict[str, Any], chat_id: int) -> None:
+    assert update_chat_id(update) == chat_id
+
+
+@pytest.mark.parametrize(
+    "kind",
+    [
+        "message",
+        "edited_message",
+        "channel_post",
+        "edited_channel_post",
+        "business_connection",
+        "business_message",
+        "edited_business_message",
+        "deleted_business_messages",
+        "message_reaction",
+        "message_reaction_count",
+        "inline_query",
+        "chosen_inline_result",
+        "callback_query",
+        "shipping_query",
+        "pre_checkout_query",
+        "purchased_paid_media",
+        "poll",
+        "poll_answer",
+        "my_chat_member",
+        "chat_member",
+        "chat_join_request",
+        "chat_boost",
+        "removed_chat_boost",
+    ],
+)
+def test_update_kind_knows_every_type_of_update(kind: str) -> None:
+    assert update_kind({"update_id": 1, kind: {"id": "x"}}) == kind
+
+
+def test_update_kind_is_the_payload_field() -> None:
+    assert update_kind({"update_id": 1, "message": None, "callback_query": {}}) == "callback_query"
+    assert update_kind({"update_id": 1, "some_future_type": {}}) == "update"
+
+
+def test_update_chat_id_reads_framework_objects_by_attribute() -> None:
+    class _Obj:
+        def __init__(self, **fields: Any) -> None:
+            self.__dict__.update(fields)
+
+    query = _Obj(from_user=_Obj(id=7), message=None)
+    assert update_chat_id(_Obj(message=None, callback_query=query)) == 7
+
+
+def test_snapshot_from_a_message_dict() -> None:
+    assert snapshot_from_message_dict(_MESSAGE_JSON) == OutgoingMessageSnapshot(
+        chat_id=42, message_id=7, text="hello", date=1700000000
+    )
+
+
+def test_snapshot_from_a_message_dict_falls_back_to_caption() -> None:
+    payload = {**_MESSAGE_JSON, "text": None, "caption": "  a photo  "}
+
+    assert snapshot_from_message_dict(payload).text == "a photo"
+
+
+def test_snapshot_coerces_a_float_date() -> None:
+    assert snapshot_from_message_dict({**_MESSAGE_JSON, "date": 1700000000.9}).date == 1700000000
+
+
+def test_snapshot_tolerates_a_missing_date() -> None:
+    payload = {k: v for k, v in _MESSAGE_JSON.items() if k != "date"}
+
+    assert snapshot_from_message_dict(payload).date is None
+
+
+def test_snapshots_from_a_single_message_result() -> None:
+    assert [s.message_id for s in snapshots_from_message_json(_MESSAGE_JSON)] == [7]
+
+
+def test_snapshots_from_a_media_group_result() -> None:
+    group = [_MESSAGE_JSON, {**_MESSAGE_JSON, "message_id": 8}]
+
+    assert [s.message_id for s in snapshots_from_message_json(group)] == [7, 8]
+
+
+@pytest.mark.parametrize(
+    "result",
+    [None, True, {"ok": True}, [{"not": "a message"}], "text", 42],
+)
+def test_results_that_are_not_messages_yield_no_snapshots(result: Any) -> None:
+    assert snapshots_from_message_json(result) == []
+
+
+@pytest.mark.parametrize("workers", [None, 32])
+@respx.mock
+async def test_ordered_forwards_of_one_chat_still_share_a_batch(workers: int | None) -> None:
+    repo = _repository(ordered=True, batch_size=100, batch_window=0.05, workers=workers)
+    route = respx.post(repo.config.webhook_batch_url).mock(return_value=httpx.Response(200))
+
+    for i in range(20):
+        repo.scheduler.submit(repo.forward_update, {"update_id": i}, key=42, kind="message")
+    await repo.flush()
+
+    assert route.call_count == 1
+    sent = json.loads(route.calls.last.request.content)["updates"]
+    assert [u["update_id"] for u in sent] == list(range(20))
+    await repo.aclose()
+
+
+@pytest.mark.parametrize("workers", [None, 32])
+@respx.mock
+async def test_a_batched_update_is_stored_before_the_reply_to_it(workers: int | None) -> None:
+    repo = _repository(batch_size=10, batch_window=0.01, workers=workers)
+    stored: list[str] = []
+
+    async def store_update(request: httpx.Request) -> httpx.Response:
+        # The update's request is the slower one, as a first contact's often is.
+        await asyncio.sleep(0.05)
+        stored.append("update")
+        return httpx.Response(200)
+
+    def store_message(request: httpx.Request) -> httpx.Response:
+        stored.append("message")
+        return httpx.Response(200)
+
+    respx.post(repo.config.webhook_url).mock(side_effect=store_update)
+    respx.post(repo.config.bot_message_url).mock(side_effect=store_message)
+    update = {"update_id": 1, "message": {"chat": {"id": 42}}}
+    reply = OutgoingMessageSnapshot(chat_id=42, message_id=7, text="hi")
+
+    repo.scheduler.submit(repo.forward_update, update, key=42, kind="message")
+    repo.scheduler.submit(repo.record_outgoing, reply, key=42, kind=OUTGOING_KIND)
+    await repo.flush()
+
+    assert stored == ["update", "message"]
+    await repo.aclose()
+
+
+@pytest.mark.parametrize("workers", [None, 32])
+@respx.mock
+async def test_ordered_edits_of_one_message_are_still_coalesced(workers: int | None) -> None:
+    repo = _repository(ordered=True, coalesce_window=0.05, workers=workers)
+    route = respx.post(repo.config.bot_message_url).mock(return_value=httpx.Response(200))
+
+    for n in range(10):
+        snapshot = OutgoingMessageSnapshot(chat_id=42, message_id=7, text=f"v{n}", date=1)
+        repo.scheduler.submit(repo.record_outgoing, snapshot, key=42, kind=OUTGOING_KIND)
+    await repo.flush()
+
+    assert route.call_count == 1
+    assert json.loads(route.calls.last.request.content)["text"] == "v9"
+    await repo.aclose()
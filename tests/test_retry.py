@@ -0,0 +1,66 @@
+import pytest
+
+from steeper import RetryPolicy
+from steeper._retry import RetryBudget, parse_retry_after
+
+
+def test_backoff_doubles_up_to_the_ceiling() -> None:
+    policy = RetryPolicy(backoff=1.0, max_backoff=3.0, jitter=False)
+
+    assert [policy.delay(n) for n in (1, 2, 3)] == [1.0, 2.0, 3.0]
+
+
+def test_jitter_stays_within_the_computed_delay() -> None:
+    policy = RetryPolicy(backoff=1.0, jitter=True)
+
+    assert all(0 <= policy.delay(2) <= 2.0 for _ in range(100))
+
+
+def test_a_longer_retry_after_wins() -> None:
+    policy = RetryPolicy(backoff=0.1, max_backoff=5.0, jitter=False)
+
+    assert policy.delay(1, retry_after=2.0) == 2.0
+    assert policy.delay(1, retry_after=0.01) == 0.1
+
+
+def test_a_retry_after_past_max_backoff_gives_up() -> None:
+    policy = RetryPolicy(backoff=0.1, max_backoff=5.0, jitter=False)
+
+    assert policy.delay(1, retry_after=5.0) == 5.0
+    assert policy.delay(1, retry_after=60.0) is None
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "match"),
+    [
+        ({"attempts": 0}, "attempts"),
+        ({"backoff": -1}, "backoff"),
+        ({"deadline": 0}, "deadline"),
+        ({"budget_ratio": -0.1}, "budget"),
+    ],
+)
+def test_rejects_invalid_settings(kwargs: dict[str, float], match: str) -> None:
+    with pytest.raises(ValueError, match=match):
+        RetryPolicy(**kwargs)  # type: ignore[arg-type]
+
+
+def test_budget_allows_the_burst_then_only_what_traffic_earns() -> None:
+    budget = RetryBudget(ratio=0.5, burst=2)
+
+    assert budget.withdraw() and budget.withdraw()
+    assert not budget.withdraw()
+
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw()
+    assert not budget.withdraw()
+
+
+def test_parses_both_retry_after_forms() -> None:
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(" 1.5 ") == 1.5
+    assert parse_retry_after("-1") is None
+    assert parse_retry_after("inf") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
@@ -0,0 +1,111 @@
+from pathlib import Path
+
+from steeper._spool import Spool, read_records
+
+
+def _segments(directory: Path) -> list[str]:
+    return sorted(p.name for p in directory.glob("*.seg"))
+
+
+def test_appended_records_are_pending_until_acked(tmp_path: Path) -> None:
+    spool = Spool(tmp_path)
+    first = spool.append("update", {"update_id": 1})
+    second = spool.append("message", {"message_id": 7})
+    assert first is not None and second is not None
+
+    spool.ack(first)
+
+    records = spool.pending(limit=10)
+    assert [(r.seq, r.kind, r.body) for r in records] == [(second, "message", {"message_id": 7})]
+    spool.close()
+
+
+def test_pending_respects_the_limit_and_exclusions(tmp_path: Path) -> None:
+    spool = Spool(tmp_path)
+    seqs = [spool.append("update", {"update_id": i}) for i in range(5)]
+
+    records = spool.pending(limit=2, exclude={seqs[0]})
+
+    assert [r.body["update_id"] for r in records] == [1, 2]
+    spool.close()
+
+
+def test_records_listed_by_unsent_are_read_even_if_compacted_since(tmp_path: Path) -> None:
+    spool = Spool(tmp_path, segment_bytes=64)
+    seqs = [spool.append("update", {"update_id": i, "pad": "x" * 40}) for i in range(3)]
+    unsent = spool.unsent()
+    assert len(unsent) == 3
+
+    # Settled while the listing was on its way to a reader thread.
+    assert seqs[0] is not None
+    spool.ack(seqs[0])
+
+    records = read_records(unsent, limit=10)
+    assert [r.body["update_id"] for r in records] == [1, 2]
+    spool.close()
+
+
+def test_unacked_records_survive_a_restart(tmp_path: Path) -> None:
+    spool = Spool(tmp_path)
+    acked = spool.append("update", {"update_id": 1})
+    spool.append("update", {"update_id": 2})
+    assert acked is not None
+    spool.ack(acked)
+    spool.close()
+
+    reopened = Spool(tmp_path)
+
+    assert [r.body["update_id"] for r in reopened.pending(limit=10)] == [2]
+    # New appends never reuse a sequence number from the previous process.
+    assert reopened.append("update", {"update_id": 3}) == 2
+    reopened.close()
+
+
+def test_a_torn_trailing_write_is_ignored_on_recovery(tmp_path: Path) -> None:
+    spool = Spool(tmp_path)
+    spool.append("update", {"update_id": 1})
+    spool.close()
+    (segment,) = tmp_path.glob("*.seg")
+    with open(segment, "a", encoding="utf-8") as fh:
+        fh.write('1\tupdate\t{"update_')
+
+    reopened = Spool(tmp_path)
+
+    assert [r.body["update_id"] for r in reopened.pending(limit=10)] == [1]
+    reopened.close()
+
+
+def test_fully_acked_sealed_segments_are_deleted(tmp_path: Path) -> None:
+    spool = Spool(tmp_path, segment_bytes=64)
+    seqs = [spool.append("update", {"update_id": i, "pad": "x" * 40}) for i in range(3)]
+    assert len(_segments(tmp_path)) == 3
+
+    for seq in seqs[:2]:
+        assert seq is not None
+        spool.ack(seq)
+
+    # The first two are sealed and settled; the active one stays.
+    assert len(_segments(tmp_path)) == 1
+    assert not list(tmp_path.glob("*.ack"))
+    spool.close()
+
+
+def test_appends_past_max_bytes_are_refused(tmp_path: Path) -> None:
+    spool = Spool(tmp_path, max_bytes=64)
+
+    assert spool.append("update", {"update_id": 1}) is not None
+    assert spool.append("update", {"pad": "x" * 100}) is None
+    assert spool.pending_count == 1
+    spool.close()
+
+
+def test_encoded_bodies_are_spooled_and_sized_in_bytes(tmp_path: Path) -> None:
+    body = '{"update_id":1,"text":"привет"}'.encode()
+    spool = Spool(tmp_path)
+
+    assert spool.append("update", body) is not None
+    spool.flush()
+
+    assert [r.body for r in spool.pending(limit=10)] == [{"update_id": 1, "text": "привет"}]
+    assert spool._total_bytes == sum(p.stat().st_size for p in tmp_path.glob("*.seg"))
+    spool.close()
@@ -5,6 +5,7 @@ registry by bot token, so every test restores both.
 """
 
 import json
+import threading
 import time
 from collections.abc import Iterator
 from typing import Any
@@ -15,15 +16,13 @@ import respx
 import telebot
 from telebot import apihelper
 
-from steeper import _background
+from steeper import DedupePolicy, _background
 from steeper.integrations import telebot as integration
 from steeper.integrations.telebot import (
     SteeperMiddleware,
     _full_update_from_telebot,
-    _snapshot_from_telebot_dict,
-    _telebot_snapshots_from_result,
 )
-from steeper.repository import OutgoingMessageSnapshot, SteeperRepository
+from steeper.repository import SteeperRepository
 
 BOT_ID = "d74d82b4-7c00-408d-b611-2411e0b3c6f8"
 BOT_TOKEN = "123456:ABC-DEF"
@@ -54,50 +53,10 @@ def _middleware() -> SteeperMiddleware:
 def _drain_background(timeout: float = 5.0) -> None:
     """Wait for fire-and-forget work to finish, so assertions aren't racing it."""
     deadline = time.monotonic() + timeout
-    while _background._background_loop._in_flight and time.monotonic() < deadline:
+    while _background._in_flight() and time.monotonic() < deadline:
         time.sleep(0.01)
 
 
-def test_snapshot_from_a_message_dict() -> None:
-    assert _snapshot_from_telebot_dict(_MESSAGE) == OutgoingMessageSnapshot(
-        chat_id=42, message_id=7, text="hello", date=1700000000
-    )
-
-
-def test_snapshot_falls_back_to_caption() -> None:
-    payload = {**_MESSAGE, "text": None, "caption": "  a photo  "}
-
-    assert _snapshot_from_telebot_dict(payload).text == "a photo"
-
-
-def test_snapshot_coerces_a_float_date() -> None:
-    assert _snapshot_from_telebot_dict({**_MESSAGE, "date": 1700000000.9}).date == 1700000000
-
-
-def test_snapshot_tolerates_a_missing_date() -> None:
-    payload = {k: v for k, v in _MESSAGE.items() if k != "date"}
-
-    assert _snapshot_from_telebot_dict(payload).date is None
-
-
-def test_snapshots_from_a_single_message_result() -> None:
-    assert [s.message_id for s in _telebot_snapshots_from_result(_MESSAGE)] == [7]
-
-
-def test_snapshots_from_a_media_group_result() -> None:
-    group = [_MESSAGE, {**_MESSAGE, "message_id": 8}]
-
-    assert [s.message_id for s in _telebot_snapshots_from_result(group)] == [7, 8]
-
-
-@pytest.mark.parametrize(
-    "result",
-    [None, True, {"ok": True}, [{"not": "a message"}], "text", 42],
-)
-def test_results_that_are_not_messages_yield_no_snapshots(result: Any) -> None:
-    assert _telebot_snapshots_from_result(result) == []
-
-
 def test_full_update_keeps_update_id_and_sub_objects() -> None:
     raw = json.dumps({"update_id": 99, "message": _MESSAGE})
     update = telebot.types.Update.de_json(raw)
@@ -262,3 +221,121 @@ def test_repository_and_client_are_exposed() -> None:
     assert isinstance(middleware.repository, SteeperRepository)
     assert middleware.client is middleware.repository.client
     middleware.close()
+
+
+@respx.mock
+def test_a_media_group_is_logged_in_one_request() -> None:
+    middleware = _middleware()
+    route = respx.post(middleware.repository.config.bot_message_batch_url).mock(
+        return_value=httpx.Response(200)
+    )
+    bot = telebot.TeleBot(BOT_TOKEN)
+    group = [_MESSAGE, {**_MESSAGE, "message_id": 8}]
+    apihelper._make_request = lambda *args, **kwargs: group  # type: ignore[assignment]
+    middleware.setup(bot)
+
+    apihelper._make_request(BOT_TOKEN, "sendMediaGroup", "post", {})
+    _drain_background()
+
+    assert route.call_count == 1
+    messages = json.loads(route.calls.last.request.content)["messages"]
+    assert [m["message_id"] for m in messages] == [7, 8]
+    middleware.close()
+
+
+@respx.mock
+def test_polled_updates_are_forwarded_as_telegram_sent_them() -> None:
+    middleware = _middleware()
+    route = respx.post(middleware.repository.config.webhook_url).mock(
+        return_value=httpx.Response(200)
+    )
+    bot = telebot.TeleBot(BOT_TOKEN)
+    # ``future_field`` is unknown to telebot, so reconstruction would lose it.
+    raw = {"update_id": 9, "message": {**_MESSAGE, "future_field": 1}}
+    apihelper._make_request = lambda *args, **kwargs: [raw]  # type: ignore[assignment]
+    middleware.setup(bot)
+
+    result = apihelper._make_request(BOT_TOKEN, "getUpdates", "get", {})
+    bot.process_new_updates([telebot.types.Update.de_json(u) for u in result])
+    _drain_background()
+
+    assert json.loads(route.calls.last.request.content) == raw
+    middleware.close()
+
+
+@respx.mock
+def test_polled_updates_are_not_logged_as_outgoing_messages() -> None:
+    middleware = _middleware()
+    route = respx.post(middleware.repository.config.bot_message_url).mock(
+        return_value=httpx.Response(200)
+    )
+    bot = telebot.TeleBot(BOT_TOKEN)
+    apihelper._make_request = lambda *args, **kwargs: [{"update_id": 1, "message": _MESSAGE}]  # type: ignore[assignment]
+    middleware.setup(bot)
+
+    apihelper._make_request(BOT_TOKEN, "getUpdates", "get", {})
+    _drain_background()
+
+    assert not route.called
+    middleware.close()
+
+
+@respx.mock
+def test_payloads_are_built_off_the_polling_thread(monkeypatch: pytest.MonkeyPatch) -> None:
+    middleware = _middleware()
+    respx.post(middleware.repository.config.webhook_url).mock(return_value=httpx.Response(200))
+    bot = telebot.TeleBot(BOT_TOKEN)
+    middleware.setup(bot)
+    threads: list[threading.Thread] = []
+    build = integration._full_update_from_telebot
+
+    def recording_build(update: Any) -> dict[str, Any]:
+        threads.append(threading.current_thread())
+        return build(update)
+
+    monkeypatch.setattr(integration, "_full_update_from_telebot", recording_build)
+    update = telebot.types.Update.de_json(json.dumps({"update_id": 5, "message": _MESSAGE}))
+
+    bot.process_new_updates([update])
+    _drain_background()
+
+    assert threads and threads[0] is not threading.current_thread()
+    middleware.close()
+
+
+@respx.mock
+def test_calls_that_do_not_return_messages_are_not_logged() -> None:
+    middleware = _middleware()
+    route = respx.post(middleware.repository.config.bot_message_url).mock(
+        return_value=httpx.Response(200)
+    )
+    bot = telebot.TeleBot(BOT_TOKEN)
+    # A message-shaped result, but from a method that never returns the bot's message.
+    apihelper._make_request = lambda *args, **kwargs: _MESSAGE  # type: ignore[assignment]
+    middleware.setup(bot)
+
+    apihelper._make_request(BOT_TOKEN, "getChat", "post", {})
+    _drain_background()
+
+    assert not route.called
+    middleware.close()
+
+
+@respx.mock
+def test_a_redelivered_update_is_forwarded_once() -> None:
+    middleware = SteeperMiddleware(
+        base_url=BASE_URL, bot_id=BOT_ID, bot_token=BOT_TOKEN, dedupe=DedupePolicy()
+    )
+    route = respx.post(middleware.repository.config.webhook_url).mock(
+        return_value=httpx.Response(200)
+    )
+    bot = telebot.TeleBot(BOT_TOKEN)
+    middleware.setup(bot)
+    raw = json.dumps({"update_id": 5, "message": _MESSAGE})
+
+    bot.process_new_updates([telebot.types.Update.de_json(raw)])
+    bot.process_new_updates([telebot.types.Update.de_json(raw)])
+    _drain_background()
+
+    assert route.call_count == 1
+    middleware.close()
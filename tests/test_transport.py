@@ -0,0 +1,50 @@
+import sys
+
+import httpx
+import pytest
+
+from steeper import SteeperConfig, TransportPolicy
+from steeper._client import SteeperClient
+
+CONFIG = SteeperConfig("https://api.example.com", "d74d82b4-7c00-408d-b611-2411e0b3c6f8", "1:A")
+
+
+def test_unset_timeouts_fall_back_to_the_client_timeout() -> None:
+    timeout = TransportPolicy(connect_timeout=2.0).timeout(10.0)
+    assert timeout == httpx.Timeout(10.0, connect=2.0)
+
+
+def test_defaults_match_httpx() -> None:
+    assert TransportPolicy().limits() == httpx.Limits(
+        max_connections=100, max_keepalive_connections=20, keepalive_expiry=5.0
+    )
+
+
+def test_high_throughput_profile_uses_http2() -> None:
+    policy = TransportPolicy.high_throughput()
+    assert policy.http2 is True
+    assert policy.keepalive_expiry is not None and policy.keepalive_expiry > 5.0
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{"max_connections": 0}, {"max_keepalive_connections": -1}, {"read_timeout": 0}],
+)
+def test_invalid_policies_are_rejected(options: dict[str, float]) -> None:
+    with pytest.raises(ValueError):
+        TransportPolicy(**options)  # type: ignore[arg-type]
+
+
+async def test_client_applies_the_policy() -> None:
+    client = SteeperClient(CONFIG, timeout=7.0, transport=TransportPolicy.high_throughput())
+    assert client._http.timeout == httpx.Timeout(7.0, connect=3.0, pool=5.0)
+    pool = client._http._transport._pool  # type: ignore[attr-defined]
+    assert pool._http2 is True
+    assert pool._max_connections == 20
+    await client.close()
+
+
+def test_http2_without_h2_points_at_the_extra(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(sys.modules, "h2", None)
+    with pytest.raises(ImportError, match=r"steeper\[http2\]"):
+        SteeperClient(CONFIG, transport=TransportPolicy(http2=True))